@@ -0,0 +1,184 @@
+"""
+Bitrate adaptativo para sessões do scrcpy
+
+Acompanha as amostras de FPS da sessão (`--print-fps`) e, quando o FPS
+fica abaixo do alvo por um tempo com quadros sendo descartados, desce um
+degrau de qualidade (primeiro o bitrate, depois a resolução); quando o link
+se recupera por um período mais longo, sobe de volta. Cada decisão
+registra a métrica que a motivou.
+
+O scrcpy só gera quadros quando a tela muda: FPS baixo sem descartes é
+conteúdo parado, não congestionamento, e não derruba a qualidade.
+
+O scrcpy não muda bitrate/resolução com a sessão aberta: quem aplica o
+degrau é o ScrcpyManager, reabrindo o processo.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Deque, List, Optional, Tuple
+
+from .mirroring_budget import (
+    DEFAULT_FPS, DEFAULT_MAX_SIZE, MIN_BIT_RATE, MIN_MAX_SIZE,
+    format_bit_rate, request_from_options
+)
+
+
+# Degraus de qualidade: (fração do bitrate, fração da resolução); 0 = pedido
+QUALITY_LEVELS: List[Tuple[float, float]] = [
+    (1.0, 1.0),
+    (0.6, 1.0),
+    (0.4, 0.8),
+    (0.25, 0.65),
+    (0.15, 0.5),
+]
+
+# Abaixo disso o FPS baixo é tela parada, não congestionamento
+MIN_ACTIVE_FPS = 5
+
+# Limites da espera para voltar a subir (dobra quando a subida não se sustenta)
+MAX_RECOVER_WINDOW = 300.0
+
+
+@dataclass
+class AdaptationDecision:
+    """Mudança de degrau e a métrica que a motivou"""
+
+    DOWN = "down"
+    UP = "up"
+
+    direction: str
+    level_from: int
+    level_to: int
+    reason: str
+    time: float = field(default_factory=time.monotonic)
+
+
+def scale_options(options, level: int, native_size: Optional[int] = None):
+    """
+    Opções do scrcpy (ScrcpyOptions) no degrau `level`
+
+    Args:
+        native_size: Lado maior da imagem do aparelho, usado quando as
+            opções não limitam a resolução
+    """
+    if level <= 0 or options is None:
+        return options
+
+    bit_rate_factor, size_factor = QUALITY_LEVELS[min(level, len(QUALITY_LEVELS) - 1)]
+    request = request_from_options(options)
+    changes = {"bit_rate": format_bit_rate(max(MIN_BIT_RATE, int(request.bit_rate * bit_rate_factor) // 100_000 * 100_000))}
+    if size_factor < 1.0:
+        base = options.max_size or native_size or DEFAULT_MAX_SIZE
+        changes["max_size"] = max(MIN_MAX_SIZE, int(base * size_factor) // 8 * 8)
+    return replace(options, **changes)
+
+
+class AdaptiveBitrateController:
+    """Decide os degraus de qualidade de uma sessão a partir do FPS"""
+
+    def __init__(
+        self,
+        target_fps: int = DEFAULT_FPS,
+        low_ratio: float = 0.75,
+        high_ratio: float = 0.9,
+        drop_threshold: float = 0.05,
+        window: float = 10.0,
+        recover_window: float = 30.0,
+        cooldown: float = 15.0
+    ):
+        """
+        Args:
+            target_fps: FPS esperado (max_fps da sessão)
+            low_ratio: Desce se a média ficar abaixo de target_fps * low_ratio
+            high_ratio: Sobe se a média ficar acima de target_fps * high_ratio
+            drop_threshold: Fração de quadros descartados que indica
+                congestionamento (exigida para descer; para subir, precisa
+                ficar abaixo de um quinto dela)
+            window: Período (s) avaliado para descer
+            recover_window: Período (s) estável exigido para subir
+            cooldown: Espera mínima (s) depois de cada mudança
+        """
+        self.target_fps = target_fps
+        self.low_ratio = low_ratio
+        self.high_ratio = high_ratio
+        self.drop_threshold = drop_threshold
+        self.window = window
+        self.recover_window = recover_window
+        self.cooldown = cooldown
+
+        self.level = 0
+        self.decisions: Deque[AdaptationDecision] = deque(maxlen=50)
+        self._samples: Deque[Tuple[float, int, int]] = deque()
+        self._last_change = time.monotonic()
+        self._recover_wait = recover_window
+
+    def restarted(self, target_fps: Optional[int] = None):
+        """A sessão foi reaberta: descarta as amostras do processo anterior"""
+        if target_fps:
+            self.target_fps = target_fps
+        self._samples.clear()
+        self._last_change = time.monotonic()
+
+    def observe(self, fps: int, skipped: int = 0, now: Optional[float] = None) -> Optional[AdaptationDecision]:
+        """
+        Registra uma amostra (uma por segundo) e decide se muda de degrau
+
+        Returns:
+            A decisão (o degrau já é atualizado) ou None
+        """
+        now = time.monotonic() if now is None else now
+        self._samples.append((now, fps, skipped))
+        horizon = now - max(self.window, self._recover_wait)
+        while self._samples and self._samples[0][0] < horizon:
+            self._samples.popleft()
+
+        if now - self._last_change < self.cooldown:
+            return None
+
+        stats = self._stats(now, self.window)
+        if stats is not None and self.level < len(QUALITY_LEVELS) - 1:
+            average, drop_ratio = stats
+            congested = average < self.target_fps * self.low_ratio and drop_ratio >= self.drop_threshold
+            if congested and average >= MIN_ACTIVE_FPS:
+                reason = (
+                    f"média {average:.1f} fps < {self.target_fps * self.low_ratio:.0f} "
+                    f"(alvo {self.target_fps}) em {self.window:.0f}s, {drop_ratio * 100:.1f}% descartados"
+                )
+                # Subida recente que não se sustentou: espera mais para tentar de novo
+                if self.decisions and self.decisions[-1].direction == AdaptationDecision.UP \
+                        and now - self.decisions[-1].time < self._recover_wait + self.window:
+                    self._recover_wait = min(self._recover_wait * 2, MAX_RECOVER_WINDOW)
+                return self._change(AdaptationDecision.DOWN, self.level + 1, reason, now)
+
+        stats = self._stats(now, self._recover_wait)
+        if stats is not None and self.level > 0:
+            average, drop_ratio = stats
+            if average >= self.target_fps * self.high_ratio and drop_ratio < self.drop_threshold / 5:
+                reason = (
+                    f"média {average:.1f} fps >= {self.target_fps * self.high_ratio:.0f} "
+                    f"(alvo {self.target_fps}) em {self._recover_wait:.0f}s, {drop_ratio * 100:.1f}% descartados"
+                )
+                return self._change(AdaptationDecision.UP, self.level - 1, reason, now)
+
+        return None
+
+    def _stats(self, now: float, period: float) -> Optional[Tuple[float, float]]:
+        """Média de FPS e fração descartada no período (None se não houver amostras suficientes)"""
+        since = now - period
+        recent = [(fps, skipped) for timestamp, fps, skipped in self._samples if timestamp >= since]
+        if not recent or self._samples[0][0] > since + 1.5 or len(recent) < period * 0.8:
+            return None
+        shown = sum(fps for fps, _ in recent)
+        skipped = sum(skipped for _, skipped in recent)
+        total = shown + skipped
+        return shown / len(recent), (skipped / total if total else 0.0)
+
+    def _change(self, direction: str, level: int, reason: str, now: float) -> AdaptationDecision:
+        decision = AdaptationDecision(direction, self.level, level, reason, now)
+        self.level = level
+        self.decisions.append(decision)
+        self._samples.clear()
+        self._last_change = now
+        return decision
@@ -0,0 +1,203 @@
+"""
+Cliente nativo do protocolo host do servidor ADB
+
+Fala diretamente com o servidor ADB (o mesmo que o comando `adb` usa) pelo
+socket local, evitando criar um processo `adb` a cada chamada.
+
+Formato do protocolo:
+    requisição: <tamanho em 4 dígitos hex><serviço>
+    resposta:   "OKAY" ou "FAIL" + <tamanho em 4 dígitos hex><mensagem>
+"""
+
+import os
+import socket
+from typing import Optional, Tuple, Union
+
+
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 5037
+
+# Valor padrão dos parâmetros `timeout`: usa ADBClient.timeout (None = sem limite)
+DEFAULT_TIMEOUT = object()
+
+
+class ADBProtocolError(Exception):
+    """Erro reportado pelo servidor ADB (FAIL) ou resposta inesperada"""
+
+
+class ADBClient:
+    """Cliente do protocolo host do servidor ADB"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, timeout: float = 5.0):
+        default_host, default_port = self._resolve_server_address()
+        self.host = host or default_host
+        self.port = port or default_port
+        self.timeout = timeout
+
+    @staticmethod
+    def _resolve_server_address() -> Tuple[str, int]:
+        """
+        Resolve o endereço do servidor ADB a partir do ambiente
+
+        Respeita ADB_SERVER_SOCKET (tcp:<porta> ou tcp:<host>:<porta>),
+        ANDROID_ADB_SERVER_ADDRESS e ANDROID_ADB_SERVER_PORT, como o adb.
+        """
+        host = os.environ.get("ANDROID_ADB_SERVER_ADDRESS") or DEFAULT_SERVER_HOST
+        port = DEFAULT_SERVER_PORT
+
+        env_port = os.environ.get("ANDROID_ADB_SERVER_PORT")
+        if env_port and env_port.isdigit():
+            port = int(env_port)
+
+        server_socket = os.environ.get("ADB_SERVER_SOCKET", "")
+        if server_socket.startswith("tcp:"):
+            parts = server_socket[4:].rsplit(":", 1)
+            if len(parts) == 2 and parts[1].isdigit():
+                host, port = parts[0] or host, int(parts[1])
+            elif parts[0].isdigit():
+                port = int(parts[0])
+
+        return host, port
+
+    def connect(self, timeout: Union[float, None, object] = DEFAULT_TIMEOUT) -> socket.socket:
+        """
+        Abre uma conexão com o servidor ADB
+
+        Args:
+            timeout: Limite (s) de cada leitura/escrita depois de conectar;
+                None bloqueia sem limite, o padrão usa `self.timeout`
+        """
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.settimeout(self.timeout if timeout is DEFAULT_TIMEOUT else timeout)
+        return sock
+
+    def _send_request(self, sock: socket.socket, service: str):
+        """Envia uma requisição no formato <tamanho hex><serviço>"""
+        payload = service.encode("utf-8")
+        sock.sendall(b"%04x" % len(payload) + payload)
+
+    def _read_exact(self, sock: socket.socket, size: int) -> bytes:
+        """Lê exatamente `size` bytes do socket"""
+        data = bytearray()
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionResetError("Conexão com o servidor ADB encerrada")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _read_length_prefixed(self, sock: socket.socket) -> bytes:
+        """Lê um bloco precedido por 4 dígitos hex de tamanho"""
+        header = self._read_exact(sock, 4)
+        try:
+            size = int(header, 16)
+        except ValueError:
+            raise ADBProtocolError(f"Tamanho inválido na resposta: {header!r}")
+        return self._read_exact(sock, size)
+
+    def _read_status(self, sock: socket.socket):
+        """Lê o status OKAY/FAIL de uma requisição"""
+        status = self._read_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            message = self._read_length_prefixed(sock).decode("utf-8", errors="replace")
+            raise ADBProtocolError(message)
+        raise ADBProtocolError(f"Resposta inesperada do servidor ADB: {status!r}")
+
+    def _read_all(self, sock: socket.socket, cancel=None) -> bytes:
+        """
+        Lê até o fim do stream
+
+        `cancel` (CancelToken opcional) interrompe a leitura encerrando o
+        socket; o chamador deve verificar o token após o retorno.
+        """
+        def interrupt():
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        if cancel:
+            cancel.add_callback(interrupt)
+
+        chunks = []
+        try:
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            if cancel:
+                cancel.remove_callback(interrupt)
+        return b"".join(chunks)
+
+    def host_request(self, service: str) -> bytes:
+        """Executa um serviço host: que devolve um bloco com tamanho"""
+        with self.connect() as sock:
+            self._send_request(sock, service)
+            self._read_status(sock)
+            return self._read_length_prefixed(sock)
+
+    def server_version(self) -> int:
+        """Retorna a versão interna do servidor ADB"""
+        return int(self.host_request("host:version"), 16)
+
+    def devices_long(self) -> str:
+        """Equivalente ao `adb devices -l` (sem a linha de cabeçalho)"""
+        return self.host_request("host:devices-l").decode("utf-8", errors="replace")
+
+    def open_transport(self, serial: str, timeout: Union[float, None, object] = DEFAULT_TIMEOUT) -> socket.socket:
+        """Abre uma conexão já direcionada ao dispositivo informado"""
+        sock = self.connect(timeout)
+        try:
+            self._send_request(sock, f"host:transport:{serial}")
+            self._read_status(sock)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def open_service(self, serial: str, service: str, timeout: Union[float, None, object] = DEFAULT_TIMEOUT) -> socket.socket:
+        """Abre um serviço do dispositivo (shell:, exec:, sync:, ...)"""
+        sock = self.open_transport(serial, timeout)
+        try:
+            self._send_request(sock, service)
+            self._read_status(sock)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def shell(self, serial: str, command: str, timeout: Union[float, None, object] = DEFAULT_TIMEOUT, cancel=None) -> bytes:
+        """Executa `shell:<comando>` e retorna toda a saída"""
+        with self.open_service(serial, f"shell:{command}", timeout) as sock:
+            return self._read_all(sock, cancel)
+
+    def exec_out(self, serial: str, command: str, timeout: Union[float, None, object] = DEFAULT_TIMEOUT, cancel=None) -> bytes:
+        """Executa `exec:<comando>` (saída binária, sem PTY) e retorna os bytes"""
+        with self.open_service(serial, f"exec:{command}", timeout) as sock:
+            return self._read_all(sock, cancel)
+
+    def open_track_devices(self) -> socket.socket:
+        """
+        Abre o stream `host:track-devices-l`
+
+        O servidor envia um snapshot completo da lista de dispositivos
+        (mesmo formato do `devices -l`) a cada mudança. O socket fica sem
+        timeout: a leitura bloqueia até a próxima mudança.
+        """
+        sock = self.connect()
+        try:
+            self._send_request(sock, "host:track-devices-l")
+            self._read_status(sock)
+        except Exception:
+            sock.close()
+            raise
+        sock.settimeout(None)
+        return sock
+
+    def read_track_snapshot(self, sock: socket.socket) -> str:
+        """Lê o próximo snapshot do stream de dispositivos"""
+        return self._read_length_prefixed(sock).decode("utf-8", errors="replace")
@@ -2,9 +2,126 @@
 Módulo para gerenciamento de comandos ADB
 """
 
+import hashlib
+import os
+import queue
 import subprocess
 import re
-from typing import List, Dict, Optional, Tuple
+import shlex
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional, Tuple, Union
+
+from .adb_client import ADBClient, ADBProtocolError
+from .adb_sync import ProgressReporter, SyncConnection, SyncError, TransferProgress
+from .jobs import CancelToken, JobCancelled
+from .apk_info import ApkInfo, ApkParseError, file_sha256, read_apk_info
+from .device_network import IP_ADDRESSES_COMMAND, parse_ip_addresses, select_wifi_address
+from .connection_supervisor import ConnectionSupervisor, wait_for_port
+from .lan_scanner import DEFAULT_ADB_PORT, DiscoveredDevice, parse_mdns_services, run_scan
+from .dir_sync import SyncPlan, build_plan, format_size, parse_remote_hashes, parse_remote_stat, scan_local
+from .apk_splits import ApkSplit, collect_splits, is_split_archive, select_splits_for_abis
+from .screencap import RawFrame, encode_png, parse_raw_screencap
+from .shell_session import ProcessChannel, ShellSession, ShellSessionError, ShellStream, SocketChannel
+
+
+# Marcador usado para recuperar o código de saída de comandos via protocolo nativo
+EXIT_CODE_MARKER = "__ANDVIEW_RC__"
+
+# Separa a saída do `getprop` da saída do `dumpsys battery` no snapshot
+BATTERY_SECTION_MARKER = "__ANDVIEW_BATTERY__"
+
+# Linhas do `getprop`: [chave]: [valor] (o valor pode ocupar várias linhas)
+GETPROP_PATTERN = re.compile(r'^\[([^\]]+)\]: \[(.*?)\]$', re.MULTILINE | re.DOTALL)
+
+# Campos chave:valor de cada linha do `adb devices -l`
+DEVICES_LONG_FIELDS = ("usb", "product", "model", "device", "transport_id")
+
+# Linhas do `pm list packages --show-versioncode`: package:<nome> versionCode:<n>
+PM_PACKAGE_PATTERN = re.compile(r'^package:(\S+?)(?:\s+versionCode:(\d+))?\s*$', re.MULTILINE)
+
+# Resposta do install-create: "Success: created install session [1234]"
+INSTALL_SESSION_PATTERN = re.compile(r'\[(\d+)\]')
+
+# Momento da última instalação no `dumpsys package <pacote>`: lastUpdateTime=2024-05-01 10:20:30
+LAST_UPDATE_PATTERN = re.compile(r'^\s*lastUpdateTime=(.+?)\s*$', re.MULTILINE)
+
+# Tamanho dos blocos enviados ao instalador e pausa máxima (s) sem progresso
+INSTALL_CHUNK_SIZE = 1024 * 1024
+INSTALL_STALL_TIMEOUT = 60
+
+# Sufixo do arquivo local enquanto o download não termina (permite retomar)
+PARTIAL_DOWNLOAD_SUFFIX = ".part"
+
+# Ferramentas de checksum do dispositivo, em ordem de preferência (algoritmo, dígitos hex)
+CHECKSUM_TOOLS = (("sha256", 64), ("md5", 32))
+
+# Tempo máximo (s) para o dispositivo calcular o checksum de um arquivo grande
+CHECKSUM_TIMEOUT = 600
+
+# Tamanho máximo (caracteres) da lista de caminhos de cada `sha256sum` da sincronização
+HASH_BATCH_CHARS = 32 * 1024
+
+# Trechos de erro do `adb install` que indicam falha passageira (vale repetir)
+TRANSIENT_INSTALL_ERRORS = (
+    "timeout",
+    "device offline",
+    "device not found",
+    "no devices",
+    "connection reset",
+    "broken pipe",
+    "protocol fault",
+    "closed",
+    "can't find service",
+    "failed to connect",
+)
+
+# Caminho USB no formato do Linux: <barramento>-<porta>[.<porta>...] (ex: 1-4.2)
+USB_PATH_PATTERN = re.compile(r'^(\d+)-([\d.]+)$')
+
+# Informações exibidas no painel (rótulo -> propriedade)
+DEVICE_INFO_PROPERTIES = {
+    "Modelo": "ro.product.model",
+    "Fabricante": "ro.product.manufacturer",
+    "Android": "ro.build.version.release",
+    "SDK": "ro.build.version.sdk",
+    "CPU": "ro.product.cpu.abi",
+    "Serial": "ro.serialno",
+}
+
+
+class DeviceProperties(dict):
+    """Propriedades do sistema do dispositivo (saída do `getprop`) com acesso tipado"""
+    
+    @classmethod
+    def parse(cls, output: str) -> "DeviceProperties":
+        """Converte a saída completa do `getprop` em um mapa de propriedades"""
+        properties = cls()
+        for match in GETPROP_PATTERN.finditer(output.replace('\r\n', '\n')):
+            properties[match.group(1)] = match.group(2)
+        return properties
+    
+    def get_str(self, name: str, default: str = "") -> str:
+        """Retorna a propriedade como texto"""
+        return self.get(name, default).strip() or default
+    
+    def get_int(self, name: str, default: Optional[int] = None) -> Optional[int]:
+        """Retorna a propriedade como inteiro (default se ausente ou inválida)"""
+        try:
+            return int(self.get(name, "").strip())
+        except ValueError:
+            return default
+    
+    def get_bool(self, name: str, default: bool = False) -> bool:
+        """Retorna a propriedade como booleano (1/true/yes)"""
+        value = self.get(name, "").strip().lower()
+        if not value:
+            return default
+        return value in ("1", "true", "yes", "y", "on")
 
 
 class ADBDevice:
@@ -17,17 +134,286 @@ class ADBDevice:
         self.manufacturer = ""
         self.android_version = ""
         self.battery_level = ""
+        self.properties = DeviceProperties()
+        
+        # Campos do `adb devices -l`
+        self.usb = ""            # ex: 1-1.2 (porta USB)
+        self.product = ""        # ex: panther
+        self.device_name = ""    # campo "device:" (ex: panther)
+        self.transport_id = ""   # Identificador da conexão no servidor ADB
         
     def __repr__(self):
         return f"ADBDevice(serial={self.serial}, state={self.state}, model={self.model})"
+    
+    @classmethod
+    def from_devices_line(cls, line: str) -> Optional["ADBDevice"]:
+        """
+        Cria o dispositivo a partir de uma linha do `adb devices -l`
+        
+        Ex: "emulator-5554  device product:sdk model:Pixel_7 device:panther transport_id:1"
+        """
+        parts = line.split()
+        if len(parts) < 2:
+            return None
+        
+        device = cls(parts[0], parts[1])
+        
+        for part in parts[2:]:
+            key, sep, value = part.partition(":")
+            if not sep or key not in DEVICES_LONG_FIELDS:
+                continue
+            
+            if key == "model":
+                # O adb troca espaços por "_" (ex: Pixel_7)
+                device.model = value.replace("_", " ")
+            elif key == "device":
+                device.device_name = value
+            else:
+                setattr(device, key, value)
+        
+        return device
+
+
+@dataclass
+class DeviceProgress:
+    """Andamento de uma operação em lote em um dispositivo"""
+    
+    WAITING = "waiting"
+    SUCCESS = "success"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    
+    serial: str
+    status: str
+    
+    @property
+    def finished(self) -> bool:
+        """Indica se o dispositivo já tem resultado final"""
+        return self.status in (self.SUCCESS, self.FAILED, self.CANCELLED)
+
+
+@dataclass
+class InstallProgress(DeviceProgress):
+    """Andamento da instalação em um dispositivo (instalação em lote)"""
+    
+    INSTALLING = "installing"
+    RETRYING = "retrying"
+    
+    attempt: int = 0
+    message: str = ""
+    sent_bytes: int = 0
+    total_bytes: int = 0
+
+
+@dataclass
+class WifiMigrationProgress(DeviceProgress):
+    """Andamento da passagem de um dispositivo USB para WiFi (migração em lote)"""
+    
+    ENABLING = "enabling"        # `adb tcpip` e espera pela porta
+    CONNECTING = "connecting"    # `adb connect`
+    
+    address: str = ""  # ip:porta, assim que o IP é conhecido
+    message: str = ""
 
 
 class ADBManager:
     """Gerenciador de comandos ADB"""
     
-    def __init__(self):
+    def __init__(self, use_native_client: bool = True):
         self.adb_path = "adb"
         
+        # Cliente do protocolo host (None = sempre usa o executável adb)
+        self.client: Optional[ADBClient] = ADBClient() if use_native_client else None
+        
+        # Coleta de informações dos dispositivos em paralelo
+        self.max_parallel_devices = 8      # Dispositivos consultados ao mesmo tempo
+        self.device_info_deadline = 5.0    # Prazo (s) por dispositivo
+        self.device_info_max_age = 60.0    # Validade (s) das informações coletadas
+        
+        # serial -> (transport_id, propriedades, bateria, momento da coleta)
+        self._device_info_cache: Dict[str, Tuple[str, DeviceProperties, str, float]] = {}
+        
+        # Pacotes instalados por dispositivo: serial -> ({pacote: versionCode}, momento da coleta)
+        self.package_cache_max_age = 300.0
+        self._package_cache: Dict[str, Tuple[Dict[str, Optional[int]], float]] = {}
+        # Build conhecido no dispositivo: (serial, pacote) -> (versionCode, digest, lastUpdateTime)
+        self._installed_builds: Dict[Tuple[str, str], Tuple[int, str, str]] = {}
+        # APKs já lidos: caminho -> ((mtime, tamanho), informações, sha256)
+        self._apk_info_cache: Dict[str, Tuple[Tuple[float, int], ApkInfo, str]] = {}
+        self._package_lock = threading.Lock()
+        
+        # IP do dispositivo na rede: serial -> (IP, momento da coleta)
+        self.device_ip_max_age = 120.0
+        self._device_ip_cache: Dict[str, Tuple[str, float]] = {}
+        
+        # Reconexão automática dos dispositivos conectados via WiFi
+        self.connection_supervisor = ConnectionSupervisor(self._reconnect_wifi, self.ping_device)
+        self.wifi_port_timeout = 15.0     # Espera (s) pela porta TCP após o `adb tcpip`
+        
+        # Transferência de arquivos: pausa máxima (s) sem progresso
+        self.sync_stall_timeout = 30.0
+        self.max_parallel_transfers = 4    # Arquivos enviados ao mesmo tempo (sync_directory)
+        
+        # Instalação em lote
+        self.max_parallel_installs = 16    # Instalações simultâneas no total
+        self.installs_per_usb_hub = 4      # Instalações simultâneas por hub USB
+        self.install_retries = 2           # Novas tentativas em falhas passageiras
+        self.install_retry_delay = 2.0     # Espera (s) antes de repetir (cresce a cada tentativa)
+        
+        # Sessões shell persistentes (serial -> sessão)
+        self.use_shell_sessions = True
+        self._shell_sessions: Dict[str, ShellSession] = {}
+        self._shell_sessions_lock = threading.Lock()
+    
+    def get_shell_session(self, serial: str) -> ShellSession:
+        """Retorna a sessão shell persistente do dispositivo (criada sob demanda)"""
+        with self._shell_sessions_lock:
+            session = self._shell_sessions.get(serial)
+            if session is None:
+                session = ShellSession(serial, self.client, self.adb_path)
+                self._shell_sessions[serial] = session
+            return session
+    
+    def close_shell_session(self, serial: str):
+        """Encerra a sessão shell do dispositivo (ex: ao desconectar)"""
+        with self._shell_sessions_lock:
+            session = self._shell_sessions.pop(serial, None)
+        if session:
+            session.close()
+    
+    def close_all_shell_sessions(self):
+        """Encerra todas as sessões shell"""
+        with self._shell_sessions_lock:
+            sessions = list(self._shell_sessions.values())
+            self._shell_sessions.clear()
+        for session in sessions:
+            session.close()
+    
+    def _run_adb(
+        self,
+        args: List[str],
+        timeout: Optional[float],
+        cancel: Optional[CancelToken] = None,
+        text: bool = True
+    ) -> subprocess.CompletedProcess:
+        """
+        Executa o adb com os argumentos informados (equivalente a subprocess.run)
+        
+        Com `cancel`, o processo é morto assim que o cancelamento é solicitado.
+        
+        Raises:
+            JobCancelled: se a operação foi cancelada
+            subprocess.TimeoutExpired: se o comando exceder o timeout
+            FileNotFoundError: se o adb não estiver instalado
+        """
+        full_args = [self.adb_path, *args]
+        process = subprocess.Popen(
+            full_args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=text
+        )
+        
+        if cancel:
+            cancel.add_callback(process.kill)
+        
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        finally:
+            if cancel:
+                cancel.remove_callback(process.kill)
+        
+        if cancel:
+            cancel.raise_if_cancelled()
+        
+        return subprocess.CompletedProcess(full_args, process.returncode, stdout, stderr)
+    
+    def _run_shell(
+        self,
+        serial: str,
+        args: List[str],
+        timeout: Optional[float],
+        cancel: Optional[CancelToken] = None
+    ) -> subprocess.CompletedProcess:
+        """
+        Executa um comando shell no dispositivo
+        
+        Usa a sessão shell persistente do dispositivo; se ela estiver ocupada
+        com outro comando, abre um comando avulso pelo protocolo nativo do
+        servidor ADB, e recorre ao executável adb se o servidor não estiver
+        acessível (ex: ainda não iniciado). Mantém a mesma interface de
+        subprocess.run (text=True).
+        
+        Raises:
+            JobCancelled: se a operação foi cancelada
+            subprocess.TimeoutExpired: se o comando exceder o timeout
+            FileNotFoundError: se o adb não estiver instalado (fallback)
+        """
+        if self.use_shell_sessions:
+            session = self.get_shell_session(serial)
+            try:
+                returncode, output = session.run(" ".join(args), timeout, cancel)
+                return subprocess.CompletedProcess(args, returncode, output, "")
+            except TimeoutError:
+                raise subprocess.TimeoutExpired(args, timeout)
+            except ShellSessionError:
+                pass  # Sessão ocupada ou indisponível: comando avulso
+        
+        if self.client:
+            command = " ".join(args)
+            try:
+                data = self.client.shell(
+                    serial,
+                    f"({command}\n)\necho {EXIT_CODE_MARKER}$?",
+                    timeout=timeout,
+                    cancel=cancel
+                )
+                if cancel:
+                    cancel.raise_if_cancelled()
+                output = data.decode("utf-8", errors="replace")
+                returncode = 0
+                marker_pos = output.rfind(EXIT_CODE_MARKER)
+                if marker_pos >= 0:
+                    code = output[marker_pos + len(EXIT_CODE_MARKER):].strip()
+                    returncode = int(code) if code.isdigit() else 0
+                    output = output[:marker_pos]
+                return subprocess.CompletedProcess(args, returncode, output, "")
+            except ADBProtocolError as e:
+                # Ex: "device 'xyz' not found" - o executável falharia igual
+                return subprocess.CompletedProcess(args, 1, "", str(e))
+            except socket.timeout:
+                raise subprocess.TimeoutExpired(args, timeout)
+            except OSError:
+                pass  # Servidor inacessível: usa o executável adb
+        
+        return self._run_adb(["-s", serial, "shell", *args], timeout, cancel)
+    
+    def _get_devices_output(self) -> Optional[str]:
+        """Retorna a saída de `adb devices -l` (None em caso de erro)"""
+        if self.client:
+            try:
+                return self.client.devices_long()
+            except socket.timeout:
+                return None
+            except (OSError, ADBProtocolError):
+                pass  # Servidor inacessível: o executável adb inicia o servidor
+        
+        result = subprocess.run(
+            [self.adb_path, "devices", "-l"],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        
+        if result.returncode != 0:
+            return None
+        
+        return result.stdout
+        
     def check_adb_available(self) -> bool:
         """Verifica se o ADB está instalado e disponível"""
         try:
@@ -59,68 +445,170 @@ class ADBManager:
         except (FileNotFoundError, subprocess.TimeoutExpired):
             return None
     
-    def list_devices(self) -> List[ADBDevice]:
-        """Lista todos os dispositivos conectados"""
+    def list_devices(self, populate: bool = False) -> List[ADBDevice]:
+        """
+        Lista todos os dispositivos conectados
+        
+        Usa apenas o `adb devices -l` (modelo, produto, transport_id e porta
+        USB vêm da própria listagem) e reaproveita as informações já
+        coletadas de cada conexão. As informações que exigem consultar o
+        dispositivo (fabricante, Android, bateria) ficam para uma segunda
+        etapa, via populate_devices (ou populate=True).
+        """
         try:
-            result = subprocess.run(
-                [self.adb_path, "devices", "-l"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            output = self._get_devices_output()
             
-            if result.returncode != 0:
+            if output is None:
                 return []
             
             devices = []
-            lines = result.stdout.strip().split('\n')[1:]  # Pula a primeira linha "List of devices attached"
+            lines = output.strip().split('\n')
             
             for line in lines:
                 line = line.strip()
-                if not line:
+                # Pula o cabeçalho "List of devices attached" e avisos do daemon
+                if not line or line.startswith("List of devices") or line.startswith("*"):
                     continue
-                    
-                parts = line.split()
-                if len(parts) >= 2:
-                    serial = parts[0]
-                    state = parts[1]
-                    
-                    device = ADBDevice(serial, state)
-                    
-                    # Tenta extrair informações adicionais
-                    if state == "device":
-                        self._populate_device_info(device)
-                    
+                
+                device = ADBDevice.from_devices_line(line)
+                if device:
+                    self._apply_cached_info(device)
                     devices.append(device)
             
-            return devices
-            
         except (FileNotFoundError, subprocess.TimeoutExpired):
             return []
+        
+        if populate:
+            self.populate_devices(devices)
+        
+        return devices
+    
+    def needs_populate(self, device: ADBDevice) -> bool:
+        """Indica se o dispositivo ainda precisa da consulta de informações"""
+        if device.state != "device":
+            return False
+        
+        cached = self._device_info_cache.get(device.serial)
+        return (
+            cached is None
+            or cached[0] != device.transport_id
+            or time.monotonic() - cached[3] > self.device_info_max_age
+        )
+    
+    def _apply_cached_info(self, device: ADBDevice):
+        """Preenche o dispositivo com as informações já coletadas desta conexão"""
+        cached = self._device_info_cache.get(device.serial)
+        if cached is None or cached[0] != device.transport_id:
+            return
+        
+        _, properties, battery_level, _ = cached
+        self._apply_properties(device, properties)
+        device.battery_level = battery_level
+    
+    def populate_devices(
+        self,
+        devices: List[ADBDevice],
+        on_device: Optional[Callable[[ADBDevice], None]] = None
+    ):
+        """
+        Coleta as informações adicionais dos dispositivos em paralelo
+        
+        No máximo `max_parallel_devices` dispositivos são consultados ao mesmo
+        tempo e cada um tem até `device_info_deadline` segundos: um
+        dispositivo travado fica sem as informações, mas não atrasa os demais.
+        
+        Args:
+            devices: Dispositivos a popular (apenas os em estado "device" sem
+                informações recentes - veja needs_populate)
+            on_device: Chamado (da thread de trabalho) a cada dispositivo concluído
+        """
+        ready = [device for device in devices if self.needs_populate(device)]
+        if not ready:
+            return
+        
+        workers = max(1, min(self.max_parallel_devices, len(ready)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="DeviceInfo") as executor:
+            futures = {
+                executor.submit(self._populate_with_deadline, device): device
+                for device in ready
+            }
+            
+            for future in as_completed(futures):
+                device = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"DEBUG: Erro ao obter informações de {device.serial}: {e}")
+                
+                if on_device:
+                    on_device(device)
     
-    def _populate_device_info(self, device: ADBDevice):
-        """Popula informações adicionais do dispositivo"""
-        # Modelo
-        device.model = self._get_device_property(device.serial, "ro.product.model")
+    def _populate_with_deadline(self, device: ADBDevice):
+        """Popula um dispositivo, abortando a consulta ao fim do prazo"""
+        deadline = CancelToken()
+        timer = threading.Timer(self.device_info_deadline, deadline.cancel)
+        timer.daemon = True
+        timer.start()
+        
+        try:
+            self._populate_device_info(device, cancel=deadline)
+        except JobCancelled:
+            print(f"DEBUG: Prazo esgotado ao consultar {device.serial}")
+        finally:
+            timer.cancel()
+    
+    def _populate_device_info(self, device: ADBDevice, cancel: Optional[CancelToken] = None):
+        """Popula informações adicionais do dispositivo (uma única ida ao dispositivo)"""
+        properties, battery_level = self._read_device_snapshot(device.serial, cancel=cancel)
+        
+        self._apply_properties(device, properties)
+        device.battery_level = battery_level
         
-        # Fabricante
-        device.manufacturer = self._get_device_property(device.serial, "ro.product.manufacturer")
+        if properties:
+            self._device_info_cache[device.serial] = (
+                device.transport_id, properties, battery_level, time.monotonic()
+            )
+    
+    def _apply_properties(self, device: ADBDevice, properties: DeviceProperties):
+        """Preenche os campos do dispositivo a partir das propriedades"""
+        device.properties = properties
+        device.model = properties.get_str("ro.product.model", device.model)
+        device.manufacturer = properties.get_str("ro.product.manufacturer")
+        device.android_version = properties.get_str("ro.build.version.release")
+    
+    def _read_device_snapshot(
+        self,
+        serial: str,
+        cancel: Optional[CancelToken] = None
+    ) -> Tuple[DeviceProperties, str]:
+        """
+        Lê todas as propriedades e o nível da bateria em um único comando
         
-        # Versão do Android
-        device.android_version = self._get_device_property(device.serial, "ro.build.version.release")
+        Returns:
+            Tuple (propriedades, nível da bateria)
+        """
+        try:
+            result = self._run_shell(
+                serial,
+                ["getprop;", "echo", f"{BATTERY_SECTION_MARKER};", "dumpsys", "battery"],
+                timeout=5,
+                cancel=cancel
+            )
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            return DeviceProperties(), ""
         
-        # Nível da bateria
-        device.battery_level = self._get_battery_level(device.serial)
+        getprop_output, _, battery_output = result.stdout.partition(BATTERY_SECTION_MARKER)
+        return DeviceProperties.parse(getprop_output), self._parse_battery_level(battery_output)
+    
+    def get_device_properties(self, serial: str) -> DeviceProperties:
+        """Retorna todas as propriedades do sistema do dispositivo"""
+        properties, _ = self._read_device_snapshot(serial)
+        return properties
     
     def _get_device_property(self, serial: str, property_name: str) -> str:
         """Obtém uma propriedade do dispositivo"""
         try:
-            result = subprocess.run(
-                [self.adb_path, "-s", serial, "shell", "getprop", property_name],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = self._run_shell(serial, ["getprop", property_name], timeout=5)
             if result.returncode == 0:
                 return result.stdout.strip()
             return ""
@@ -130,128 +618,1279 @@ class ADBManager:
     def _get_battery_level(self, serial: str) -> str:
         """Obtém o nível da bateria do dispositivo"""
         try:
-            result = subprocess.run(
-                [self.adb_path, "-s", serial, "shell", "dumpsys", "battery"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = self._run_shell(serial, ["dumpsys", "battery"], timeout=5)
             if result.returncode == 0:
-                match = re.search(r'level: (\d+)', result.stdout)
-                if match:
-                    return f"{match.group(1)}%"
+                return self._parse_battery_level(result.stdout)
             return ""
         except (FileNotFoundError, subprocess.TimeoutExpired):
             return ""
     
-    def install_apk(self, serial: str, apk_path: str) -> Tuple[bool, str]:
-        """Instala um APK no dispositivo"""
+    def _parse_battery_level(self, output: str) -> str:
+        """Extrai o nível da bateria da saída do `dumpsys battery`"""
+        match = re.search(r'level: (\d+)', output)
+        if match:
+            return f"{match.group(1)}%"
+        return ""
+    
+    def get_apk_info(self, apk_path: str) -> Optional[ApkInfo]:
+        """Lê pacote, versão e digest do APK (None se não for possível ler)"""
         try:
-            result = subprocess.run(
-                [self.adb_path, "-s", serial, "install", "-r", apk_path],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            stat = os.stat(apk_path)
+        except OSError:
+            return None
+        
+        key = (stat.st_mtime, stat.st_size)
+        with self._package_lock:
+            cached = self._apk_info_cache.get(apk_path)
+        if cached and cached[0] == key:
+            return cached[1]
+        
+        try:
+            info = read_apk_info(apk_path)
+        except ApkParseError as e:
+            print(f"DEBUG: Não foi possível ler {apk_path}: {e}")
+            return None
+        
+        with self._package_lock:
+            self._apk_info_cache[apk_path] = (key, info, "")
+        return info
+    
+    def _get_apk_sha256(self, apk_path: str) -> str:
+        """SHA-256 do APK (calculado uma vez por versão do arquivo)"""
+        with self._package_lock:
+            cached = self._apk_info_cache.get(apk_path)
+        if cached and cached[2]:
+            return cached[2]
+        
+        sha256 = file_sha256(apk_path)
+        with self._package_lock:
+            if apk_path in self._apk_info_cache:
+                key, info, _ = self._apk_info_cache[apk_path]
+                self._apk_info_cache[apk_path] = (key, info, sha256)
+        return sha256
+    
+    def get_installed_packages(
+        self,
+        serial: str,
+        cancel: Optional[CancelToken] = None,
+        refresh: bool = False
+    ) -> Dict[str, Optional[int]]:
+        """
+        Retorna os pacotes instalados e seus versionCodes (None se o Android
+        não informar)
+        
+        O resultado fica em cache por dispositivo até `invalidate_packages`
+        ou `package_cache_max_age` segundos.
+        """
+        with self._package_lock:
+            cached = self._package_cache.get(serial)
+        if cached and not refresh and time.monotonic() - cached[1] <= self.package_cache_max_age:
+            return cached[0]
+        
+        result = self._run_shell(serial, ["pm", "list", "packages", "--show-versioncode"], timeout=15, cancel=cancel)
+        if result.returncode != 0:
+            return {}
+        
+        packages = {
+            match.group(1): int(match.group(2)) if match.group(2) else None
+            for match in PM_PACKAGE_PATTERN.finditer(result.stdout.replace('\r\n', '\n'))
+        }
+        with self._package_lock:
+            self._package_cache[serial] = (packages, time.monotonic())
+        return packages
+    
+    def invalidate_packages(self, serial: str):
+        """Descarta a lista de pacotes e os builds conhecidos do dispositivo (ex: reconectou)"""
+        with self._package_lock:
+            self._package_cache.pop(serial, None)
+            for key in [key for key in self._installed_builds if key[0] == serial]:
+                del self._installed_builds[key]
+    
+    def _get_last_update_time(self, serial: str, package: str, cancel: Optional[CancelToken] = None) -> str:
+        """
+        lastUpdateTime do pacote no dispositivo ("" se não estiver instalado)
+        
+        Muda a cada instalação, inclusive as feitas por fora do AndView
+        (Android Studio, `adb install`), mesmo com o mesmo versionCode.
+        """
+        result = self._run_shell(serial, ["dumpsys", "package", package], timeout=15, cancel=cancel)
+        match = LAST_UPDATE_PATTERN.search(result.stdout) if result.returncode == 0 else None
+        return match.group(1) if match else ""
+    
+    def _record_build(self, serial: str, info: ApkInfo, cancel: Optional[CancelToken] = None):
+        """Guarda o build instalado junto com o lastUpdateTime atual do pacote"""
+        try:
+            last_update = self._get_last_update_time(serial, info.package, cancel)
+        except subprocess.TimeoutExpired:
+            last_update = ""
+        with self._package_lock:
+            if last_update:
+                self._installed_builds[(serial, info.package)] = (info.version_code, info.digest, last_update)
+            else:
+                self._installed_builds.pop((serial, info.package), None)
+    
+    def _update_package_cache(self, serial: str, package: str, version_code: Optional[int]):
+        """Atualiza o cache após instalar (versionCode) ou desinstalar (None) um pacote"""
+        with self._package_lock:
+            cached = self._package_cache.get(serial)
+            if cached is None:
+                return
+            if version_code is None:
+                cached[0].pop(package, None)
+            else:
+                cached[0][package] = version_code
+    
+    def is_apk_installed(self, serial: str, apk_path: str, cancel: Optional[CancelToken] = None) -> bool:
+        """
+        Indica se exatamente este build do APK já está instalado
+        
+        Compara o versionCode com a lista de pacotes do dispositivo e o
+        digest com o último build conhecido, que só vale se o lastUpdateTime
+        do pacote não mudou desde então (instalação ou remoção por fora do
+        AndView). Sem registro válido, compara o SHA-256 do APK instalado com
+        o do arquivo local.
+        """
+        info = self.get_apk_info(apk_path)
+        if info is None:
+            return False
+        
+        installed_version = self.get_installed_packages(serial, cancel=cancel).get(info.package)
+        if installed_version is None or installed_version != info.version_code:
+            return False
+        
+        with self._package_lock:
+            record = self._installed_builds.get((serial, info.package))
+        if record is not None:
+            last_update = self._get_last_update_time(serial, info.package, cancel)
+            if last_update == record[2]:
+                return info.digest != "" and record[:2] == (info.version_code, info.digest)
+            # Pacote reinstalado ou removido por fora do AndView
+            print(f"DEBUG: {info.package} mudou no dispositivo {serial} ({record[2]} -> {last_update or 'removido'})")
+            self.invalidate_packages(serial)
+            if not last_update:
+                return False
+            installed_version = self.get_installed_packages(serial, cancel=cancel).get(info.package)
+            if installed_version != info.version_code:
+                return False
+        
+        # Instalado por fora do AndView: compara o arquivo no dispositivo
+        result = self._run_shell(serial, ["pm", "path", info.package], timeout=10, cancel=cancel)
+        paths = [line[len("package:"):].strip() for line in result.stdout.splitlines() if line.startswith("package:")]
+        if result.returncode != 0 or len(paths) != 1:
+            return False  # Split APKs não correspondem a um único arquivo
+        
+        result = self._run_shell(serial, ["sha256sum", paths[0]], timeout=60, cancel=cancel)
+        remote = result.stdout.split()[0] if result.returncode == 0 and result.stdout.strip() else ""
+        if not remote or remote != self._get_apk_sha256(apk_path):
+            return False
+        
+        self._record_build(serial, info, cancel)
+        return True
+    
+    def install_apk(
+        self,
+        serial: str,
+        apk_path: Union[str, List[str]],
+        cancel: Optional[CancelToken] = None,
+        force: bool = False,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> Tuple[bool, str]:
+        """
+        Instala um APK no dispositivo
+        
+        Aceita um .apk, vários .apk (base + splits) ou um pacote de splits
+        (.apks/.xapk). Os APKs são enviados direto para uma sessão do
+        instalador, sem cópia em /data/local/tmp. Se o mesmo build já estiver
+        instalado, a instalação é ignorada (use force=True para reinstalar).
+        
+        Args:
+            on_progress: Chamado com (bytes enviados, total de bytes)
+        
+        Raises:
+            JobCancelled: se a instalação foi cancelada via `cancel`
+        """
+        paths = [apk_path] if isinstance(apk_path, str) else list(apk_path)
+        single_apk = len(paths) == 1 and not is_split_archive(paths[0])
+        
+        try:
+            if not force and single_apk:
+                try:
+                    installed = self.is_apk_installed(serial, paths[0], cancel=cancel)
+                except subprocess.TimeoutExpired:
+                    installed = False  # Na dúvida, instala
+                if installed:
+                    return True, "Este build do APK já está instalado (instalação ignorada)"
             
-            if result.returncode == 0 and "Success" in result.stdout:
-                return True, "APK instalado com sucesso!"
+            try:
+                splits = collect_splits(paths)
+            except ValueError as e:
+                return False, str(e)
+            
+            if len(splits) > 1:
+                abis = self._get_install_properties(serial, cancel).get_str("ro.product.cpu.abilist")
+                splits = select_splits_for_abis(splits, [abi for abi in abis.split(",") if abi])
+            
+            result = self._install_streamed(serial, splits, on_progress, cancel)
+            if result is None:
+                # Instalador sem sessões (Android antigo): adb install
+                if not all(path.lower().endswith(".apk") for path in paths):
+                    return False, "O dispositivo não suporta instalação de pacotes de splits"
+                command = "install" if len(paths) == 1 else "install-multiple"
+                output = self._run_adb(["-s", serial, command, "-r", *paths], timeout=120, cancel=cancel)
+                result = (
+                    output.returncode == 0 and "Success" in output.stdout,
+                    output.stdout + output.stderr
+                )
+            
+            success, message = result
+            if not success:
+                return False, message
+            
+            if single_apk:
+                info = self.get_apk_info(paths[0])
+                if info is not None:
+                    self._update_package_cache(serial, info.package, info.version_code)
+                    self._record_build(serial, info)
             else:
-                return False, result.stdout + result.stderr
+                self.invalidate_packages(serial)
+            return True, "APK instalado com sucesso!"
                 
         except subprocess.TimeoutExpired:
             return False, "Timeout ao instalar APK"
         except FileNotFoundError:
             return False, "ADB não encontrado"
     
-    def take_screenshot(self, serial: str, output_path: str) -> Tuple[bool, str]:
-        """Captura uma screenshot do dispositivo"""
+    def _get_install_properties(self, serial: str, cancel: Optional[CancelToken] = None) -> DeviceProperties:
+        """Propriedades do dispositivo (do cache de informações, se houver)"""
+        cached = self._device_info_cache.get(serial)
+        if cached:
+            return cached[1]
+        properties, _ = self._read_device_snapshot(serial, cancel=cancel)
+        return properties
+    
+    def get_device_model_key(self, serial: str, cancel: Optional[CancelToken] = None) -> str:
+        """
+        Fabricante e modelo do aparelho (ex: "Google Pixel 7")
+        
+        Lido de ro.product.manufacturer/ro.product.model (do cache de
+        informações ou direto do dispositivo), identifica o modelo e não o
+        aparelho: é a chave das preferências por modelo. Retorna "" se as
+        propriedades não puderem ser lidas.
+        """
+        properties = self._get_install_properties(serial, cancel)
+        model = properties.get_str("ro.product.model")
+        if not model:
+            return ""
+        return " ".join(part for part in (properties.get_str("ro.product.manufacturer"), model) if part)
+    
+    def _package_command(self, serial: str, cancel: Optional[CancelToken] = None) -> str:
+        """`cmd package` (Android 7+) evita iniciar a VM do script `pm` a cada chamada"""
+        sdk = self._get_install_properties(serial, cancel).get_int("ro.build.version.sdk", 0)
+        return "cmd package" if sdk >= 24 else "pm"
+    
+    def _exec_text(self, serial: str, command: str, timeout: float, cancel: Optional[CancelToken] = None) -> str:
+        """Executa um comando via exec (sem PTY) e retorna a saída como texto"""
+        result = self._exec_out(serial, [command], timeout=timeout, cancel=cancel)
+        output = result.stdout + result.stderr
+        return output.decode("utf-8", errors="replace").strip()
+    
+    def _exec_in(
+        self,
+        serial: str,
+        command: str,
+        source,
+        size: int,
+        on_chunk: Callable[[int], None],
+        cancel: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Envia `size` bytes de `source` para a entrada do comando e retorna a saída
+        
+        Usa o serviço exec: do servidor ADB, ou `adb exec-in` se o servidor
+        não estiver acessível. Sem timeout total: uma pausa de mais de
+        INSTALL_STALL_TIMEOUT segundos no envio aborta a operação.
+        
+        Raises:
+            JobCancelled: se a operação foi cancelada
+            subprocess.TimeoutExpired: se a transferência parar
+        """
+        sock = None
+        if self.client:
+            try:
+                sock = self.client.open_service(serial, f"exec:{command}", timeout=INSTALL_STALL_TIMEOUT)
+            except ADBProtocolError as e:
+                return str(e)
+            except OSError:
+                pass  # Servidor inacessível: usa o executável adb
+        
+        if sock is not None:
+            channel = SocketChannel(sock)
+            sock.settimeout(INSTALL_STALL_TIMEOUT)
+        else:
+            process = subprocess.Popen(
+                [self.adb_path, "-s", serial, "exec-in", command],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
+            )
+            channel = ProcessChannel(process)
+        
+        if cancel:
+            cancel.add_callback(channel.close)
+        
         try:
-            # Primeiro, captura a screenshot no dispositivo
-            device_path = "/sdcard/screenshot.png"
+            remaining = size
+            while remaining > 0:
+                chunk = source.read(min(INSTALL_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                channel.write(chunk)
+                remaining -= len(chunk)
+                on_chunk(len(chunk))
             
-            result = subprocess.run(
-                [self.adb_path, "-s", serial, "shell", "screencap", "-p", device_path],
-                capture_output=True,
-                timeout=10
-            )
+            if sock is None:
+                process.stdin.close()
             
-            if result.returncode != 0:
-                return False, "Falha ao capturar screenshot"
+            output = bytearray()
+            while True:
+                chunk = channel.read()
+                if not chunk:
+                    break
+                output.extend(chunk)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(command, INSTALL_STALL_TIMEOUT)
+        except OSError as e:
+            if cancel:
+                cancel.raise_if_cancelled()
+            return f"Falha ao enviar APK: {e}"
+        finally:
+            if cancel:
+                cancel.remove_callback(channel.close)
+            channel.close()
+        
+        if cancel:
+            cancel.raise_if_cancelled()
+        return bytes(output).decode("utf-8", errors="replace").strip()
+    
+    def _install_streamed(
+        self,
+        serial: str,
+        splits: List[ApkSplit],
+        on_progress: Optional[Callable[[int, int], None]],
+        cancel: Optional[CancelToken]
+    ) -> Optional[Tuple[bool, str]]:
+        """
+        Instala os APKs em uma sessão do instalador (install-create/write/commit)
+        
+        Cada APK é transmitido direto para o instalador; nenhum arquivo é
+        copiado no dispositivo. Retorna None se o dispositivo não suportar
+        sessões de instalação.
+        """
+        package_command = self._package_command(serial, cancel)
+        total = sum(split.size for split in splits)
+        
+        output = self._exec_text(serial, f"{package_command} install-create -r -S {total}", 30, cancel)
+        match = INSTALL_SESSION_PATTERN.search(output)
+        if not output.startswith("Success") or not match:
+            print(f"DEBUG: Sessão de instalação indisponível: {output}")
+            return None
+        session_id = match.group(1)
+        
+        sent = 0
+        
+        def report(size: int):
+            nonlocal sent
+            sent += size
+            if on_progress:
+                on_progress(sent, total)
+        
+        committed = False
+        try:
+            for index, split in enumerate(splits):
+                name = shlex.quote(f"{index}_{os.path.basename(split.name)}")
+                command = f"{package_command} install-write -S {split.size} {session_id} {name} -"
+                with split.open() as source:
+                    output = self._exec_in(serial, command, source, split.size, report, cancel)
+                if not output.startswith("Success"):
+                    return False, output or f"Falha ao enviar {split.name}"
             
-            # Depois, puxa a screenshot para o computador
-            result = subprocess.run(
-                [self.adb_path, "-s", serial, "pull", device_path, output_path],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            output = self._exec_text(serial, f"{package_command} install-commit {session_id}", 300, cancel)
+            committed = True
+            return output.startswith("Success"), output
+        finally:
+            if not committed:
+                try:
+                    self._exec_text(serial, f"{package_command} install-abandon {session_id}", 10)
+                except (subprocess.TimeoutExpired, OSError):
+                    pass
+    
+    def uninstall_package(self, serial: str, package: str) -> Tuple[bool, str]:
+        """Desinstala um pacote do dispositivo"""
+        try:
+            result = self._run_shell(serial, ["pm", "uninstall", package], timeout=60)
             
-            if result.returncode == 0:
-                # Remove a screenshot do dispositivo
-                subprocess.run(
-                    [self.adb_path, "-s", serial, "shell", "rm", device_path],
-                    capture_output=True,
-                    timeout=5
-                )
-                return True, f"Screenshot salva em: {output_path}"
+            if result.returncode == 0 and "Success" in result.stdout:
+                with self._package_lock:
+                    self._installed_builds.pop((serial, package), None)
+                self._update_package_cache(serial, package, None)
+                return True, f"{package} desinstalado"
             else:
-                return False, "Falha ao transferir screenshot"
+                return False, result.stdout + result.stderr
                 
         except subprocess.TimeoutExpired:
-            return False, "Timeout ao capturar screenshot"
+            return False, "Timeout ao desinstalar pacote"
         except FileNotFoundError:
             return False, "ADB não encontrado"
     
-    def push_file(self, serial: str, local_path: str, remote_path: str) -> Tuple[bool, str]:
-        """Envia um arquivo para o dispositivo"""
+    @staticmethod
+    def usb_hub_key(device: ADBDevice) -> str:
+        """
+        Identifica o hub USB ao qual o dispositivo está ligado
+        
+        Usa o campo `usb:` do `adb devices -l` (ex: 1-4.2 -> hub 1-4).
+        Dispositivos via rede não compartilham hub: cada um é seu próprio
+        grupo. Formatos de caminho desconhecidos são agrupados juntos.
+        """
+        if not device.usb:
+            if ":" in device.serial:
+                return f"tcp:{device.serial}"
+            return "usb"
+        
+        match = USB_PATH_PATTERN.match(device.usb)
+        if not match:
+            return "usb"
+        
+        bus, ports = match.groups()
+        if "." not in ports:
+            return f"usb:{bus}"  # Direto no hub raiz do barramento
+        return f"usb:{bus}-{ports.rsplit('.', 1)[0]}"
+    
+    @staticmethod
+    def is_usb_device(device: ADBDevice) -> bool:
+        """Indica se o dispositivo está ligado por USB (não via rede nem emulador)"""
+        if device.usb:
+            return True
+        serial = device.serial
+        return ":" not in serial and "._adb" not in serial and not serial.startswith("emulator-")
+    
+    @staticmethod
+    def is_transient_install_error(message: str) -> bool:
+        """Indica se a falha de instalação é passageira (ex: conexão caiu)"""
+        lowered = message.lower()
+        return any(error in lowered for error in TRANSIENT_INSTALL_ERRORS)
+    
+    def install_apk_bulk(
+        self,
+        devices: List[ADBDevice],
+        apk_path: Union[str, List[str]],
+        on_progress: Optional[Callable[[InstallProgress], None]] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> Dict[str, Tuple[bool, str]]:
+        """
+        Instala um APK em vários dispositivos ao mesmo tempo
+        
+        No máximo `max_parallel_installs` instalações rodam juntas, e no
+        máximo `installs_per_usb_hub` por hub USB, para não saturar a banda
+        de um hub compartilhado. Falhas passageiras são repetidas até
+        `install_retries` vezes.
+        
+        Args:
+            devices: Dispositivos de destino
+            apk_path: Caminho do APK (ou lista de APKs/pacote de splits)
+            on_progress: Chamado (das threads de trabalho) a cada mudança de
+                estado de um dispositivo e a cada 1% enviado
+            cancel: Cancela as instalações em andamento e as que aguardam
+        
+        Returns:
+            Dict serial -> (sucesso, mensagem)
+        """
+        results: Dict[str, Tuple[bool, str]] = {}
+        if not devices:
+            return results
+        
+        hubs: Dict[str, threading.Semaphore] = {}
+        for device in devices:
+            key = self.usb_hub_key(device)
+            if key not in hubs:
+                hubs[key] = threading.Semaphore(self.installs_per_usb_hub)
+        
+        def report(serial: str, status: str, attempt: int = 0, message: str = "", sent: int = 0, total: int = 0):
+            if on_progress:
+                on_progress(InstallProgress(serial, status, attempt, message, sent, total))
+        
+        for device in devices:
+            report(device.serial, InstallProgress.WAITING)
+        
+        workers = max(1, min(self.max_parallel_installs, len(devices)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Install") as executor:
+            futures = {
+                executor.submit(
+                    self._install_with_retries,
+                    device.serial,
+                    apk_path,
+                    hubs[self.usb_hub_key(device)],
+                    report,
+                    cancel
+                ): device
+                for device in devices
+            }
+            
+            for future in as_completed(futures):
+                device = futures[future]
+                try:
+                    results[device.serial] = future.result()
+                except Exception as e:
+                    print(f"DEBUG: Erro ao instalar em {device.serial}: {e}")
+                    results[device.serial] = (False, str(e))
+                    report(device.serial, InstallProgress.FAILED, message=str(e))
+        
+        return results
+    
+    def _install_with_retries(
+        self,
+        serial: str,
+        apk_path: Union[str, List[str]],
+        hub: threading.Semaphore,
+        report: Callable[..., None],
+        cancel: Optional[CancelToken]
+    ) -> Tuple[bool, str]:
+        """Instala em um dispositivo respeitando o limite do hub e repetindo falhas passageiras"""
+        token = cancel or CancelToken()
+        success, message = False, ""
+        
+        for attempt in range(1, self.install_retries + 2):
+            # Aguarda uma vaga no hub sem ignorar o cancelamento
+            while not hub.acquire(timeout=0.2):
+                if token.cancelled:
+                    break
+            else:
+                try:
+                    report(serial, InstallProgress.INSTALLING, attempt)
+                    
+                    last_percent = -1
+                    
+                    def on_bytes(sent: int, total: int):
+                        nonlocal last_percent
+                        percent = sent * 100 // total if total else 100
+                        if percent != last_percent:
+                            last_percent = percent
+                            report(serial, InstallProgress.INSTALLING, attempt, "", sent, total)
+                    
+                    success, message = self.install_apk(serial, apk_path, cancel=token, on_progress=on_bytes)
+                except JobCancelled:
+                    pass
+                finally:
+                    hub.release()
+            
+            if token.cancelled:
+                report(serial, InstallProgress.CANCELLED, attempt, "Instalação cancelada")
+                return False, "Instalação cancelada"
+            
+            if success:
+                report(serial, InstallProgress.SUCCESS, attempt, message)
+                return True, message
+            
+            message = message.strip()
+            if attempt > self.install_retries or not self.is_transient_install_error(message):
+                break
+            
+            report(serial, InstallProgress.RETRYING, attempt, message)
+            if token.wait(self.install_retry_delay * attempt):
+                report(serial, InstallProgress.CANCELLED, attempt, "Instalação cancelada")
+                return False, "Instalação cancelada"
+        
+        report(serial, InstallProgress.FAILED, attempt, message)
+        return False, message
+    
+    def _exec_out(
+        self,
+        serial: str,
+        args: List[str],
+        timeout: Optional[float],
+        cancel: Optional[CancelToken] = None
+    ) -> subprocess.CompletedProcess:
+        """
+        Executa um comando via `exec-out` e retorna a saída binária (stdout em bytes)
+        
+        Usa o serviço exec: do servidor ADB e recorre ao executável adb se o
+        servidor não estiver acessível. O serviço nativo não informa o código
+        de saída: saída vazia é tratada como falha.
+        
+        Raises:
+            JobCancelled: se a operação foi cancelada
+            subprocess.TimeoutExpired: se o comando exceder o timeout
+            FileNotFoundError: se o adb não estiver instalado (fallback)
+        """
+        if self.client:
+            try:
+                data = self.client.exec_out(serial, " ".join(args), timeout=timeout, cancel=cancel)
+                if cancel:
+                    cancel.raise_if_cancelled()
+                return subprocess.CompletedProcess(args, 0 if data else 1, data, b"")
+            except ADBProtocolError as e:
+                return subprocess.CompletedProcess(args, 1, b"", str(e).encode())
+            except socket.timeout:
+                raise subprocess.TimeoutExpired(args, timeout)
+            except OSError:
+                pass  # Servidor inacessível: usa o executável adb
+        
+        return self._run_adb(["-s", serial, "exec-out", *args], timeout, cancel, text=False)
+    
+    def capture_screenshot(
+        self,
+        serial: str,
+        raw: bool = False,
+        cancel: Optional[CancelToken] = None
+    ) -> Union[bytes, RawFrame]:
+        """
+        Captura a tela direto para a memória (sem arquivo no dispositivo)
+        
+        Args:
+            serial: Serial do dispositivo
+            raw: Se True, retorna o framebuffer sem compressão (RawFrame),
+                evitando a codificação PNG no dispositivo; senão, os bytes PNG
+        
+        Raises:
+            RuntimeError: se a captura falhar
+            JobCancelled: se a captura foi cancelada via `cancel`
+            subprocess.TimeoutExpired: se a captura exceder o timeout
+            FileNotFoundError: se o adb não estiver instalado
+        """
+        args = ["screencap"] if raw else ["screencap", "-p"]
+        result = self._exec_out(serial, args, timeout=15, cancel=cancel)
+        
+        if result.returncode != 0 or not result.stdout:
+            error = result.stderr.decode("utf-8", errors="replace").strip()
+            raise RuntimeError(error or "Falha ao capturar screenshot")
+        
+        if not raw:
+            return result.stdout
+        
         try:
-            result = subprocess.run(
-                [self.adb_path, "-s", serial, "push", local_path, remote_path],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            return parse_raw_screencap(result.stdout)
+        except ValueError as e:
+            raise RuntimeError(f"Captura inválida: {e}")
+    
+    def take_screenshot(self, serial: str, output_path: str, cancel: Optional[CancelToken] = None) -> Tuple[bool, str]:
+        """
+        Captura uma screenshot do dispositivo
+        
+        Captura o framebuffer bruto e codifica o PNG no host; formatos sem
+        conversão direta usam o PNG gerado pelo próprio dispositivo.
+        
+        Raises:
+            JobCancelled: se a captura foi cancelada via `cancel`
+        """
+        try:
+            try:
+                frame = self.capture_screenshot(serial, raw=True, cancel=cancel)
+                png_data = encode_png(frame)
+            except (RuntimeError, ValueError):
+                png_data = self.capture_screenshot(serial, raw=False, cancel=cancel)
+            
+            with open(output_path, "wb") as f:
+                f.write(png_data)
+            
+            return True, f"Screenshot salva em: {output_path}"
+                
+        except RuntimeError as e:
+            return False, str(e)
+        except OSError as e:
+            if isinstance(e, FileNotFoundError) and e.filename == self.adb_path:
+                return False, "ADB não encontrado"
+            return False, f"Falha ao salvar screenshot: {e}"
+        except subprocess.TimeoutExpired:
+            return False, "Timeout ao capturar screenshot"
+    
+    def open_sync(self, serial: str) -> SyncConnection:
+        """
+        Abre uma conexão `sync:` com o dispositivo (use como context manager)
+        
+        Raises:
+            OSError: se o servidor ADB não estiver acessível
+            ADBProtocolError: se o dispositivo não for encontrado
+        """
+        if not self.client:
+            raise ConnectionRefusedError("Cliente nativo desativado")
+        return SyncConnection(self.client, serial, stall_timeout=self.sync_stall_timeout)
+    
+    def _open_sync_or_none(self, serial: str) -> Union[SyncConnection, str, None]:
+        """
+        Abre a conexão sync para push/pull
+        
+        Returns:
+            A conexão, a mensagem de erro do servidor (ex: dispositivo não
+            encontrado) ou None se o servidor não estiver acessível (usar o
+            executável adb)
+        """
+        try:
+            return self.open_sync(serial)
+        except ADBProtocolError as e:
+            return str(e)
+        except OSError as e:
+            print(f"DEBUG: Protocolo sync indisponível ({e}), usando o executável adb")
+            return None
+    
+    def push_file(
+        self,
+        serial: str,
+        local_path: str,
+        remote_path: str,
+        on_progress: Optional[Callable[[TransferProgress], None]] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> Tuple[bool, str]:
+        """
+        Envia um arquivo para o dispositivo
+        
+        Usa o protocolo sync nativo (sem timeout total; aborta se a
+        transferência parar por `sync_stall_timeout` segundos). Se o destino
+        for um diretório, o arquivo é criado dentro dele, como no adb push.
+        
+        Raises:
+            JobCancelled: se a transferência foi cancelada via `cancel`
+        """
+        if not os.path.isfile(local_path):
+            return False, f"Arquivo não encontrado: {local_path}"
+        
+        sync = self._open_sync_or_none(serial)
+        if isinstance(sync, str):
+            return False, sync
+        
+        if sync is not None:
+            try:
+                with sync:
+                    if sync.stat(remote_path).is_dir:
+                        remote_path = f"{remote_path.rstrip('/')}/{os.path.basename(local_path)}"
+                    sync.push(local_path, remote_path, on_progress=on_progress, cancel=cancel)
+                return True, f"Arquivo enviado para: {remote_path}"
+            except (SyncError, OSError) as e:
+                return False, f"Falha ao enviar arquivo: {e}"
+        
+        try:
+            result = self._run_adb(["-s", serial, "push", local_path, remote_path], timeout=None, cancel=cancel)
             
             if result.returncode == 0:
                 return True, f"Arquivo enviado para: {remote_path}"
             else:
                 return False, result.stdout + result.stderr
                 
-        except subprocess.TimeoutExpired:
-            return False, "Timeout ao enviar arquivo"
         except FileNotFoundError:
             return False, "ADB não encontrado"
     
-    def pull_file(self, serial: str, remote_path: str, local_path: str) -> Tuple[bool, str]:
-        """Baixa um arquivo do dispositivo"""
+    def _remote_file_size(self, serial: str, remote_path: str, cancel: Optional[CancelToken] = None) -> Optional[int]:
+        """Tamanho real do arquivo (o STAT do sync trunca acima de 4 GB)"""
         try:
-            result = subprocess.run(
-                [self.adb_path, "-s", serial, "pull", remote_path, local_path],
-                capture_output=True,
-                text=True,
-                timeout=60
+            result = self._run_shell(serial, ["stat", "-c", "%s", shlex.quote(remote_path)], timeout=15, cancel=cancel)
+        except subprocess.TimeoutExpired:
+            return None
+        output = result.stdout.strip()
+        return int(output) if result.returncode == 0 and output.isdigit() else None
+    
+    def _remote_checksum(
+        self,
+        serial: str,
+        remote_path: str,
+        length: Optional[int] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Checksum calculado no dispositivo (do arquivo ou dos primeiros `length` bytes)
+        
+        Returns:
+            (algoritmo, hex) com a primeira ferramenta disponível em
+            CHECKSUM_TOOLS, ou None se nenhuma funcionar
+        
+        Raises:
+            subprocess.TimeoutExpired: se o cálculo exceder CHECKSUM_TIMEOUT
+        """
+        quoted = shlex.quote(remote_path)
+        for algorithm, digits in CHECKSUM_TOOLS:
+            if length is None:
+                command = f"{algorithm}sum {quoted}"
+            else:
+                command = f"head -c {length} {quoted} | {algorithm}sum"
+            result = self._run_shell(serial, [command], timeout=CHECKSUM_TIMEOUT, cancel=cancel)
+            match = re.match(rf'\s*([0-9a-fA-F]{{{digits}}})\b', result.stdout)
+            if result.returncode == 0 and match:
+                return algorithm, match.group(1).lower()
+        return None
+    
+    @staticmethod
+    def _hash_local_file(path: str, algorithm: str):
+        """Objeto hashlib com o conteúdo do arquivo (pode continuar recebendo dados)"""
+        digest = hashlib.new(algorithm)
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest
+    
+    def _resume_offset(
+        self,
+        serial: str,
+        remote_path: str,
+        partial_path: str,
+        size: int,
+        cancel: Optional[CancelToken] = None
+    ):
+        """
+        Verifica se o download parcial pode ser retomado
+        
+        O arquivo parcial só é aproveitado se os seus bytes forem idênticos
+        ao início do arquivo no dispositivo (checksum dos dois lados).
+        
+        Returns:
+            (offset, hashlib do trecho já baixado) ou (0, None) para recomeçar
+        """
+        try:
+            offset = os.path.getsize(partial_path)
+        except OSError:
+            return 0, None
+        if offset <= 0 or offset > size:
+            return 0, None
+        
+        remote = self._remote_checksum(serial, remote_path, length=offset, cancel=cancel)
+        if remote is None:
+            return 0, None
+        
+        algorithm, remote_digest = remote
+        digest = self._hash_local_file(partial_path, algorithm)
+        if digest.hexdigest() != remote_digest:
+            print(f"DEBUG: Download parcial de {remote_path} não confere com o dispositivo, recomeçando")
+            return 0, None
+        return offset, digest
+    
+    def _exec_read(
+        self,
+        serial: str,
+        command: str,
+        handle,
+        on_chunk: Callable[[memoryview], None],
+        cancel: Optional[CancelToken] = None
+    ) -> int:
+        """
+        Grava em `handle` a saída binária do comando, à medida que chega
+        
+        Usa o serviço exec: do servidor ADB, ou `adb exec-out` se o servidor
+        não estiver acessível. Sem timeout total: no serviço nativo, uma
+        pausa de mais de `sync_stall_timeout` segundos aborta a leitura.
+        
+        Raises:
+            JobCancelled: se a operação foi cancelada
+            subprocess.TimeoutExpired: se a transferência parar
+            OSError: se a conexão falhar
+        """
+        sock = None
+        if self.client:
+            try:
+                sock = self.client.open_service(serial, f"exec:{command}", timeout=self.sync_stall_timeout)
+            except ADBProtocolError as e:
+                raise OSError(str(e))
+            except OSError:
+                pass  # Servidor inacessível: usa o executável adb
+        
+        if sock is not None:
+            channel = SocketChannel(sock)
+            sock.settimeout(self.sync_stall_timeout)
+        else:
+            process = subprocess.Popen(
+                [self.adb_path, "-s", serial, "exec-out", command],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
             )
+            channel = ProcessChannel(process)
+        
+        if cancel:
+            cancel.add_callback(channel.close)
+        
+        received = 0
+        try:
+            while True:
+                chunk = channel.read()
+                if not chunk:
+                    break
+                handle.write(chunk)
+                on_chunk(memoryview(chunk))
+                received += len(chunk)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(command, self.sync_stall_timeout)
+        except OSError:
+            if cancel:
+                cancel.raise_if_cancelled()
+            raise
+        finally:
+            if cancel:
+                cancel.remove_callback(channel.close)
+            channel.close()
+        
+        if cancel:
+            cancel.raise_if_cancelled()
+        return received
+    
+    def pull_file(
+        self,
+        serial: str,
+        remote_path: str,
+        local_path: str,
+        on_progress: Optional[Callable[[TransferProgress], None]] = None,
+        cancel: Optional[CancelToken] = None,
+        resume: bool = True
+    ) -> Tuple[bool, str]:
+        """
+        Baixa um arquivo do dispositivo
+        
+        Usa o protocolo sync nativo (sem timeout total; aborta se a
+        transferência parar por `sync_stall_timeout` segundos). Se o destino
+        local for um diretório, o arquivo é criado dentro dele.
+        
+        O download é gravado em `<destino>.part` e só é renomeado depois que
+        o checksum calculado no dispositivo confere. Se falhar ou for
+        cancelado, o arquivo parcial é mantido: com `resume`, a próxima
+        chamada confere o trecho já baixado e continua a partir dele.
+        
+        Raises:
+            JobCancelled: se a transferência foi cancelada via `cancel`
+        """
+        if os.path.isdir(local_path):
+            local_path = os.path.join(local_path, os.path.basename(remote_path.rstrip("/")))
+        partial_path = local_path + PARTIAL_DOWNLOAD_SUFFIX
+        
+        sync = self._open_sync_or_none(serial)
+        if isinstance(sync, str):
+            return False, sync
+        
+        if sync is None:
+            return self._pull_with_adb(serial, remote_path, local_path, cancel)
+        
+        offset = 0
+        try:
+            with sync:
+                remote = sync.stat(remote_path)
+                if not remote.exists:
+                    return False, f"Arquivo não encontrado no dispositivo: {remote_path}"
+                if not remote.is_file:
+                    return False, f"Não é um arquivo: {remote_path}"
+                
+                size = self._remote_file_size(serial, remote_path, cancel)
+                if size is None:
+                    size = remote.size
+                
+                digest = None
+                if resume:
+                    offset, digest = self._resume_offset(serial, remote_path, partial_path, size, cancel)
+                
+                if not offset:
+                    digest = hashlib.new(CHECKSUM_TOOLS[0][0])
+                    sync.pull(remote_path, partial_path, on_progress=on_progress, cancel=cancel, total=size, digest=digest)
+            
+            if offset:
+                print(f"DEBUG: Retomando download de {remote_path} a partir de {format_size(offset)}")
+                reporter = ProgressReporter(size, on_progress, resumed_from=offset)
+                
+                def on_chunk(chunk: memoryview):
+                    digest.update(chunk)
+                    reporter.add(len(chunk))
+                
+                # tail -c +N começa no N-ésimo byte (contado a partir de 1)
+                command = f"tail -c +{offset + 1} {shlex.quote(remote_path)}"
+                with open(partial_path, "ab") as handle:
+                    self._exec_read(serial, command, handle, on_chunk, cancel)
+                reporter.finish()
+            
+            ok, message = self._verify_pull(serial, remote_path, partial_path, digest, size, cancel)
+            if not ok:
+                return False, message
+            os.replace(partial_path, local_path)
+            if message:
+                return True, f"Arquivo baixado para: {local_path} ({message})"
+            return True, f"Arquivo baixado para: {local_path}"
+        
+        except (SyncError, OSError, subprocess.TimeoutExpired) as e:
+            if isinstance(e, subprocess.TimeoutExpired):
+                reason = f"transferência parada há mais de {self.sync_stall_timeout:.0f}s"
+            else:
+                reason = str(e)
+            try:
+                kept = os.path.getsize(partial_path)
+            except OSError:
+                kept = 0
+            if kept:
+                return False, (
+                    f"Falha ao baixar arquivo: {reason} "
+                    f"({format_size(kept)} mantidos em {partial_path}; a próxima tentativa continua de onde parou)"
+                )
+            return False, f"Falha ao baixar arquivo: {reason}"
+    
+    def _verify_pull(
+        self,
+        serial: str,
+        remote_path: str,
+        partial_path: str,
+        digest,
+        size: int,
+        cancel: Optional[CancelToken] = None
+    ) -> Tuple[bool, str]:
+        """
+        Compara o arquivo baixado com o checksum calculado no dispositivo
+        
+        Sem ferramenta de checksum no dispositivo, confere só o tamanho (o
+        download nunca é retomado nesse caso: retomar exige o checksum do
+        trecho já baixado). Se não conferir, o arquivo parcial é removido
+        (não serve para retomar).
+        
+        Returns:
+            (confere, mensagem): com sucesso, a mensagem avisa se o arquivo
+            não pôde ser verificado por checksum
+        """
+        remote = self._remote_checksum(serial, remote_path, cancel=cancel)
+        if remote is None:
+            print(f"DEBUG: Sem ferramenta de checksum no dispositivo, {remote_path} conferido só pelo tamanho")
+            local_size = os.path.getsize(partial_path)
+            if local_size == size:
+                return True, "não verificado: o dispositivo não tem sha256sum/md5sum, conferido só o tamanho"
+            try:
+                os.remove(partial_path)
+            except OSError:
+                pass
+            return False, (
+                f"Arquivo baixado não confere com o dispositivo (tamanho diferente: "
+                f"{format_size(local_size)} baixados, {format_size(size)} no dispositivo), baixe novamente"
+            )
+        
+        algorithm, remote_digest = remote
+        if digest.name != algorithm:
+            digest = self._hash_local_file(partial_path, algorithm)
+        if digest.hexdigest() == remote_digest:
+            return True, ""
+        
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
+        return False, f"Arquivo baixado não confere com o dispositivo ({algorithm} diferente), baixe novamente"
+    
+    def _pull_with_adb(
+        self,
+        serial: str,
+        remote_path: str,
+        local_path: str,
+        cancel: Optional[CancelToken] = None
+    ) -> Tuple[bool, str]:
+        """Baixa um arquivo com `adb pull` (servidor inacessível pelo protocolo nativo)"""
+        try:
+            result = self._run_adb(["-s", serial, "pull", remote_path, local_path], timeout=None, cancel=cancel)
             
             if result.returncode == 0:
                 return True, f"Arquivo baixado para: {local_path}"
             else:
                 return False, result.stdout + result.stderr
                 
-        except subprocess.TimeoutExpired:
-            return False, "Timeout ao baixar arquivo"
         except FileNotFoundError:
             return False, "ADB não encontrado"
     
-    def execute_command(self, serial: str, command: str) -> Tuple[bool, str]:
-        """Executa um comando shell no dispositivo"""
+    def plan_directory_sync(
+        self,
+        serial: str,
+        local_dir: str,
+        remote_dir: str,
+        use_hash: bool = False,
+        delete: bool = False,
+        cancel: Optional[CancelToken] = None
+    ) -> SyncPlan:
+        """
+        Compara um diretório local com um diretório do dispositivo
+        
+        O manifesto remoto vem de um único `find ... stat`. Com use_hash, só
+        os arquivos de mesmo tamanho dos dois lados são comparados por hash
+        (`sha256sum` dos candidatos, em lotes).
+        
+        Raises:
+            RuntimeError: se o manifesto do dispositivo não puder ser lido
+            JobCancelled: se cancelado via `cancel`
+        """
+        remote_dir = remote_dir.rstrip("/") or "/"
+        quoted = shlex.quote(remote_dir)
+        local = scan_local(local_dir)
+        
         try:
-            result = subprocess.run(
-                [self.adb_path, "-s", serial, "shell", command],
-                capture_output=True,
-                text=True,
-                timeout=30
+            result = self._run_shell(
+                serial,
+                [f"[ ! -d {quoted} ] || find {quoted} -type f -exec stat -c '%s %Y %n' {{}} +"],
+                timeout=120,
+                cancel=cancel
             )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("Timeout ao listar os arquivos do dispositivo")
+        if result.returncode != 0:
+            raise RuntimeError(f"Falha ao listar {remote_dir}: {result.stdout.strip()}")
+        remote = parse_remote_stat(result.stdout, remote_dir)
+        
+        if use_hash:
+            candidates = [
+                path for path, entry in local.items()
+                if path in remote and remote[path].size == entry.size
+            ]
+            if candidates:
+                prefix = remote_dir.rstrip("/") + "/"
+                batches: List[List[str]] = [[]]
+                length = 0
+                for path in candidates:
+                    argument = shlex.quote(prefix + path)
+                    if batches[-1] and length + len(argument) > HASH_BATCH_CHARS:
+                        batches.append([])
+                        length = 0
+                    batches[-1].append(argument)
+                    length += len(argument) + 1
+                
+                for batch in batches:
+                    try:
+                        result = self._run_shell(serial, ["sha256sum", *batch], timeout=None, cancel=cancel)
+                    except subprocess.TimeoutExpired:
+                        raise RuntimeError("Timeout ao calcular os hashes no dispositivo")
+                    for path, digest in parse_remote_hashes(result.stdout, remote_dir).items():
+                        if path in remote:
+                            remote[path].digest = digest
+                for path in candidates:
+                    if cancel:
+                        cancel.raise_if_cancelled()
+                    local[path].digest = file_sha256(os.path.join(local_dir, *path.split("/")))
+        
+        return build_plan(local_dir, remote_dir, local, remote, use_hash=use_hash, delete=delete)
+    
+    def sync_directory(
+        self,
+        serial: str,
+        local_dir: str,
+        remote_dir: str,
+        use_hash: bool = False,
+        delete: bool = False,
+        dry_run: bool = False,
+        on_progress: Optional[Callable[[TransferProgress], None]] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> Tuple[bool, str]:
+        """
+        Espelha um diretório local no dispositivo, enviando só o que mudou
+        
+        Até `max_parallel_transfers` arquivos são enviados ao mesmo tempo,
+        cada um em sua própria conexão sync. A data de modificação local é
+        preservada no dispositivo, de modo que a próxima sincronização
+        reconhece os arquivos como iguais.
+        
+        Args:
+            use_hash: Compara também o conteúdo (SHA-256) dos arquivos de
+                mesmo tamanho, em vez da data de modificação
+            delete: Remove do dispositivo arquivos que não existem localmente
+            dry_run: Apenas retorna o relatório do que seria feito
+            on_progress: Progresso agregado dos envios
+        
+        Returns:
+            Tuple (sucesso, relatório)
+        
+        Raises:
+            JobCancelled: se cancelado via `cancel`
+        """
+        if not os.path.isdir(local_dir):
+            return False, f"Diretório não encontrado: {local_dir}"
+        
+        try:
+            plan = self.plan_directory_sync(serial, local_dir, remote_dir, use_hash, delete, cancel)
+        except RuntimeError as e:
+            return False, str(e)
+        
+        if dry_run or plan.is_empty:
+            return True, plan.summary()
+        
+        errors = []
+        total = plan.push_bytes
+        started = time.monotonic()
+        transferred: Dict[str, int] = {}
+        progress_lock = threading.Lock()
+        
+        def file_progress(path: str, progress: TransferProgress):
+            if not on_progress:
+                return
+            with progress_lock:
+                transferred[path] = progress.transferred
+                done = sum(transferred.values())
+            on_progress(TransferProgress(done, total, time.monotonic() - started))
+        
+        # Maiores primeiro: distribui melhor a carga entre as conexões
+        pending = queue.Queue()
+        for entry in sorted(plan.to_push, key=lambda entry: entry.size, reverse=True):
+            pending.put(entry)
+        
+        def worker():
+            """Envia arquivos da fila reaproveitando uma conexão sync"""
+            sync = self._open_sync_or_none(serial)
+            if isinstance(sync, str):
+                errors.append(sync)
+                return
+            
+            try:
+                while True:
+                    if cancel:
+                        cancel.raise_if_cancelled()
+                    try:
+                        entry = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    
+                    local_path = plan.local_path(entry)
+                    remote_path = plan.remote_path(entry.path)
+                    report = lambda progress, path=entry.path: file_progress(path, progress)
+                    
+                    if sync is None:
+                        # Servidor inacessível: adb push por arquivo
+                        success, message = self.push_file(serial, local_path, remote_path, report, cancel)
+                        if not success:
+                            errors.append(f"{entry.path}: {message}")
+                        continue
+                    
+                    try:
+                        sync.push(local_path, remote_path, on_progress=report, cancel=cancel)
+                    except (SyncError, OSError) as e:
+                        errors.append(f"{entry.path}: {e}")
+                        # O dispositivo encerra a conexão após uma falha
+                        sync.close()
+                        sync = self._open_sync_or_none(serial)
+                        if not isinstance(sync, SyncConnection):
+                            sync = None
+                            return
+            finally:
+                if sync is not None:
+                    sync.close()
+        
+        if plan.to_push:
+            workers = max(1, min(self.max_parallel_transfers, len(plan.to_push)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="DirSync") as executor:
+                for future in [executor.submit(worker) for _ in range(workers)]:
+                    future.result()
+            
+            while not pending.empty():
+                errors.append(f"{pending.get_nowait().path}: não enviado (conexão perdida)")
+        
+        if plan.to_delete:
+            paths = " ".join(shlex.quote(plan.remote_path(path)) for path in plan.to_delete)
+            try:
+                result = self._run_shell(serial, [f"rm -f {paths}"], timeout=60, cancel=cancel)
+                if result.returncode != 0:
+                    errors.append(f"Falha ao remover arquivos: {result.stdout.strip()}")
+            except subprocess.TimeoutExpired:
+                errors.append("Timeout ao remover arquivos")
+        
+        report = plan.summary()
+        if errors:
+            return False, report + "\n\nErros:\n" + "\n".join(errors)
+        return True, report
+    
+    def execute_command(self, serial: str, command: str, cancel: Optional[CancelToken] = None) -> Tuple[bool, str]:
+        """
+        Executa um comando shell no dispositivo
+        
+        Raises:
+            JobCancelled: se o comando foi cancelado via `cancel`
+        """
+        try:
+            result = self._run_shell(serial, [command], timeout=30, cancel=cancel)
             
             output = result.stdout + result.stderr
             return result.returncode == 0, output
@@ -261,6 +1900,43 @@ class ADBManager:
         except FileNotFoundError:
             return False, "ADB não encontrado"
     
+    def stream_command(self, serial: str, command: str, cancel: Optional[CancelToken] = None) -> ShellStream:
+        """
+        Executa um comando shell entregando a saída conforme ela chega
+        
+        Usa uma conexão própria (não ocupa a sessão persistente) e não tem
+        timeout: o comando roda até terminar ou ser cancelado.
+        
+        Returns:
+            ShellStream: itere para obter os trechos; depois, `exit_code`
+        
+        Raises:
+            ADBProtocolError: se o dispositivo não estiver disponível
+            FileNotFoundError: se o adb não estiver instalado (fallback)
+        """
+        sentinel = f"__ANDVIEW_{uuid.uuid4().hex}__"
+        script = ShellStream.wrap_command(command, sentinel)
+        
+        channel = None
+        if self.client:
+            try:
+                channel = SocketChannel(self.client.open_service(serial, f"shell:{script}"))
+            except ADBProtocolError:
+                raise
+            except OSError:
+                pass  # Servidor inacessível: usa o executável adb
+        
+        if channel is None:
+            process = subprocess.Popen(
+                [self.adb_path, "-s", serial, "shell", script],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
+            )
+            channel = ProcessChannel(process)
+        
+        return ShellStream(channel, sentinel, cancel)
+    
     def reboot_device(self, serial: str, mode: str = "system") -> Tuple[bool, str]:
         """Reinicia o dispositivo (system, recovery, bootloader)"""
         try:
@@ -289,44 +1965,36 @@ class ADBManager:
     
     def get_device_info(self, serial: str) -> Dict[str, str]:
         """Obtém informações detalhadas do dispositivo"""
-        info = {}
-        
-        properties = {
-            "Modelo": "ro.product.model",
-            "Fabricante": "ro.product.manufacturer",
-            "Android": "ro.build.version.release",
-            "SDK": "ro.build.version.sdk",
-            "CPU": "ro.product.cpu.abi",
-            "Serial": "ro.serialno",
-        }
+        properties, battery_level = self._read_device_snapshot(serial)
         
-        for label, prop in properties.items():
-            info[label] = self._get_device_property(serial, prop)
-        
-        info["Bateria"] = self._get_battery_level(serial)
+        info = {
+            label: properties.get_str(prop)
+            for label, prop in DEVICE_INFO_PROPERTIES.items()
+        }
+        info["Bateria"] = battery_level
         
         return info
     
-    def connect_wifi_device(self, ip_address: str, port: int = 5555) -> Tuple[bool, str]:
-        """Conecta a um dispositivo Android via WiFi"""
+    def connect_wifi_device(self, ip_address: str, port: int = 5555, supervise: bool = True) -> Tuple[bool, str]:
+        """
+        Conecta a um dispositivo Android via WiFi
+        
+        Com `supervise`, o endereço passa a ser reconectado automaticamente
+        se a conexão cair (connection_supervisor).
+        """
+        address = f"{ip_address}:{port}"
         try:
-            print(f"Tentando conectar ao dispositivo WiFi: {ip_address}:{port}")
-            
-            # Conecta via WiFi
-            result = subprocess.run(
-                [self.adb_path, "connect", f"{ip_address}:{port}"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            print(f"Tentando conectar ao dispositivo WiFi: {address}")
             
-            if result.returncode == 0:
-                print(f"Dispositivo conectado via WiFi: {ip_address}:{port}")
-                return True, f"Conectado via WiFi: {ip_address}:{port}"
+            ok, message = self._adb_connect(address)
+            if ok:
+                print(f"Dispositivo conectado via WiFi: {address}")
+                if supervise:
+                    self.connection_supervisor.watch(address)
+                return True, f"Conectado via WiFi: {address}"
             else:
-                error_msg = result.stderr.strip() if result.stderr else result.stdout.strip()
-                print(f"Erro ao conectar via WiFi: {error_msg}")
-                return False, f"Erro: {error_msg}"
+                print(f"Erro ao conectar via WiFi: {message}")
+                return False, f"Erro: {message}"
                 
         except subprocess.TimeoutExpired:
             return False, "Timeout ao conectar via WiFi"
@@ -334,8 +2002,98 @@ class ADBManager:
             print(f"Erro ao conectar dispositivo WiFi: {e}")
             return False, f"Erro: {str(e)}"
     
+    def _adb_connect(self, address: str) -> Tuple[bool, str]:
+        """
+        Executa `adb connect` (o adb pode sair com 0 mesmo quando falha)
+        
+        Raises:
+            subprocess.TimeoutExpired: se o comando exceder o timeout
+            FileNotFoundError: se o adb não estiver instalado
+        """
+        result = subprocess.run(
+            [self.adb_path, "connect", address],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        output = (result.stdout + result.stderr).strip()
+        if result.returncode == 0 and "connected to" in output and "cannot" not in output:
+            return True, output
+        return False, output or f"adb connect saiu com código {result.returncode}"
+    
+    def _reconnect_wifi(self, address: str, drop_stale: bool) -> Tuple[bool, str]:
+        """Reconecta um endereço supervisionado (descarta antes a conexão offline)"""
+        try:
+            if drop_stale:
+                # Com a conexão antiga offline, o `adb connect` responde "already connected"
+                subprocess.run([self.adb_path, "disconnect", address], capture_output=True, timeout=10)
+            return self._adb_connect(address)
+        except subprocess.TimeoutExpired:
+            return False, "Timeout ao reconectar"
+        except OSError as e:
+            return False, str(e)
+    
+    def ping_device(self, serial: str) -> Optional[float]:
+        """RTT (s) de um comando vazio no dispositivo, None se não responder"""
+        started = time.monotonic()
+        try:
+            result = self._exec_out(serial, ["echo"], timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        return time.monotonic() - started
+    
+    def list_mdns_services(self, cancel: Optional[CancelToken] = None) -> List[DiscoveredDevice]:
+        """Dispositivos anunciados via mDNS (`adb mdns services`), lista vazia se indisponível"""
+        try:
+            result = self._run_adb(["mdns", "services"], timeout=5, cancel=cancel)
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            return []
+        if result.returncode != 0:
+            return []
+        return parse_mdns_services(result.stdout)
+    
+    def discover_wifi_devices(
+        self,
+        network: str,
+        ports: Optional[List[int]] = None,
+        cancel: Optional[CancelToken] = None,
+        on_progress: Optional[Callable[[str], None]] = None
+    ) -> List[DiscoveredDevice]:
+        """
+        Procura dispositivos ADB na rede (varredura da sub-rede + mDNS)
+        
+        Args:
+            network: Sub-rede a varrer (ex: 192.168.1.0/24)
+            ports: Portas testadas em cada host (padrão: 5555)
+            on_progress: Chamado com a etapa atual da busca
+        
+        Raises:
+            ValueError: se a sub-rede ou as portas forem inválidas
+            JobCancelled: se cancelado via `cancel`
+        """
+        def report_scan(done: int, total: int):
+            if on_progress:
+                on_progress(f"Procurando em {network}... {done}/{total} endereços testados")
+        
+        devices = run_scan(network, ports or [DEFAULT_ADB_PORT], cancel=cancel, on_progress=report_scan)
+        
+        # O mDNS encontra a depuração por WiFi, cuja porta muda a cada ativação
+        if on_progress:
+            on_progress("Consultando mDNS...")
+        known = {device.address for device in devices}
+        for device in self.list_mdns_services(cancel):
+            if device.address not in known:
+                known.add(device.address)
+                devices.append(device)
+        
+        print(f"DEBUG: {len(devices)} dispositivo(s) encontrados em {network}")
+        return devices
+    
     def disconnect_device(self, device_id: str) -> Tuple[bool, str]:
-        """Desconecta um dispositivo"""
+        """Desconecta um dispositivo (e deixa de reconectá-lo automaticamente)"""
+        self.connection_supervisor.forget(device_id)
         try:
             result = subprocess.run(
                 [self.adb_path, "disconnect", device_id],
@@ -356,112 +2114,173 @@ class ADBManager:
             print(f"Erro ao desconectar dispositivo: {e}")
             return False, f"Erro: {str(e)}"
     
-    def enable_wifi_mode(self, device_id: str, port: int = 5555) -> Tuple[bool, str]:
-        """Ativa o modo WiFi no dispositivo (requer USB conectado)"""
+    def enable_wifi_mode(
+        self,
+        device_id: str,
+        port: int = 5555,
+        cancel: Optional[CancelToken] = None
+    ) -> Tuple[bool, str]:
+        """
+        Ativa o modo WiFi no dispositivo (requer USB conectado)
+        
+        O adbd reinicia escutando em TCP: espera até `wifi_port_timeout`
+        segundos a porta aceitar conexões no IP do dispositivo, para que um
+        `adb connect` logo em seguida não falhe.
+        """
+        ok, message, _ = self._start_tcpip(device_id, port, require_ip=False, cancel=cancel)
+        return ok, message
+    
+    def _start_tcpip(
+        self,
+        device_id: str,
+        port: int,
+        require_ip: bool,
+        cancel: Optional[CancelToken] = None
+    ) -> Tuple[bool, str, str]:
+        """
+        Executa o `adb tcpip` e espera a porta abrir
+        
+        Com `require_ip`, falha antes do `tcpip` se o dispositivo não tiver
+        IP na rede (ex: WiFi desligado), sem mexer no adbd.
+        
+        Returns:
+            (sucesso, mensagem, IP do dispositivo ou "")
+        """
         try:
+            # O IP é obtido antes: o adbd reinicia e a conexão USB cai por um momento
+            ip = self.get_device_ip(device_id, refresh=True, cancel=cancel)
+            if require_ip and not ip:
+                return False, "IP não encontrado (o WiFi do dispositivo está ligado?)", ""
+            
             # Ativa o modo tcpip na porta especificada
-            result = subprocess.run(
-                [self.adb_path, "-s", device_id, "tcpip", str(port)],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            result = self._run_adb(["-s", device_id, "tcpip", str(port)], timeout=10, cancel=cancel)
             
-            if result.returncode == 0:
-                print(f"Modo WiFi ativado no dispositivo {device_id} na porta {port}")
-                return True, f"Modo WiFi ativado na porta {port}"
-            else:
+            if result.returncode != 0:
                 error_msg = result.stderr.strip() if result.stderr else result.stdout.strip()
                 print(f"Erro ao ativar modo WiFi: {error_msg}")
-                return False, f"Erro ao ativar modo WiFi: {error_msg}"
+                return False, f"Erro ao ativar modo WiFi: {error_msg}", ip
+            
+            print(f"Modo WiFi ativado no dispositivo {device_id} na porta {port}")
+            if not ip:
+                return True, f"Modo WiFi ativado na porta {port} (IP do dispositivo não encontrado)", ""
+            
+            if not wait_for_port(ip, port, self.wifi_port_timeout, cancel):
+                if cancel:
+                    cancel.raise_if_cancelled()
+                return False, (
+                    f"Modo WiFi ativado, mas {ip}:{port} não respondeu em "
+                    f"{self.wifi_port_timeout:.0f}s (o dispositivo está na mesma rede?)"
+                ), ip
+            return True, f"Modo WiFi ativado: {ip}:{port}", ip
                 
         except subprocess.TimeoutExpired:
-            return False, "Timeout ao ativar modo WiFi"
+            return False, "Timeout ao ativar modo WiFi", ""
+        except JobCancelled:
+            raise
         except Exception as e:
             print(f"Erro ao ativar modo WiFi: {e}")
-            return False, f"Erro: {str(e)}"
+            return False, f"Erro: {str(e)}", ""
     
-    def get_device_ip(self, device_id: str) -> str:
-        """Obtém o IP do dispositivo via WiFi"""
-        try:
-            print(f"DEBUG: Tentando obter IP do dispositivo {device_id}")
+    def migrate_to_wifi(
+        self,
+        devices: List[ADBDevice],
+        port: int = 5555,
+        on_progress: Optional[Callable[[WifiMigrationProgress], None]] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> Dict[str, Tuple[bool, str]]:
+        """
+        Passa vários dispositivos USB para WiFi ao mesmo tempo
+        
+        Para cada dispositivo: obtém o IP, executa o `adb tcpip`, espera a
+        porta abrir e conecta via `adb connect` (com reconexão automática).
+        Depois disso o cabo USB pode ser removido.
+        
+        Args:
+            devices: Dispositivos USB a migrar
+            port: Porta TCP do adbd
+            on_progress: Chamado (das threads de trabalho) a cada mudança de
+                estado de um dispositivo
+            cancel: Interrompe as etapas em andamento
+        
+        Returns:
+            Dict serial -> (sucesso, endereço ip:porta ou mensagem de erro)
+        """
+        results: Dict[str, Tuple[bool, str]] = {}
+        if not devices:
+            return results
+        
+        def report(serial: str, status: str, address: str = "", message: str = ""):
+            if on_progress:
+                on_progress(WifiMigrationProgress(serial, status, address, message))
+        
+        def migrate(serial: str) -> Tuple[bool, str]:
+            if cancel and cancel.cancelled:
+                report(serial, WifiMigrationProgress.CANCELLED, message="Cancelado")
+                return False, "Cancelado"
             
-            # Método 1: Usando getprop para diferentes interfaces WiFi
-            wifi_props = [
-                "dhcp.wlan0.ipaddress",
-                "dhcp.wifi.ipaddress", 
-                "dhcp.wlan1.ipaddress",
-                "dhcp.eth0.ipaddress"
-            ]
+            report(serial, WifiMigrationProgress.ENABLING)
+            ok, message, ip = self._start_tcpip(serial, port, require_ip=True, cancel=cancel)
+            address = f"{ip}:{port}" if ip else ""
+            if not ok:
+                report(serial, WifiMigrationProgress.FAILED, address, message)
+                return False, message
             
-            for prop in wifi_props:
-                result = subprocess.run(
-                    [self.adb_path, "-s", device_id, "shell", "getprop", prop],
-                    capture_output=True,
-                    text=True,
-                    timeout=3
-                )
-                
-                if result.returncode == 0 and result.stdout.strip():
-                    ip = result.stdout.strip()
-                    print(f"DEBUG: Propriedade {prop} retornou: {ip}")
-                    if ip and '.' in ip and ip.count('.') == 3:
-                        # Verifica se não é IP de loopback ou gateway comum
-                        if not ip.startswith('127.') and ip != '192.168.0.1' and ip != '192.168.1.1' and ip != '10.0.0.1':
-                            print(f"DEBUG: IP válido encontrado: {ip}")
-                            return ip
-            
-            # Método 2: Usando ip addr show com parsing melhorado
-            result = subprocess.run(
-                [self.adb_path, "-s", device_id, "shell", "ip", "addr", "show"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if result.returncode == 0:
-                print(f"DEBUG: Saída do ip addr show:\n{result.stdout}")
-                lines = result.stdout.strip().split('\n')
-                
-                for i, line in enumerate(lines):
-                    # Procura por interfaces de rede
-                    if any(keyword in line.lower() for keyword in ['wlan', 'wifi', 'wl', 'eth']):
-                        # Procura nas próximas linhas por 'inet'
-                        for j in range(i+1, min(i+5, len(lines))):
-                            inet_line = lines[j]
-                            if 'inet ' in inet_line and '/' in inet_line:
-                                # Extrai o IP (formato: inet 192.168.1.100/24)
-                                parts = inet_line.split()
-                                for part in parts:
-                                    if '.' in part and part.count('.') == 3 and '/' in part:
-                                        ip = part.split('/')[0]
-                                        # Verifica se não é IP de loopback ou gateway comum
-                                        if not ip.startswith('127.') and ip != '192.168.0.1' and ip != '192.168.1.1' and ip != '10.0.0.1':
-                                            print(f"DEBUG: IP encontrado via ip addr: {ip}")
-                                            return ip
-            
-            # Método 3: Usando ifconfig (fallback)
-            result = subprocess.run(
-                [self.adb_path, "-s", device_id, "shell", "ifconfig", "wlan0"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            report(serial, WifiMigrationProgress.CONNECTING, address)
+            ok, message = self.connect_wifi_device(ip, port)
+            if not ok:
+                report(serial, WifiMigrationProgress.FAILED, address, message)
+                return False, message
             
-            if result.returncode == 0:
-                print(f"DEBUG: Saída do ifconfig:\n{result.stdout}")
-                import re
-                ip_match = re.search(r'inet addr:(\d+\.\d+\.\d+\.\d+)', result.stdout)
-                if ip_match:
-                    ip = ip_match.group(1)
-                    if ip != '192.168.0.1' and ip != '192.168.1.1' and ip != '10.0.0.1':
-                        print(f"DEBUG: IP encontrado via ifconfig: {ip}")
-                        return ip
-            
-            print("DEBUG: Nenhum IP válido encontrado")
-            return ""
+            report(serial, WifiMigrationProgress.SUCCESS, address, message)
+            return True, address
+        
+        for device in devices:
+            report(device.serial, WifiMigrationProgress.WAITING)
+        
+        with ThreadPoolExecutor(max_workers=len(devices), thread_name_prefix="WifiMigration") as executor:
+            futures = {executor.submit(migrate, device.serial): device for device in devices}
             
-        except (subprocess.TimeoutExpired, Exception) as e:
-            print(f"DEBUG: Erro ao obter IP: {e}")
+            for future in as_completed(futures):
+                serial = futures[future].serial
+                try:
+                    results[serial] = future.result()
+                except JobCancelled:
+                    results[serial] = (False, "Cancelado")
+                    report(serial, WifiMigrationProgress.CANCELLED, message="Cancelado")
+                except Exception as e:
+                    print(f"DEBUG: Erro ao migrar {serial} para WiFi: {e}")
+                    results[serial] = (False, str(e))
+                    report(serial, WifiMigrationProgress.FAILED, message=str(e))
+        
+        return results
+    
+    def get_device_ip(self, device_id: str, refresh: bool = False, cancel: Optional[CancelToken] = None) -> str:
+        """
+        Obtém o IP do dispositivo na rede local ("" se não encontrado)
+        
+        Lista os endereços de todas as interfaces com um único comando e
+        prefere a interface WiFi. O resultado fica em cache até o dispositivo
+        mudar de estado (invalidate_device_ip), por `device_ip_max_age`
+        segundos ou até `refresh`.
+        """
+        cached = self._device_ip_cache.get(device_id)
+        if cached and not refresh and time.monotonic() - cached[1] <= self.device_ip_max_age:
+            return cached[0]
+        
+        try:
+            result = self._run_shell(device_id, [IP_ADDRESSES_COMMAND], timeout=5, cancel=cancel)
+        except subprocess.TimeoutExpired:
+            print(f"DEBUG: Timeout ao obter IP de {device_id}")
             return ""
+        
+        ip = select_wifi_address(parse_ip_addresses(result.stdout))
+        if ip:
+            self._device_ip_cache[device_id] = (ip, time.monotonic())
+        else:
+            self._device_ip_cache.pop(device_id, None)
+        return ip
+    
+    def invalidate_device_ip(self, serial: str):
+        """Descarta o IP em cache do dispositivo (ex: mudou de estado ou de rede)"""
+        self._device_ip_cache.pop(serial, None)
 
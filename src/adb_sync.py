@@ -0,0 +1,368 @@
+"""
+Cliente do serviço `sync:` do ADB (transferência de arquivos)
+
+Implementa as requisições STAT, LIST, SEND e RECV diretamente sobre o socket
+do servidor ADB, sem processos `adb push`/`adb pull`.
+
+Formato das mensagens:
+    requisição: <id de 4 bytes><tamanho u32 little-endian><dados>
+    dados:      "DATA" <tamanho> <até 64 KiB>, terminando em "DONE"
+"""
+
+import mmap
+import os
+import socket
+import stat
+import struct
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from .adb_client import ADBClient
+from .jobs import CancelToken
+
+
+# Maior bloco de dados aceito pelo protocolo
+SYNC_DATA_MAX = 64 * 1024
+
+# Tempo máximo (s) sem nenhum byte transferido antes de abortar
+DEFAULT_STALL_TIMEOUT = 30.0
+
+# Intervalo mínimo (s) entre chamadas de progresso
+PROGRESS_INTERVAL = 0.1
+
+
+class SyncError(Exception):
+    """Falha reportada pelo dispositivo (FAIL) ou resposta inesperada"""
+
+
+class SyncStallError(SyncError):
+    """A transferência ficou parada por mais tempo que o permitido"""
+
+
+@dataclass
+class RemoteStat:
+    """Resultado do STAT/LIST de um caminho no dispositivo"""
+
+    mode: int
+    size: int
+    mtime: int
+    name: str = ""
+
+    @property
+    def exists(self) -> bool:
+        return self.mode != 0
+
+    @property
+    def is_dir(self) -> bool:
+        return stat.S_ISDIR(self.mode)
+
+    @property
+    def is_file(self) -> bool:
+        return stat.S_ISREG(self.mode)
+
+
+@dataclass
+class TransferProgress:
+    """Andamento de uma transferência"""
+
+    transferred: int
+    total: int
+    elapsed: float
+    resumed_from: int = 0  # Bytes que já existiam antes desta transferência
+
+    @property
+    def bytes_per_second(self) -> float:
+        moved = self.transferred - self.resumed_from
+        return moved / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def fraction(self) -> float:
+        return self.transferred / self.total if self.total else 1.0
+
+
+class ProgressReporter:
+    """Limita a frequência das chamadas de progresso"""
+
+    def __init__(
+        self,
+        total: int,
+        callback: Optional[Callable[[TransferProgress], None]],
+        resumed_from: int = 0
+    ):
+        self.total = total
+        self.callback = callback
+        self.resumed_from = resumed_from
+        self.transferred = resumed_from
+        self.started = time.monotonic()
+        self._last_report = 0.0
+
+    def add(self, size: int):
+        self.transferred += size
+        if not self.callback:
+            return
+        now = time.monotonic()
+        if now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            self.callback(TransferProgress(self.transferred, self.total, now - self.started, self.resumed_from))
+
+    def finish(self):
+        if self.callback:
+            self.callback(TransferProgress(
+                self.transferred, self.total, time.monotonic() - self.started, self.resumed_from
+            ))
+
+
+class SyncConnection:
+    """
+    Conexão `sync:` com um dispositivo
+
+    Use como context manager. Não há timeout total: cada operação de rede
+    pode ficar no máximo `stall_timeout` segundos sem progresso.
+    """
+
+    def __init__(self, client: ADBClient, serial: str, stall_timeout: float = DEFAULT_STALL_TIMEOUT):
+        self.serial = serial
+        self.stall_timeout = stall_timeout
+        self.sock = client.open_service(serial, "sync:", timeout=stall_timeout)
+        self.sock.settimeout(stall_timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Encerra a conexão (QUIT)"""
+        try:
+            self.sock.sendall(b"QUIT" + struct.pack("<I", 0))
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def _interrupt(self):
+        """Interrompe a operação em andamento (cancelamento)"""
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _send_request(self, request_id: bytes, payload: bytes = b""):
+        self.sock.sendall(request_id + struct.pack("<I", len(payload)) + payload)
+
+    def _recv_exact(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            try:
+                chunk = self.sock.recv(size - len(data))
+            except socket.timeout:
+                raise SyncStallError(f"Transferência parada há mais de {self.stall_timeout:.0f}s")
+            if not chunk:
+                raise SyncError("Conexão sync encerrada")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _recv_into(self, view: memoryview):
+        """Preenche `view` com os próximos bytes do socket (sem cópias extras)"""
+        received = 0
+        while received < len(view):
+            try:
+                count = self.sock.recv_into(view[received:])
+            except socket.timeout:
+                raise SyncStallError(f"Transferência parada há mais de {self.stall_timeout:.0f}s")
+            if not count:
+                raise SyncError("Conexão sync encerrada")
+            received += count
+
+    def _read_failure(self, size: int) -> SyncError:
+        message = self._recv_exact(size).decode("utf-8", errors="replace")
+        return SyncError(message)
+
+    def _pending_failure(self) -> Optional[SyncError]:
+        """Lê um FAIL já enviado pelo dispositivo, se houver (após erro de envio)"""
+        try:
+            self.sock.settimeout(1.0)
+            header = self._recv_exact(8)
+            if header[:4] == b"FAIL":
+                return self._read_failure(struct.unpack("<I", header[4:])[0])
+        except (OSError, SyncError):
+            pass
+        finally:
+            try:
+                self.sock.settimeout(self.stall_timeout)
+            except OSError:
+                pass
+        return None
+
+    def _send_all(self, *buffers):
+        """Envia os buffers em uma única chamada quando possível (sendmsg)"""
+        try:
+            if hasattr(self.sock, "sendmsg"):
+                total = sum(len(buffer) for buffer in buffers)
+                sent = self.sock.sendmsg(buffers)
+                if sent == total:
+                    return
+                # Envio parcial: completa o restante
+                joined = memoryview(b"".join(bytes(buffer) for buffer in buffers))
+                self.sock.sendall(joined[sent:])
+            else:
+                for buffer in buffers:
+                    self.sock.sendall(buffer)
+        except socket.timeout:
+            raise SyncStallError(f"Transferência parada há mais de {self.stall_timeout:.0f}s")
+
+    def stat(self, remote_path: str) -> RemoteStat:
+        """Retorna modo, tamanho e data de modificação (mode 0 = não existe)"""
+        self._send_request(b"STAT", remote_path.encode("utf-8"))
+        response = self._recv_exact(16)
+        if response[:4] != b"STAT":
+            raise SyncError(f"Resposta inesperada ao STAT: {response[:4]!r}")
+        mode, size, mtime = struct.unpack("<III", response[4:])
+        return RemoteStat(mode, size, mtime, os.path.basename(remote_path))
+
+    def list(self, remote_path: str) -> List[RemoteStat]:
+        """Lista um diretório do dispositivo (sem . e ..)"""
+        self._send_request(b"LIST", remote_path.encode("utf-8"))
+        entries = []
+        while True:
+            response = self._recv_exact(20)
+            request_id = response[:4]
+            if request_id == b"DONE":
+                return entries
+            if request_id != b"DENT":
+                raise SyncError(f"Resposta inesperada ao LIST: {request_id!r}")
+            mode, size, mtime, name_length = struct.unpack("<IIII", response[4:])
+            name = self._recv_exact(name_length).decode("utf-8", errors="replace")
+            if name not in (".", ".."):
+                entries.append(RemoteStat(mode, size, mtime, name))
+
+    def push(
+        self,
+        local_path: str,
+        remote_path: str,
+        mode: Optional[int] = None,
+        on_progress: Optional[Callable[[TransferProgress], None]] = None,
+        cancel: Optional[CancelToken] = None
+    ):
+        """
+        Envia um arquivo (SEND)
+
+        O arquivo é mapeado em memória e enviado em blocos de 64 KiB direto
+        do mapeamento, sem cópias intermediárias.
+
+        Raises:
+            SyncError: se o dispositivo recusar o arquivo
+            SyncStallError: se a transferência parar
+            JobCancelled: se cancelado
+        """
+        local_stat = os.stat(local_path)
+        if mode is None:
+            mode = stat.S_IFREG | stat.S_IMODE(local_stat.st_mode)
+        size = local_stat.st_size
+        reporter = ProgressReporter(size, on_progress)
+
+        if cancel:
+            cancel.add_callback(self._interrupt)
+
+        try:
+            self._send_request(b"SEND", f"{remote_path},{mode}".encode("utf-8"))
+
+            with open(local_path, "rb") as handle:
+                if size:
+                    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        with memoryview(mapped) as view:
+                            for offset in range(0, size, SYNC_DATA_MAX):
+                                # Liberado explicitamente: o mmap só fecha sem views ativas
+                                with view[offset:offset + SYNC_DATA_MAX] as chunk:
+                                    self._send_all(b"DATA" + struct.pack("<I", len(chunk)), chunk)
+                                    reporter.add(len(chunk))
+
+            # DONE leva a data de modificação no lugar do tamanho
+            self.sock.sendall(b"DONE" + struct.pack("<I", int(local_stat.st_mtime)))
+            response = self._recv_exact(8)
+        except (OSError, SyncError):
+            if cancel:
+                cancel.raise_if_cancelled()
+            # O dispositivo pode ter recusado o arquivo no meio do envio
+            failure = self._pending_failure()
+            if failure:
+                raise failure
+            raise
+        finally:
+            if cancel:
+                cancel.remove_callback(self._interrupt)
+
+        request_id, length = response[:4], struct.unpack("<I", response[4:])[0]
+        if request_id == b"FAIL":
+            raise self._read_failure(length)
+        if request_id != b"OKAY":
+            raise SyncError(f"Resposta inesperada ao SEND: {request_id!r}")
+        reporter.finish()
+
+    def pull(
+        self,
+        remote_path: str,
+        local_path: str,
+        on_progress: Optional[Callable[[TransferProgress], None]] = None,
+        cancel: Optional[CancelToken] = None,
+        total: Optional[int] = None,
+        digest=None
+    ) -> int:
+        """
+        Baixa um arquivo (RECV)
+
+        `digest` (objeto hashlib opcional) é atualizado com os dados
+        recebidos, evitando reler o arquivo para verificá-lo.
+
+        Returns:
+            Quantidade de bytes recebidos
+
+        Raises:
+            SyncError: se o dispositivo recusar (ex: arquivo inexistente)
+            SyncStallError: se a transferência parar
+            JobCancelled: se cancelado
+        """
+        if total is None:
+            total = self.stat(remote_path).size
+        reporter = ProgressReporter(total, on_progress)
+        buffer = bytearray(SYNC_DATA_MAX)
+        view = memoryview(buffer)
+
+        if cancel:
+            cancel.add_callback(self._interrupt)
+
+        try:
+            self._send_request(b"RECV", remote_path.encode("utf-8"))
+
+            with open(local_path, "wb") as handle:
+                while True:
+                    header = self._recv_exact(8)
+                    request_id, length = header[:4], struct.unpack("<I", header[4:])[0]
+
+                    if request_id == b"DONE":
+                        break
+                    if request_id == b"FAIL":
+                        raise self._read_failure(length)
+                    if request_id != b"DATA" or length > SYNC_DATA_MAX:
+                        raise SyncError(f"Resposta inesperada ao RECV: {request_id!r}")
+
+                    self._recv_into(view[:length])
+                    handle.write(view[:length])
+                    if digest is not None:
+                        digest.update(view[:length])
+                    reporter.add(length)
+        except (OSError, SyncError):
+            if cancel:
+                cancel.raise_if_cancelled()
+            raise
+        finally:
+            view.release()
+            if cancel:
+                cancel.remove_callback(self._interrupt)
+
+        reporter.finish()
+        return reporter.transferred
@@ -0,0 +1,275 @@
+"""
+Leitura das informações de um APK direto do arquivo (sem aapt)
+
+Lê o AndroidManifest.xml compilado (XML binário do Android) para obter o
+pacote e a versão, e extrai um digest que identifica o build a partir do
+bloco de assinatura APK v2/v3 (ou do META-INF/MANIFEST.MF na assinatura v1).
+"""
+
+import hashlib
+import os
+import struct
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+# Tipos de chunk do XML binário
+RES_STRING_POOL_TYPE = 0x0001
+RES_XML_TYPE = 0x0003
+RES_XML_START_ELEMENT_TYPE = 0x0102
+RES_XML_RESOURCE_MAP_TYPE = 0x0180
+
+STRING_POOL_UTF8_FLAG = 0x100
+
+# Tipos de valor dos atributos
+TYPE_STRING = 0x03
+TYPE_INT_DEC = 0x10
+TYPE_INT_HEX = 0x11
+
+# IDs de recurso dos atributos android:* usados (valem mesmo com nomes ofuscados)
+ATTR_VERSION_CODE = 0x0101021B
+ATTR_VERSION_NAME = 0x0101021C
+ATTR_VERSION_CODE_MAJOR = 0x01010576
+
+# Bloco de assinatura APK (v2/v3)
+APK_SIG_BLOCK_MAGIC = b"APK Sig Block 42"
+APK_SIGNATURE_SCHEME_V2_ID = 0x7109871A
+APK_SIGNATURE_SCHEME_V3_ID = 0xF05368C0
+
+EOCD_SIGNATURE = b"PK\x05\x06"
+EOCD_MIN_SIZE = 22
+
+
+class ApkParseError(Exception):
+    """O arquivo não é um APK válido ou o manifesto não pôde ser lido"""
+
+
+@dataclass
+class ApkInfo:
+    """Identificação de um APK"""
+
+    package: str
+    version_code: int
+    version_name: str = ""
+    digest: str = ""  # Identifica o build (assinatura), "" se não assinado
+
+
+def _read_pool_string(data: bytes, offset: int, utf8: bool) -> str:
+    """Lê uma string do string pool (UTF-8 ou UTF-16)"""
+    if utf8:
+        # Tamanho em caracteres e depois em bytes (1 ou 2 bytes cada)
+        if data[offset] & 0x80:
+            offset += 2
+        else:
+            offset += 1
+        size = data[offset]
+        if size & 0x80:
+            size = ((size & 0x7F) << 8) | data[offset + 1]
+            offset += 2
+        else:
+            offset += 1
+        return data[offset:offset + size].decode("utf-8", errors="replace")
+
+    size = struct.unpack_from("<H", data, offset)[0]
+    if size & 0x8000:
+        size = ((size & 0x7FFF) << 16) | struct.unpack_from("<H", data, offset + 2)[0]
+        offset += 4
+    else:
+        offset += 2
+    return data[offset:offset + size * 2].decode("utf-16-le", errors="replace")
+
+
+def _parse_string_pool(data: bytes, start: int) -> List[str]:
+    """Lê todas as strings de um chunk de string pool"""
+    header_size, _, count, _, flags, strings_start = struct.unpack_from("<HIIIII", data, start + 2)
+    utf8 = bool(flags & STRING_POOL_UTF8_FLAG)
+    offsets = struct.unpack_from(f"<{count}I", data, start + header_size)
+    base = start + strings_start
+    return [_read_pool_string(data, base + offset, utf8) for offset in offsets]
+
+
+def parse_binary_manifest(data: bytes) -> Dict[str, object]:
+    """
+    Lê os atributos do elemento <manifest> de um AndroidManifest.xml compilado
+
+    Returns:
+        Dict com package, versionCode, versionName e versionCodeMajor
+        (apenas os presentes)
+
+    Raises:
+        ApkParseError: se os dados não forem um XML binário válido
+    """
+    try:
+        chunk_type, header_size, total_size = struct.unpack_from("<HHI", data, 0)
+    except struct.error:
+        raise ApkParseError("Manifesto vazio")
+    if chunk_type != RES_XML_TYPE:
+        raise ApkParseError("Manifesto não é um XML binário")
+
+    strings: List[str] = []
+    resource_ids: List[int] = []
+    offset = header_size
+    end = min(total_size, len(data))
+
+    while offset + 8 <= end:
+        chunk_type, header_size, chunk_size = struct.unpack_from("<HHI", data, offset)
+        if chunk_size < 8:
+            raise ApkParseError("Chunk inválido no manifesto")
+
+        if chunk_type == RES_STRING_POOL_TYPE:
+            strings = _parse_string_pool(data, offset)
+        elif chunk_type == RES_XML_RESOURCE_MAP_TYPE:
+            count = (chunk_size - header_size) // 4
+            resource_ids = list(struct.unpack_from(f"<{count}I", data, offset + header_size))
+        elif chunk_type == RES_XML_START_ELEMENT_TYPE:
+            ext = offset + header_size
+            name_index = struct.unpack_from("<I", data, ext + 4)[0]
+            if strings[name_index] == "manifest":
+                return _read_manifest_attributes(data, ext, strings, resource_ids)
+
+        offset += chunk_size
+
+    raise ApkParseError("Elemento <manifest> não encontrado")
+
+
+def _read_manifest_attributes(
+    data: bytes,
+    ext: int,
+    strings: List[str],
+    resource_ids: List[int]
+) -> Dict[str, object]:
+    """Lê os atributos de identificação do elemento <manifest>"""
+    attribute_start, attribute_size, attribute_count = struct.unpack_from("<HHH", data, ext + 8)
+    attributes: Dict[str, object] = {}
+
+    for index in range(attribute_count):
+        position = ext + attribute_start + index * attribute_size
+        _, name_index, raw_index, _, _, data_type, value = struct.unpack_from("<IIIHBBI", data, position)
+
+        # Atributos android:* são identificados pelo ID de recurso
+        resource_id = resource_ids[name_index] if name_index < len(resource_ids) else 0
+        name = {
+            ATTR_VERSION_CODE: "versionCode",
+            ATTR_VERSION_NAME: "versionName",
+            ATTR_VERSION_CODE_MAJOR: "versionCodeMajor",
+        }.get(resource_id, strings[name_index])
+
+        if data_type == TYPE_STRING:
+            attributes[name] = strings[value]
+        elif data_type in (TYPE_INT_DEC, TYPE_INT_HEX):
+            attributes[name] = value
+        elif raw_index != 0xFFFFFFFF:
+            attributes[name] = strings[raw_index]
+
+    return attributes
+
+
+def _find_central_directory(handle) -> int:
+    """Retorna o offset do diretório central do zip"""
+    size = handle.seek(0, os.SEEK_END)
+    tail_size = min(size, EOCD_MIN_SIZE + 0xFFFF)
+    handle.seek(size - tail_size)
+    tail = handle.read(tail_size)
+
+    position = tail.rfind(EOCD_SIGNATURE)
+    if position < 0 or position + EOCD_MIN_SIZE > len(tail):
+        raise ApkParseError("Fim do diretório central do zip não encontrado")
+    return struct.unpack_from("<I", tail, position + 16)[0]
+
+
+def read_signing_block_digest(path: str) -> str:
+    """
+    Digest do bloco de assinatura APK v2/v3 ("" se o APK não tiver)
+
+    O bloco contém os digests do conteúdo assinados pelo desenvolvedor:
+    dois APKs com o mesmo bloco são o mesmo build. Lê apenas o bloco, sem
+    percorrer o arquivo inteiro.
+    """
+    with open(path, "rb") as handle:
+        central_directory = _find_central_directory(handle)
+        if central_directory < 24:
+            return ""
+
+        handle.seek(central_directory - 24)
+        footer = handle.read(24)
+        if footer[8:] != APK_SIG_BLOCK_MAGIC:
+            return ""
+
+        block_size = struct.unpack_from("<Q", footer, 0)[0]
+        if block_size < 24 or block_size + 8 > central_directory:
+            raise ApkParseError("Bloco de assinatura inválido")
+
+        handle.seek(central_directory - block_size - 8)
+        block = handle.read(block_size + 8)
+
+    # Pares (tamanho u64, id u32, valor) entre os dois campos de tamanho
+    pairs = {}
+    offset = 8
+    while offset + 12 <= len(block) - 24:
+        pair_size, pair_id = struct.unpack_from("<QI", block, offset)
+        pairs[pair_id] = block[offset + 12:offset + 8 + pair_size]
+        offset += 8 + pair_size
+
+    for scheme, pair_id in (("v3", APK_SIGNATURE_SCHEME_V3_ID), ("v2", APK_SIGNATURE_SCHEME_V2_ID)):
+        if pair_id in pairs:
+            return f"{scheme}:{hashlib.sha256(pairs[pair_id]).hexdigest()}"
+    return ""
+
+
+def read_apk_info(path: str) -> ApkInfo:
+    """
+    Lê pacote, versão e digest do build de um APK
+
+    Raises:
+        ApkParseError: se o arquivo não for um APK válido
+    """
+    try:
+        with zipfile.ZipFile(path) as apk:
+            try:
+                manifest = apk.read("AndroidManifest.xml")
+            except KeyError:
+                raise ApkParseError("AndroidManifest.xml não encontrado")
+
+            try:
+                signature_v1 = apk.read("META-INF/MANIFEST.MF")
+            except KeyError:
+                signature_v1 = b""
+    except (OSError, zipfile.BadZipFile) as e:
+        raise ApkParseError(f"APK inválido: {e}")
+
+    try:
+        attributes = parse_binary_manifest(manifest)
+    except (struct.error, IndexError) as e:
+        raise ApkParseError(f"Manifesto inválido: {e}")
+
+    package = attributes.get("package")
+    if not isinstance(package, str) or not package:
+        raise ApkParseError("Nome do pacote não encontrado no manifesto")
+
+    version_code = attributes.get("versionCode", 0)
+    if not isinstance(version_code, int):
+        version_code = int(version_code) if str(version_code).isdigit() else 0
+    major = attributes.get("versionCodeMajor", 0)
+    if isinstance(major, int) and major:
+        version_code |= major << 32
+
+    try:
+        digest = read_signing_block_digest(path)
+    except (OSError, ApkParseError, struct.error):
+        digest = ""
+    if not digest and signature_v1:
+        # Assinatura v1: o MANIFEST.MF lista o digest de cada entrada
+        digest = f"v1:{hashlib.sha256(signature_v1).hexdigest()}"
+
+    version_name = attributes.get("versionName", "")
+    return ApkInfo(package, version_code, str(version_name), digest)
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 do arquivo inteiro (hex)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,169 @@
+"""
+Coleta dos APKs (base e splits) a instalar em uma única sessão
+
+Aceita APKs avulsos e pacotes de splits (.apks do bundletool, .xapk,
+.apkm). Os splits dentro de pacotes são lidos direto do zip, sem extração
+temporária; de cada pacote só entram os APKs que formam uma instalação
+(ex: os standalones de um .apks ficam de fora).
+"""
+
+import json
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, List
+
+
+# Extensões de pacotes que contêm vários APKs
+SPLIT_ARCHIVE_EXTENSIONS = (".apks", ".xapk", ".apkm")
+
+# ABIs como aparecem no nome dos splits (ex: base-arm64_v8a.apk, config.x86_64.apk)
+SPLIT_ABIS = {
+    "arm64_v8a": "arm64-v8a",
+    "armeabi_v7a": "armeabi-v7a",
+    "armeabi": "armeabi",
+    "x86_64": "x86_64",
+    "x86": "x86",
+}
+SPLIT_ABI_PATTERN = re.compile(r'[._-](arm64_v8a|armeabi_v7a|armeabi|x86_64|x86)(?=\.apk$|[._-])')
+
+
+@dataclass
+class ApkSplit:
+    """Um APK a ser enviado para a sessão de instalação"""
+
+    name: str
+    size: int
+    open: Callable[[], BinaryIO]
+
+    @property
+    def abi(self) -> str:
+        """ABI do split de código nativo ("" se não for específico de ABI)"""
+        match = SPLIT_ABI_PATTERN.search(self.name)
+        return SPLIT_ABIS[match.group(1)] if match else ""
+
+
+class _ArchiveEntry:
+    """Entrada de um zip aberta para leitura (fecha o zip junto)"""
+
+    def __init__(self, path: str, entry: zipfile.ZipInfo):
+        self._archive = zipfile.ZipFile(path)
+        try:
+            self._stream = self._archive.open(entry)
+        except Exception:
+            self._archive.close()
+            raise
+
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+    def close(self):
+        self._stream.close()
+        self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_split_archive(path: str) -> bool:
+    """Indica se o arquivo é um pacote de splits (.apks/.xapk/.apkm)"""
+    return path.lower().endswith(SPLIT_ARCHIVE_EXTENSIONS)
+
+
+def _bundletool_entries(entries: List[zipfile.ZipInfo]) -> List[zipfile.ZipInfo]:
+    """
+    APKs de um .apks do bundletool
+
+    O pacote traz splits/ (instalação por splits) e, conforme o modo,
+    standalones/ (um APK completo por configuração) e universal.apk; só um
+    desses conjuntos pode ir para a sessão de instalação.
+    """
+    splits = [entry for entry in entries if entry.filename.startswith("splits/")]
+    if splits:
+        return splits
+    return [entry for entry in entries if entry.filename == "universal.apk"]
+
+
+def _xapk_entries(archive: zipfile.ZipFile, entries: List[zipfile.ZipInfo]) -> List[zipfile.ZipInfo]:
+    """
+    APKs de um .xapk: os listados em split_apks do manifest.json, ou os APKs
+    da raiz do pacote (as OBBs e demais arquivos ficam de fora)
+    """
+    root = [entry for entry in entries if "/" not in entry.filename]
+    try:
+        manifest = json.loads(archive.read("manifest.json"))
+        files = {item["file"] for item in manifest.get("split_apks", [])}
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return root
+    listed = [entry for entry in root if entry.filename in files]
+    return listed or root
+
+
+def _archive_splits(path: str) -> List[ApkSplit]:
+    """Lista os APKs de um pacote, lidos sob demanda direto do zip"""
+    extension = os.path.splitext(path.lower())[1]
+    try:
+        with zipfile.ZipFile(path) as archive:
+            entries = [
+                info for info in archive.infolist()
+                if info.filename.lower().endswith(".apk") and not info.is_dir()
+            ]
+            if extension == ".apks":
+                entries = _bundletool_entries(entries)
+            elif extension == ".xapk":
+                entries = _xapk_entries(archive, entries)
+            else:
+                # .apkm: base.apk e split_*.apk na raiz
+                entries = [entry for entry in entries if "/" not in entry.filename]
+    except (OSError, zipfile.BadZipFile) as e:
+        raise ValueError(f"Pacote inválido: {e}")
+
+    if not entries:
+        raise ValueError(f"Nenhum APK instalável em {os.path.basename(path)}")
+
+    def opener(entry: zipfile.ZipInfo) -> Callable[[], BinaryIO]:
+        return lambda: _ArchiveEntry(path, entry)
+
+    return [ApkSplit(entry.filename, entry.file_size, opener(entry)) for entry in entries]
+
+
+def collect_splits(paths: List[str]) -> List[ApkSplit]:
+    """
+    Reúne os APKs de uma instalação (arquivos .apk e/ou pacotes de splits)
+
+    Raises:
+        ValueError: se um arquivo não puder ser lido ou nenhum APK for encontrado
+    """
+    splits: List[ApkSplit] = []
+    for path in paths:
+        if is_split_archive(path):
+            splits.extend(_archive_splits(path))
+            continue
+
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            raise ValueError(f"Arquivo inválido: {e}")
+        splits.append(ApkSplit(os.path.basename(path), size, lambda path=path: open(path, "rb")))
+
+    if not splits:
+        raise ValueError("Nenhum APK encontrado")
+    return splits
+
+
+def select_splits_for_abis(splits: List[ApkSplit], abis: List[str]) -> List[ApkSplit]:
+    """
+    Mantém apenas os splits de código nativo da ABI preferida do dispositivo
+
+    Splits de idioma/densidade são mantidos. Sem lista de ABIs (ou sem split
+    compatível), a lista é devolvida sem alterações.
+    """
+    available = {split.abi for split in splits if split.abi}
+    preferred = next((abi for abi in abis if abi in available), None)
+    if preferred is None:
+        return splits
+    return [split for split in splits if not split.abi or split.abi == preferred]
@@ -0,0 +1,282 @@
+"""
+Supervisão das conexões ADB via WiFi
+
+Lembra os endereços conectados via `adb connect` e, quando um deles cai
+(sai da lista ou fica offline), reconecta com espera exponencial e jitter.
+Mantém a saúde de cada conexão: tempo conectado, reconexões e RTT.
+"""
+
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .device_tracker import DeviceEvent
+from .jobs import CancelToken
+
+
+# Espera (s) antes da primeira nova tentativa e limite da espera
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+# Intervalo (s) entre medições de RTT das conexões ativas
+DEFAULT_HEALTH_INTERVAL = 15.0
+
+
+def backoff_delay(attempt: int, base: float = DEFAULT_BASE_DELAY, maximum: float = DEFAULT_MAX_DELAY) -> float:
+    """
+    Espera antes da tentativa `attempt` (1, 2, ...): exponencial com jitter
+
+    A espera dobra a cada tentativa até `maximum` e é sorteada entre a
+    metade e o valor cheio, para que vários aparelhos que caíram juntos
+    (ex: queda do roteador) não reconectem todos no mesmo instante.
+    """
+    ceiling = min(maximum, base * (2 ** max(0, attempt - 1)))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def wait_for_port(host: str, port: int, timeout: float, cancel: Optional[CancelToken] = None) -> bool:
+    """Espera até que host:port aceite conexões TCP (ou o timeout expire)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        try:
+            with socket.create_connection((host, port), timeout=min(1.0, remaining)):
+                return True
+        except OSError:
+            pass
+        if cancel:
+            if cancel.wait(min(0.5, max(0.0, deadline - time.monotonic()))):
+                return False
+        else:
+            time.sleep(min(0.5, max(0.0, deadline - time.monotonic())))
+
+
+@dataclass
+class ConnectionHealth:
+    """Saúde de uma conexão WiFi supervisionada"""
+
+    CONNECTED = "connected"
+    RECONNECTING = "reconnecting"
+
+    address: str
+    state: str = RECONNECTING
+    connected_since: Optional[float] = None   # time.monotonic() da conexão atual
+    reconnect_count: int = 0                  # Reconexões bem-sucedidas
+    attempt: int = 0                          # Tentativas desde a queda
+    rtt: Optional[float] = None               # Último RTT (s) de um comando vazio
+    last_error: str = ""
+    next_attempt: float = 0.0                 # time.monotonic() da próxima tentativa
+
+    @property
+    def uptime(self) -> float:
+        """Tempo (s) desde a última conexão (0 se desconectado)"""
+        if self.state != self.CONNECTED or self.connected_since is None:
+            return 0.0
+        return time.monotonic() - self.connected_since
+
+    def summary(self) -> str:
+        """Descrição curta (ex: tooltip da lista de dispositivos)"""
+        if self.state == self.CONNECTED:
+            text = f"WiFi conectado há {int(self.uptime // 60)} min"
+            if self.rtt is not None:
+                text += f" - RTT {self.rtt * 1000:.0f} ms"
+        else:
+            text = f"WiFi reconectando (tentativa {self.attempt})"
+            if self.last_error:
+                text += f": {self.last_error}"
+        return f"{text} - {self.reconnect_count} reconexão(ões)"
+
+
+class ConnectionSupervisor:
+    """
+    Reconecta automaticamente os dispositivos conectados via WiFi
+
+    Recebe os eventos do DeviceTracker (handle_events) e roda uma thread
+    própria que agenda as reconexões e mede o RTT periodicamente. Uma falha
+    na medição também é tratada como queda, o que cobre o modo polling
+    (sem eventos do servidor ADB).
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[str, bool], Tuple[bool, str]],
+        ping: Callable[[str], Optional[float]],
+        on_health: Optional[Callable[[ConnectionHealth], None]] = None,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        health_interval: float = DEFAULT_HEALTH_INTERVAL
+    ):
+        """
+        Args:
+            connect: Reconecta o endereço (o segundo argumento indica se a
+                conexão antiga, offline, deve ser descartada antes)
+            ping: Mede o RTT do dispositivo (None se não responder)
+            on_health: Chamado (na thread do supervisor) quando a saúde muda
+        """
+        self.connect = connect
+        self.ping = ping
+        self.on_health = on_health
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.health_interval = health_interval
+
+        self._connections: Dict[str, ConnectionHealth] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Inicia a thread do supervisor"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ConnectionSupervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Encerra a supervisão"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def watch(self, address: str):
+        """Passa a supervisionar o endereço (recém-conectado)"""
+        with self._lock:
+            health = self._connections.get(address)
+            if health is None:
+                health = ConnectionHealth(address)
+                self._connections[address] = health
+            self._mark_connected(health)
+        self._notify(health)
+        self.start()
+        self._wakeup.set()
+
+    def forget(self, address: str):
+        """Deixa de supervisionar (ex: desconectado pelo usuário)"""
+        with self._lock:
+            self._connections.pop(address, None)
+
+    def is_watched(self, address: str) -> bool:
+        with self._lock:
+            return address in self._connections
+
+    def health(self, address: str) -> Optional[ConnectionHealth]:
+        with self._lock:
+            return self._connections.get(address)
+
+    def all_health(self) -> List[ConnectionHealth]:
+        with self._lock:
+            return list(self._connections.values())
+
+    def handle_events(self, events: List[DeviceEvent]):
+        """Atualiza o estado a partir dos eventos do DeviceTracker"""
+        changed = []
+        with self._lock:
+            for event in events:
+                health = self._connections.get(event.serial)
+                if health is None:
+                    continue
+                if event.state == "device":
+                    if health.state != ConnectionHealth.CONNECTED:
+                        # Voltou sozinho ou pela última tentativa
+                        health.reconnect_count += 1
+                        self._mark_connected(health)
+                        changed.append(health)
+                elif health.state == ConnectionHealth.CONNECTED:
+                    # Saiu da lista ou ficou offline/unauthorized
+                    self._mark_dropped(health, event.state or "desconectado")
+                    changed.append(health)
+
+        for health in changed:
+            self._notify(health)
+        if changed:
+            self._wakeup.set()
+
+    def _mark_connected(self, health: ConnectionHealth):
+        health.state = ConnectionHealth.CONNECTED
+        health.connected_since = time.monotonic()
+        health.attempt = 0
+        health.last_error = ""
+        health.next_attempt = time.monotonic() + self.health_interval
+
+    def _mark_dropped(self, health: ConnectionHealth, reason: str):
+        print(f"DEBUG: Conexão WiFi {health.address} caiu ({reason})")
+        health.state = ConnectionHealth.RECONNECTING
+        health.connected_since = None
+        health.rtt = None
+        health.last_error = reason
+        health.attempt = 0
+        health.next_attempt = time.monotonic() + backoff_delay(1, self.base_delay, self.max_delay)
+
+    def _notify(self, health: ConnectionHealth):
+        if self.on_health:
+            try:
+                self.on_health(health)
+            except Exception as e:
+                print(f"DEBUG: Erro ao notificar saúde da conexão: {e}")
+
+    def _run(self):
+        """Executa as tarefas vencidas e dorme até a próxima"""
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            with self._lock:
+                due = [health for health in self._connections.values() if health.next_attempt <= now]
+                upcoming = [health.next_attempt for health in self._connections.values() if health.next_attempt > now]
+
+            for health in due:
+                if self._stop_event.is_set():
+                    return
+                if health.state == ConnectionHealth.CONNECTED:
+                    self._check(health)
+                else:
+                    self._reconnect(health)
+
+            if due:
+                continue
+            timeout = min(upcoming) - now if upcoming else None
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+    def _check(self, health: ConnectionHealth):
+        """Mede o RTT de uma conexão ativa; sem resposta, trata como queda"""
+        rtt = self.ping(health.address)
+        with self._lock:
+            if self._connections.get(health.address) is not health or health.state != ConnectionHealth.CONNECTED:
+                return
+            if rtt is None:
+                self._mark_dropped(health, "sem resposta")
+            else:
+                health.rtt = rtt
+                health.next_attempt = time.monotonic() + self.health_interval
+        self._notify(health)
+
+    def _reconnect(self, health: ConnectionHealth):
+        """Uma tentativa de reconexão; agenda a próxima se falhar"""
+        with self._lock:
+            health.attempt += 1
+            attempt = health.attempt
+
+        print(f"DEBUG: Reconectando {health.address} (tentativa {attempt})")
+        ok, message = self.connect(health.address, True)
+        rtt = self.ping(health.address) if ok else None
+
+        with self._lock:
+            if self._connections.get(health.address) is not health or health.state == ConnectionHealth.CONNECTED:
+                return  # Esquecido ou já reconectado (evento do tracker)
+            if ok and rtt is not None:
+                health.reconnect_count += 1
+                self._mark_connected(health)
+                health.rtt = rtt
+            else:
+                health.last_error = message if not ok else "sem resposta"
+                delay = backoff_delay(attempt + 1, self.base_delay, self.max_delay)
+                health.next_attempt = time.monotonic() + delay
+        self._notify(health)
@@ -0,0 +1,86 @@
+"""
+Endereços de rede do dispositivo
+
+Interpreta a saída de `ip -o -4 addr show` (ou do `ifconfig` dos aparelhos
+antigos, sem o comando `ip`) e escolhe o endereço usado para conectar o ADB
+via WiFi.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+
+# Comando único que lista os endereços IPv4 de todas as interfaces
+IP_ADDRESSES_COMMAND = "ip -o -4 addr show 2>/dev/null || ifconfig 2>/dev/null || ifconfig wlan0 2>/dev/null"
+
+# ip -o: "3: wlan0    inet 192.168.1.23/24 brd 192.168.1.255 scope global wlan0\ ..."
+IP_ONELINE_PATTERN = re.compile(r'^\d+:\s+([^\s:@]+)\S*\s+inet\s+(\d+\.\d+\.\d+\.\d+)/(\d+)', re.MULTILINE)
+
+# ifconfig: "wlan0     Link encap:..." ou "wlan0: flags=..." / "wlan0: ip 192.168.1.5 mask ..."
+IFCONFIG_INTERFACE_PATTERN = re.compile(r'^([^\s:]+):?\s')
+IFCONFIG_ADDRESS_PATTERN = re.compile(r'(?:inet addr:|inet |\bip )(\d+\.\d+\.\d+\.\d+)')
+
+# Prefixos de interface em ordem de preferência (WiFi antes de cabo)
+PREFERRED_INTERFACES = ("wlan", "wifi", "wl", "eth")
+
+# Interfaces que nunca servem para o ADB via rede local (loopback, dados móveis, túneis)
+IGNORED_INTERFACES = ("lo", "rmnet", "ccmni", "dummy", "tun", "p2p", "ip6tnl", "sit")
+
+
+@dataclass
+class InterfaceAddress:
+    """Endereço IPv4 de uma interface do dispositivo"""
+
+    interface: str
+    address: str
+    prefix_length: int = 0
+
+
+def parse_ip_addresses(output: str) -> List[InterfaceAddress]:
+    """
+    Lê os endereços IPv4 da saída de `ip -o -4 addr show` ou do `ifconfig`
+
+    Linhas irreconhecíveis são ignoradas; endereços 0.0.0.0 são descartados.
+    """
+    addresses = [
+        InterfaceAddress(match.group(1), match.group(2), int(match.group(3)))
+        for match in IP_ONELINE_PATTERN.finditer(output)
+    ]
+    if addresses:
+        return [entry for entry in addresses if entry.address != "0.0.0.0"]
+
+    # ifconfig: o nome da interface abre um bloco, o endereço vem em seguida
+    interface = ""
+    for line in output.splitlines():
+        if line and not line[0].isspace():
+            match = IFCONFIG_INTERFACE_PATTERN.match(line)
+            interface = match.group(1) if match else ""
+        if not interface:
+            continue
+        match = IFCONFIG_ADDRESS_PATTERN.search(line)
+        if match and match.group(1) != "0.0.0.0":
+            addresses.append(InterfaceAddress(interface, match.group(1)))
+            interface = ""  # Um endereço por interface
+    return addresses
+
+
+def select_wifi_address(addresses: List[InterfaceAddress]) -> str:
+    """
+    Escolhe o endereço para conectar via WiFi ("" se não houver)
+
+    Prefere interfaces WiFi, depois cabo; ignora loopback e dados móveis.
+    """
+    candidates = [
+        entry for entry in addresses
+        if not entry.interface.startswith(IGNORED_INTERFACES) and not entry.address.startswith("127.")
+    ]
+
+    def rank(entry: InterfaceAddress) -> int:
+        for index, prefix in enumerate(PREFERRED_INTERFACES):
+            if entry.interface.startswith(prefix):
+                return index
+        return len(PREFERRED_INTERFACES)
+
+    candidates.sort(key=rank)
+    return candidates[0].address if candidates else ""
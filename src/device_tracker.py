@@ -0,0 +1,148 @@
+"""
+Módulo para acompanhamento de dispositivos em tempo real
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from .adb_client import ADBClient, ADBProtocolError
+
+
+@dataclass
+class DeviceEvent:
+    """Mudança na lista de dispositivos"""
+    
+    ADDED = "added"
+    REMOVED = "removed"
+    STATE_CHANGED = "state_changed"
+    
+    kind: str
+    serial: str
+    state: str
+    previous_state: str = ""
+
+
+class DeviceTracker:
+    """
+    Acompanha dispositivos pelo stream `host:track-devices-l` do servidor ADB
+    
+    Roda em uma thread própria, bloqueada na leitura do socket enquanto nada
+    muda. Se o stream cair, avisa via `on_stream_state(False)` (para que a
+    interface volte ao polling) e tenta reconectar periodicamente.
+    """
+    
+    def __init__(
+        self,
+        client: ADBClient,
+        on_events: Callable[[List[DeviceEvent]], None],
+        on_stream_state: Optional[Callable[[bool], None]] = None,
+        retry_interval: float = 2.0
+    ):
+        self.client = client
+        self.on_events = on_events
+        self.on_stream_state = on_stream_state
+        self.retry_interval = retry_interval
+        
+        self.devices: Dict[str, str] = {}
+        self.streaming = False
+        
+        self._stop_event = threading.Event()
+        self._socket = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Inicia o acompanhamento em background"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="DeviceTracker", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Encerra o acompanhamento"""
+        self._stop_event.set()
+        
+        # Fecha o socket para desbloquear a leitura
+        sock = self._socket
+        if sock:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+    
+    def _run(self):
+        """Loop principal: lê snapshots e reconecta quando o stream cai"""
+        while not self._stop_event.is_set():
+            try:
+                self._socket = self.client.open_track_devices()
+                self._set_streaming(True)
+                
+                while not self._stop_event.is_set():
+                    snapshot = self.client.read_track_snapshot(self._socket)
+                    self._apply_snapshot(self.parse_snapshot(snapshot))
+                    
+            except (OSError, ADBProtocolError):
+                pass
+            finally:
+                if self._socket:
+                    try:
+                        self._socket.close()
+                    except OSError:
+                        pass
+                    self._socket = None
+            
+            if self._stop_event.is_set():
+                break
+            
+            self._set_streaming(False)
+            self._stop_event.wait(self.retry_interval)
+    
+    def _set_streaming(self, streaming: bool):
+        """Atualiza e notifica o estado do stream"""
+        if self.streaming == streaming:
+            return
+        
+        self.streaming = streaming
+        if self.on_stream_state:
+            self.on_stream_state(streaming)
+    
+    def _apply_snapshot(self, devices: Dict[str, str]):
+        """Compara o snapshot com o estado conhecido e emite os eventos"""
+        events = self.diff(self.devices, devices)
+        self.devices = devices
+        
+        if events:
+            self.on_events(events)
+    
+    @staticmethod
+    def parse_snapshot(snapshot: str) -> Dict[str, str]:
+        """Converte um snapshot (formato `devices -l`) em {serial: estado}"""
+        devices = {}
+        for line in snapshot.strip().split('\n'):
+            parts = line.split()
+            if len(parts) >= 2:
+                devices[parts[0]] = parts[1]
+        return devices
+    
+    @staticmethod
+    def diff(old: Dict[str, str], new: Dict[str, str]) -> List[DeviceEvent]:
+        """Calcula os eventos entre dois estados"""
+        events = []
+        
+        for serial, state in new.items():
+            if serial not in old:
+                events.append(DeviceEvent(DeviceEvent.ADDED, serial, state))
+            elif old[serial] != state:
+                events.append(DeviceEvent(DeviceEvent.STATE_CHANGED, serial, state, old[serial]))
+        
+        for serial, state in old.items():
+            if serial not in new:
+                events.append(DeviceEvent(DeviceEvent.REMOVED, serial, "", state))
+        
+        return events
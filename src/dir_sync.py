@@ -0,0 +1,153 @@
+"""
+Sincronização incremental de diretórios entre o computador e o dispositivo
+
+Monta um manifesto dos dois lados (tamanho, data de modificação e,
+opcionalmente, hash) e calcula o plano: o que enviar, o que remover e o que
+já está igual.
+"""
+
+import os
+import posixpath
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass
+class FileEntry:
+    """Arquivo do manifesto (caminho relativo ao diretório sincronizado)"""
+
+    path: str
+    size: int
+    mtime: int
+    digest: str = ""
+
+
+@dataclass
+class SyncPlan:
+    """Resultado da comparação entre os manifestos"""
+
+    local_dir: str
+    remote_dir: str
+    to_push: List[FileEntry] = field(default_factory=list)
+    to_delete: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    unchanged_bytes: int = 0
+
+    @property
+    def push_bytes(self) -> int:
+        return sum(entry.size for entry in self.to_push)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.to_push and not self.to_delete
+
+    def local_path(self, entry: FileEntry) -> str:
+        return os.path.join(self.local_dir, *entry.path.split("/"))
+
+    def remote_path(self, relative_path: str) -> str:
+        return posixpath.join(self.remote_dir, relative_path)
+
+    def summary(self) -> str:
+        """Resumo do plano (relatório do dry-run)"""
+        lines = [
+            f"Enviar: {len(self.to_push)} arquivo(s), {format_size(self.push_bytes)}",
+            f"Remover: {len(self.to_delete)} arquivo(s)",
+            f"Sem alteração: {self.unchanged} arquivo(s), {format_size(self.unchanged_bytes)}",
+        ]
+        lines += [f"  + {entry.path} ({format_size(entry.size)})" for entry in self.to_push]
+        lines += [f"  - {path}" for path in self.to_delete]
+        return "\n".join(lines)
+
+
+def format_size(size: int) -> str:
+    """Formata um tamanho em bytes (ex: 1.5 GB)"""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def scan_local(local_dir: str) -> Dict[str, FileEntry]:
+    """Manifesto do diretório local (caminhos relativos com "/")"""
+    entries = {}
+    for root, _, files in os.walk(local_dir):
+        for name in files:
+            full_path = os.path.join(root, name)
+            try:
+                stat = os.stat(full_path)
+            except OSError:
+                continue
+            relative = os.path.relpath(full_path, local_dir).replace(os.sep, "/")
+            entries[relative] = FileEntry(relative, stat.st_size, int(stat.st_mtime))
+    return entries
+
+
+def parse_remote_stat(output: str, remote_dir: str) -> Dict[str, FileEntry]:
+    """
+    Interpreta a saída de `find <dir> -type f -exec stat -c '%s %Y %n' {} +`
+
+    Cada linha: <tamanho> <mtime> <caminho completo>
+    """
+    prefix = remote_dir.rstrip("/") + "/"
+    entries = {}
+    for line in output.splitlines():
+        parts = line.split(" ", 2)
+        if len(parts) != 3 or not parts[0].isdigit() or not parts[1].isdigit():
+            continue
+        if not parts[2].startswith(prefix):
+            continue
+        relative = parts[2][len(prefix):]
+        entries[relative] = FileEntry(relative, int(parts[0]), int(parts[1]))
+    return entries
+
+
+def parse_remote_hashes(output: str, remote_dir: str) -> Dict[str, str]:
+    """Interpreta a saída do `sha256sum` (hash, dois espaços, caminho)"""
+    prefix = remote_dir.rstrip("/") + "/"
+    hashes = {}
+    for line in output.splitlines():
+        digest, sep, path = line.partition("  ")
+        if sep and path.startswith(prefix):
+            hashes[path[len(prefix):]] = digest.strip()
+    return hashes
+
+
+def build_plan(
+    local_dir: str,
+    remote_dir: str,
+    local: Dict[str, FileEntry],
+    remote: Dict[str, FileEntry],
+    use_hash: bool = False,
+    delete: bool = False
+) -> SyncPlan:
+    """
+    Compara os manifestos
+
+    Um arquivo é enviado se não existir no dispositivo, se o tamanho for
+    diferente ou se a data de modificação (ou o hash, com use_hash) não
+    bater. Com delete, arquivos que só existem no dispositivo são removidos.
+    """
+    plan = SyncPlan(local_dir, remote_dir.rstrip("/") or "/")
+
+    for path in sorted(local):
+        entry = local[path]
+        other = remote.get(path)
+
+        if other is None or other.size != entry.size:
+            changed = True
+        elif use_hash:
+            changed = not entry.digest or entry.digest != other.digest
+        else:
+            changed = other.mtime != entry.mtime
+
+        if changed:
+            plan.to_push.append(entry)
+        else:
+            plan.unchanged += 1
+            plan.unchanged_bytes += entry.size
+
+    if delete:
+        plan.to_delete = sorted(path for path in remote if path not in local)
+
+    return plan
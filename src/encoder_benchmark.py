@@ -0,0 +1,314 @@
+"""
+Teste dos encoders de vídeo de um dispositivo
+
+Lista os encoders com `scrcpy --list-encoders`, abre uma sessão curta com
+cada um (gravando em um destino nulo) e mede o tempo até o primeiro quadro
+e o FPS alcançado. O vencedor é guardado por modelo de aparelho em
+~/.config/andview/encoders.json e usado automaticamente ao iniciar o espelhamento.
+
+O FPS do scrcpy depende do conteúdo da tela (quadros só são gerados quando
+ela muda): durante o teste, deixe algo animado na tela (ex: um vídeo).
+"""
+
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from .jobs import CancelToken, JobCancelled
+from .scrcpy_telemetry import ScrcpyEvent, ScrcpyOutputReader
+
+
+# Arquivo com o encoder vencedor por modelo
+CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "andview")
+ENCODER_CACHE_FILE = os.path.join(CONFIG_DIR, "encoders.json")
+
+# Limites de cada sessão de teste
+DEFAULT_TRIAL_DURATION = 6.0      # Medição (s) depois do primeiro quadro
+STARTUP_TIMEOUT = 15.0            # Espera máxima (s) pelo primeiro quadro
+LIST_ENCODERS_TIMEOUT = 30
+
+# "--video-codec=h264 --video-encoder=c2.exynos.h264.encoder   (hw) [vendor]"
+# (`--list-encoders` e `--video-encoder` só existem a partir do scrcpy 2.0)
+VIDEO_ENCODER_PATTERN = re.compile(r"--video-codec=(\w+)\s+--video-encoder=(\S+)(.*)$")
+
+
+@dataclass
+class VideoEncoder:
+    """Encoder de vídeo anunciado pelo aparelho"""
+
+    codec: str                          # h264, h265, av1
+    name: str                           # ex: c2.exynos.h264.encoder
+    hardware: Optional[bool] = None     # (hw)/(sw); None se não informado
+    vendor: bool = False                # [vendor]: implementação do fabricante
+
+    @property
+    def label(self) -> str:
+        kind = {True: "hw", False: "sw"}.get(self.hardware, "?")
+        return f"{self.codec} / {self.name} ({kind})"
+
+
+@dataclass
+class EncoderResult:
+    """Resultado da sessão de teste de um encoder"""
+
+    encoder: VideoEncoder
+    fps: float = 0.0                    # FPS médio depois do primeiro quadro
+    startup: Optional[float] = None     # Tempo (s) até o primeiro quadro
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and self.startup is not None
+
+    def summary(self) -> str:
+        if not self.ok:
+            return f"{self.encoder.label}: ❌ {self.error}"
+        return f"{self.encoder.label}: {self.fps:.1f} fps, início em {self.startup:.1f}s"
+
+
+def parse_encoder_list(output: str) -> List[VideoEncoder]:
+    """Interpreta a saída de `scrcpy --list-encoders` (apenas encoders de vídeo)"""
+    encoders = []
+    for line in output.splitlines():
+        match = VIDEO_ENCODER_PATTERN.search(line)
+        if match:
+            flags = match.group(3)
+            hardware = True if "(hw)" in flags else False if "(sw)" in flags else None
+            encoders.append(VideoEncoder(match.group(1), match.group(2), hardware, "[vendor]" in flags))
+    return encoders
+
+
+def rank_results(results: List[EncoderResult]) -> List[EncoderResult]:
+    """
+    Ordena do melhor para o pior
+
+    Sessões que falharam ficam no fim; entre as demais vence o maior FPS
+    (arredondado, para que ruído de medição não decida), depois o menor
+    tempo de início e, por fim, o encoder de hardware.
+    """
+    return sorted(
+        results,
+        key=lambda result: (
+            not result.ok,
+            -round(result.fps),
+            result.startup if result.startup is not None else float("inf"),
+            result.encoder.hardware is not True,
+        )
+    )
+
+
+def list_encoders(scrcpy_path: str, serial: str) -> List[VideoEncoder]:
+    """
+    Lista os encoders de vídeo do aparelho (scrcpy 2.0 ou mais novo)
+
+    Raises:
+        RuntimeError: se o scrcpy falhar ou não listar nenhum encoder
+    """
+    try:
+        result = subprocess.run(
+            [scrcpy_path, "-s", serial, "--list-encoders"],
+            capture_output=True,
+            text=True,
+            errors="replace",
+            timeout=LIST_ENCODERS_TIMEOUT
+        )
+    except FileNotFoundError:
+        raise RuntimeError("scrcpy não encontrado")
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("Timeout ao listar os encoders")
+
+    output = result.stdout + "\n" + result.stderr
+    encoders = parse_encoder_list(output)
+    if not encoders:
+        if "--list-encoders" in output and ("unrecognized" in output or "unknown" in output):
+            raise RuntimeError("O teste de encoders requer o scrcpy 2.0 ou mais novo")
+        raise RuntimeError(f"Nenhum encoder de vídeo listado: {(result.stderr or result.stdout).strip()}")
+    return encoders
+
+
+def run_trial(
+    scrcpy_path: str,
+    serial: str,
+    encoder: VideoEncoder,
+    duration: float = DEFAULT_TRIAL_DURATION,
+    cancel: Optional[CancelToken] = None
+) -> EncoderResult:
+    """
+    Sessão de teste com um encoder (grava em os.devnull)
+
+    Raises:
+        JobCancelled: se cancelado via `cancel`
+    """
+    args = [
+        scrcpy_path, "-s", serial,
+        f"--video-codec={encoder.codec}",
+        f"--video-encoder={encoder.name}",
+        "--no-audio",
+        "--print-fps",
+        f"--record={os.devnull}",
+        "--record-format=mkv",
+        "--window-title", f"AndView - teste {encoder.name}",
+        "--window-width", "270",
+        "--window-height", "585",
+    ]
+    print(f"DEBUG SCRCPY: Teste de encoder: {' '.join(args)}")
+
+    result = EncoderResult(encoder)
+    first_frame = threading.Event()
+    finished = threading.Event()
+    samples: List[int] = []
+    errors: List[str] = []
+
+    def on_event(event: ScrcpyEvent):
+        if event.kind in (ScrcpyEvent.TEXTURE, ScrcpyEvent.FPS) and result.startup is None:
+            result.startup = event.time - started
+            first_frame.set()
+        if event.kind == ScrcpyEvent.FPS:
+            samples.append(event.fps)
+        elif event.kind == ScrcpyEvent.ERROR:
+            errors.append(event.message)
+        elif event.kind == ScrcpyEvent.EXITED:
+            finished.set()
+            first_frame.set()
+
+    started = time.monotonic()
+    try:
+        process = subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1
+        )
+    except FileNotFoundError:
+        result.error = "scrcpy não encontrado"
+        return result
+
+    def stop():
+        if process.poll() is None:
+            process.terminate()
+
+    reader = ScrcpyOutputReader(serial, process, on_event)
+    reader.start()
+    if cancel:
+        cancel.add_callback(stop)
+    try:
+        if not first_frame.wait(STARTUP_TIMEOUT):
+            result.error = "nenhum quadro recebido"
+        elif not finished.is_set():
+            finished.wait(duration)
+            if finished.is_set():
+                result.error = errors[-1] if errors else "scrcpy finalizou durante o teste"
+    finally:
+        stop()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        reader.join(timeout=5)
+        if cancel:
+            cancel.remove_callback(stop)
+
+    if cancel and cancel.cancelled:
+        raise JobCancelled()
+
+    if result.startup is None and not result.error:
+        result.error = errors[-1] if errors else "scrcpy finalizou sem exibir quadros"
+
+    # A primeira amostra inclui o início da sessão
+    measured = samples[1:] if len(samples) > 1 else samples
+    if measured:
+        result.fps = sum(measured) / len(measured)
+    elif result.ok:
+        result.error = "sem amostras de FPS"
+    return result
+
+
+def benchmark_device(
+    scrcpy_path: str,
+    serial: str,
+    duration: float = DEFAULT_TRIAL_DURATION,
+    on_progress: Optional[Callable[[str], None]] = None,
+    cancel: Optional[CancelToken] = None
+) -> List[EncoderResult]:
+    """
+    Testa todos os encoders de vídeo do aparelho, um de cada vez
+
+    Returns:
+        Resultados ordenados do melhor para o pior (rank_results)
+
+    Raises:
+        RuntimeError: se os encoders não puderem ser listados
+        JobCancelled: se cancelado via `cancel`
+    """
+    encoders = list_encoders(scrcpy_path, serial)
+    results = []
+    for index, encoder in enumerate(encoders, 1):
+        if cancel:
+            cancel.raise_if_cancelled()
+        if on_progress:
+            on_progress(f"Testando {encoder.label} ({index}/{len(encoders)})...")
+        result = run_trial(scrcpy_path, serial, encoder, duration, cancel)
+        print(f"DEBUG SCRCPY: {result.summary()}")
+        results.append(result)
+    return rank_results(results)
+
+
+class EncoderCache:
+    """Encoder vencedor por modelo de aparelho (arquivo JSON)"""
+
+    def __init__(self, path: str = ENCODER_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, dict]] = None
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._entries = data if isinstance(data, dict) else {}
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                print(f"DEBUG: Erro ao ler {self.path}: {e}")
+                self._entries = {}
+        return self._entries
+
+    def get(self, model: str) -> Optional[VideoEncoder]:
+        """Encoder vencedor do modelo (None se ainda não testado)"""
+        with self._lock:
+            entry = self._load().get(model)
+        if not entry or "video_codec" not in entry or "video_encoder" not in entry:
+            return None
+        return VideoEncoder(entry["video_codec"], entry["video_encoder"], entry.get("hardware"), entry.get("vendor", False))
+
+    def set(self, model: str, result: EncoderResult):
+        """Guarda o vencedor do modelo (escrita atômica)"""
+        with self._lock:
+            entries = self._load()
+            entries[model] = {
+                "video_codec": result.encoder.codec,
+                "video_encoder": result.encoder.name,
+                "hardware": result.encoder.hardware,
+                "vendor": result.encoder.vendor,
+                "fps": round(result.fps, 1),
+                "startup": round(result.startup, 2) if result.startup is not None else None,
+                "tested_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+
+    def entries(self) -> Dict[str, dict]:
+        with self._lock:
+            return dict(self._load())
@@ -0,0 +1,67 @@
+"""
+Primitivas de cancelamento para operações longas (ADB/scrcpy)
+"""
+
+import threading
+from typing import Callable, List
+
+
+class JobCancelled(Exception):
+    """A operação foi cancelada pelo usuário"""
+
+
+class CancelToken:
+    """
+    Sinaliza o cancelamento de uma operação em andamento
+    
+    Quem executa a operação registra callbacks que a interrompem de fato
+    (ex: matar o processo adb, fechar o socket) e eles são chamados assim
+    que `cancel()` é invocado, de qualquer thread.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+    
+    @property
+    def cancelled(self) -> bool:
+        """Indica se o cancelamento foi solicitado"""
+        return self._event.is_set()
+    
+    def cancel(self):
+        """Solicita o cancelamento e interrompe a operação em andamento"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks)
+        
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"DEBUG: Erro ao cancelar operação: {e}")
+    
+    def add_callback(self, callback: Callable[[], None]):
+        """Registra uma ação de interrupção (executada na hora se já cancelado)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+    
+    def remove_callback(self, callback: Callable[[], None]):
+        """Remove uma ação de interrupção registrada"""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+    
+    def raise_if_cancelled(self):
+        """Lança JobCancelled se o cancelamento foi solicitado"""
+        if self._event.is_set():
+            raise JobCancelled()
+    
+    def wait(self, timeout: float) -> bool:
+        """Aguarda até `timeout` segundos; retorna True se foi cancelado"""
+        return self._event.wait(timeout)
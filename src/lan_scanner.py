@@ -0,0 +1,268 @@
+"""
+Descoberta de dispositivos ADB na rede local
+
+Procura portas do adbd abertas em uma sub-rede (todas as conexões ao mesmo
+tempo, com asyncio) e confirma cada uma com o handshake do protocolo ADB
+(CNXN). Também interpreta a saída de `adb mdns services`, que lista os
+aparelhos com depuração por WiFi (Android 11+) anunciados na rede.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import struct
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .jobs import CancelToken, JobCancelled
+
+
+# Porta padrão do `adb tcpip`
+DEFAULT_ADB_PORT = 5555
+
+# Limites da varredura
+DEFAULT_CONNECT_TIMEOUT = 0.6      # Espera (s) pela conexão TCP e pela resposta do adbd
+DEFAULT_MAX_CONNECTIONS = 512      # Conexões abertas ao mesmo tempo
+MAX_SCAN_PROBES = 1 << 20          # Hosts x portas aceitos em uma varredura
+
+# Pacote do protocolo ADB: comando, arg0, arg1, tamanho, checksum, magic
+ADB_HEADER = struct.Struct("<6I")
+A_CNXN = 0x4E584E43
+A_AUTH = 0x48545541
+A_STLS = 0x534C5453
+A_VERSION = 0x01000001
+A_MAX_PAYLOAD = 256 * 1024
+
+# Respostas que identificam um adbd (conectado, pede autorização ou pede TLS)
+ADB_RESPONSES = {A_CNXN: "CNXN", A_AUTH: "AUTH", A_STLS: "STLS"}
+
+# Serviços mDNS do adbd que aceitam `adb connect` (o de pareamento não)
+MDNS_CONNECT_SERVICES = ("_adb._tcp", "_adb-tls-connect._tcp")
+
+
+@dataclass
+class DiscoveredDevice:
+    """Dispositivo encontrado na rede"""
+
+    host: str
+    port: int
+    source: str = "scan"     # "scan" ou "mdns"
+    handshake: str = ""      # Resposta ao CNXN: CNXN, AUTH ou STLS
+    name: str = ""           # Modelo (CNXN) ou nome do serviço (mDNS)
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def uses_tls(self) -> bool:
+        """Depuração por WiFi (TLS): só conecta se o computador já foi pareado"""
+        return self.handshake == "STLS"
+
+
+def _connect_packet() -> bytes:
+    """Pacote CNXN enviado pelo host ao abrir a conexão"""
+    payload = b"host::\0"
+    checksum = sum(payload) & 0xFFFFFFFF
+    header = ADB_HEADER.pack(A_CNXN, A_VERSION, A_MAX_PAYLOAD, len(payload), checksum, A_CNXN ^ 0xFFFFFFFF)
+    return header + payload
+
+
+def _parse_banner(payload: bytes) -> str:
+    """Modelo do aparelho no banner do CNXN ("device::ro.product.model=...;...")"""
+    banner = payload.decode("utf-8", errors="replace").rstrip("\0")
+    _, _, properties = banner.partition("::")
+    for item in properties.split(";"):
+        key, _, value = item.partition("=")
+        if key == "ro.product.model":
+            return value
+    return ""
+
+
+async def probe_adb(host: str, port: int, timeout: float = DEFAULT_CONNECT_TIMEOUT) -> Optional[DiscoveredDevice]:
+    """
+    Verifica se há um adbd em host:port
+
+    Abre a conexão TCP e envia o CNXN; qualquer resposta válida do
+    protocolo (CNXN, AUTH ou STLS) confirma o adbd. Nenhuma chave é
+    enviada, então o aparelho não mostra o pedido de autorização.
+    """
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    try:
+        writer.write(_connect_packet())
+        header = await asyncio.wait_for(reader.readexactly(ADB_HEADER.size), timeout)
+        command, _, _, length, _, magic = ADB_HEADER.unpack(header)
+        if command not in ADB_RESPONSES or magic != command ^ 0xFFFFFFFF:
+            return None
+
+        name = ""
+        if command == A_CNXN and 0 < length <= A_MAX_PAYLOAD:
+            name = _parse_banner(await asyncio.wait_for(reader.readexactly(length), timeout))
+        return DiscoveredDevice(host, port, "scan", ADB_RESPONSES[command], name)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return None
+    finally:
+        writer.close()
+
+
+async def scan_network(
+    network: str,
+    ports: Iterable[int] = (DEFAULT_ADB_PORT,),
+    timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> List[DiscoveredDevice]:
+    """
+    Procura adbd em todos os hosts da sub-rede (ex: 192.168.1.0/24)
+
+    Args:
+        on_progress: Chamado com (alvos testados, total) a cada 1% da varredura
+
+    Raises:
+        ValueError: se a sub-rede for inválida ou grande demais
+    """
+    subnet = parse_network(network)
+    ports = list(ports)
+    # Conferido antes de listar os hosts (uma /8 teria 16 milhões deles)
+    host_count = max(subnet.num_addresses - 2, 1) if subnet.prefixlen < 31 else subnet.num_addresses
+    probes = host_count * len(ports)
+    if probes > MAX_SCAN_PROBES:
+        raise ValueError(f"Varredura grande demais ({host_count} hosts x {len(ports)} portas)")
+
+    # Um número fixo de tarefas consome os alvos (sem uma corrotina por alvo)
+    targets = ((str(host), port) for port in ports for host in subnet.hosts())
+    found: List[DiscoveredDevice] = []
+    step = max(1, probes // 100)
+    done = 0
+
+    async def worker():
+        nonlocal done
+        for host, port in targets:
+            device = await probe_adb(host, port, timeout)
+            if device is not None:
+                found.append(device)
+            done += 1
+            if on_progress and (done % step == 0 or done == probes):
+                on_progress(done, probes)
+
+    workers = min(max_connections, probes)
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return sorted(found, key=lambda device: (ipaddress.IPv4Address(device.host), device.port))
+
+
+def run_scan(
+    network: str,
+    ports: Iterable[int] = (DEFAULT_ADB_PORT,),
+    timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    cancel: Optional[CancelToken] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> List[DiscoveredDevice]:
+    """
+    Executa scan_network em um loop próprio (para threads de trabalho)
+
+    Raises:
+        ValueError: se a sub-rede for inválida ou grande demais
+        JobCancelled: se cancelado via `cancel`
+    """
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(scan_network(network, ports, timeout, on_progress=on_progress))
+
+    def interrupt():
+        loop.call_soon_threadsafe(task.cancel)
+
+    if cancel:
+        cancel.add_callback(interrupt)
+    try:
+        return loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        raise JobCancelled()
+    finally:
+        if cancel:
+            cancel.remove_callback(interrupt)
+        loop.close()
+
+
+def parse_network(network: str) -> ipaddress.IPv4Network:
+    """
+    Interpreta a sub-rede (CIDR; um IP sozinho vira a /24 dele)
+
+    Raises:
+        ValueError: se o texto não for uma sub-rede IPv4
+    """
+    text = network.strip()
+    if "/" not in text:
+        text += "/24"
+    try:
+        return ipaddress.IPv4Network(text, strict=False)
+    except (ipaddress.AddressValueError, ipaddress.NetmaskValueError, ValueError):
+        raise ValueError(f"Sub-rede inválida: {network}")
+
+
+def parse_port_range(text: str) -> List[int]:
+    """
+    Interpreta uma lista de portas ("5555, 37000-45000")
+
+    Raises:
+        ValueError: se alguma porta for inválida
+    """
+    ports: Dict[int, None] = {}
+    for item in text.replace(";", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        first, _, last = item.partition("-")
+        try:
+            start = int(first)
+            end = int(last) if last else start
+        except ValueError:
+            raise ValueError(f"Porta inválida: {item}")
+        if not 1 <= start <= end <= 65535:
+            raise ValueError(f"Porta inválida: {item}")
+        ports.update(dict.fromkeys(range(start, end + 1)))
+    return list(ports)
+
+
+def local_network() -> str:
+    """
+    Sub-rede /24 do computador na rede local ("" se não houver rede)
+
+    Descobre o IP de saída sem enviar pacotes (connect em socket UDP).
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(("10.255.255.255", 1))
+        address = sock.getsockname()[0]
+    except OSError:
+        return ""
+    finally:
+        sock.close()
+    if address.startswith("127."):
+        return ""
+    return str(ipaddress.IPv4Network(f"{address}/24", strict=False))
+
+
+def parse_mdns_services(output: str) -> List[DiscoveredDevice]:
+    """
+    Interpreta a saída de `adb mdns services`
+
+    Cada linha: <instância> <tipo do serviço> <ip:porta>. Apenas os
+    serviços que aceitam `adb connect` são retornados (não os de pareamento).
+    """
+    devices = []
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        name, service, endpoint = parts[0], parts[1].rstrip("."), parts[-1]
+        if service not in MDNS_CONNECT_SERVICES:
+            continue
+        host, _, port = endpoint.rpartition(":")
+        if not host or not port.isdigit():
+            continue
+        handshake = "STLS" if service == "_adb-tls-connect._tcp" else ""
+        devices.append(DiscoveredDevice(host, int(port), "mdns", handshake, name))
+    return devices
@@ -0,0 +1,183 @@
+"""
+Orçamento de banda e decodificação para várias sessões do scrcpy
+
+Com muitos aparelhos espelhados ao mesmo tempo, a soma dos bitrates satura
+os hubs USB / a rede e a soma de pixels x FPS satura o decodificador do
+computador. Este módulo divide um orçamento total (bitrate, FPS e pixels
+por quadro) entre as sessões, com prioridade para a sessão em foco e sem
+passar do que cada sessão pediu nas suas opções.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+# Proporção (largura / altura) típica de um celular em retrato
+DEVICE_ASPECT = 9 / 19.5
+
+# Valores assumidos quando a sessão não limita bitrate, FPS ou resolução
+DEFAULT_BIT_RATE = 8_000_000
+DEFAULT_FPS = 60
+DEFAULT_MAX_SIZE = 2400
+
+# Mínimos por sessão (abaixo disso a imagem fica inutilizável)
+MIN_BIT_RATE = 1_000_000
+MIN_FPS = 15
+MIN_MAX_SIZE = 480
+
+# Variação relativa a partir da qual uma sessão é reiniciada no rebalanceamento
+REBALANCE_TOLERANCE = 0.2
+
+
+@dataclass
+class MirroringBudget:
+    """Orçamento total dividido entre as sessões ativas"""
+
+    total_bit_rate: int = 40_000_000    # bits/s somando todas as sessões
+    total_fps: int = 240                # Quadros/s somando todas as sessões
+    total_pixels: int = 10_000_000      # Pixels por quadro somando todas as sessões
+    focus_weight: float = 3.0           # Peso da sessão em foco (as demais pesam 1)
+
+
+@dataclass
+class SessionRequest:
+    """O máximo que uma sessão pediu (valores das opções dela)"""
+
+    bit_rate: int = DEFAULT_BIT_RATE
+    max_fps: int = DEFAULT_FPS
+    max_size: int = DEFAULT_MAX_SIZE
+
+
+@dataclass
+class SessionAllocation:
+    """Parte do orçamento atribuída a uma sessão"""
+
+    bit_rate: int
+    max_fps: int
+    max_size: int
+
+    @property
+    def bit_rate_text(self) -> str:
+        return format_bit_rate(self.bit_rate)
+
+
+def parse_bit_rate(text: Optional[str]) -> Optional[int]:
+    """Converte o bitrate do scrcpy ("8M", "2500K", "4000000") para bits/s"""
+    if not text:
+        return None
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KkMm]?)\s*", str(text))
+    if not match:
+        return None
+    value = float(match.group(1))
+    unit = match.group(2).upper()
+    if unit == "K":
+        value *= 1000
+    elif unit == "M":
+        value *= 1000 * 1000
+    return int(value)
+
+
+def format_bit_rate(value: int) -> str:
+    """Formata bits/s no formato aceito pelo scrcpy (ex: "8M", "2500K")"""
+    if value >= 1_000_000 and value % 1_000_000 == 0:
+        return f"{value // 1_000_000}M"
+    return f"{max(1, round(value / 1000))}K"
+
+
+def frame_pixels(max_size: int, aspect: float = DEVICE_ASPECT) -> int:
+    """Pixels de um quadro cujo lado maior é `max_size`"""
+    return int(max_size * max_size * aspect)
+
+
+def request_from_options(options) -> SessionRequest:
+    """Extrai de um ScrcpyOptions o máximo pedido pela sessão"""
+    if options is None:
+        return SessionRequest()
+    return SessionRequest(
+        bit_rate=parse_bit_rate(options.bit_rate) or DEFAULT_BIT_RATE,
+        max_fps=options.max_fps or DEFAULT_FPS,
+        max_size=options.max_size or DEFAULT_MAX_SIZE
+    )
+
+
+def _share(total: float, weights: Dict[str, float], caps: Dict[str, float]) -> Dict[str, float]:
+    """
+    Divide `total` proporcionalmente aos pesos sem passar do teto de cada um
+
+    O que uma sessão não usa (pediu menos que a sua parte) é redistribuído
+    entre as outras.
+    """
+    shares: Dict[str, float] = {}
+    pending = dict(weights)
+    remaining = float(total)
+    while pending:
+        weight_sum = sum(pending.values())
+        capped = [key for key, weight in pending.items() if remaining * weight / weight_sum >= caps[key]]
+        if not capped:
+            for key, weight in pending.items():
+                shares[key] = remaining * weight / weight_sum
+            break
+        for key in capped:
+            shares[key] = caps[key]
+            remaining -= caps[key]
+            del pending[key]
+    return shares
+
+
+def allocate(
+    requests: Dict[str, SessionRequest],
+    budget: MirroringBudget,
+    focused: Optional[str] = None,
+    aspect: float = DEVICE_ASPECT
+) -> Dict[str, SessionAllocation]:
+    """
+    Divide o orçamento entre as sessões (serial -> pedido)
+
+    A sessão em foco pesa `budget.focus_weight`; cada sessão recebe no
+    máximo o que pediu e no mínimo MIN_BIT_RATE / MIN_FPS / MIN_MAX_SIZE,
+    mesmo que isso ultrapasse o total.
+    """
+    if not requests:
+        return {}
+
+    weights = {
+        serial: budget.focus_weight if serial == focused else 1.0
+        for serial in requests
+    }
+
+    bit_rates = _share(budget.total_bit_rate, weights, {s: r.bit_rate for s, r in requests.items()})
+    fps = _share(budget.total_fps, weights, {s: r.max_fps for s, r in requests.items()})
+    pixels = _share(budget.total_pixels, weights, {s: frame_pixels(r.max_size, aspect) for s, r in requests.items()})
+
+    allocations = {}
+    for serial, request in requests.items():
+        bit_rate = request.bit_rate
+        if bit_rates[serial] < request.bit_rate:
+            bit_rate = max(min(MIN_BIT_RATE, request.bit_rate), int(bit_rates[serial]) // 100_000 * 100_000)
+
+        max_fps = request.max_fps
+        if fps[serial] < request.max_fps:
+            max_fps = max(min(MIN_FPS, request.max_fps), int(fps[serial]))
+
+        max_size = request.max_size
+        if pixels[serial] < frame_pixels(request.max_size, aspect):
+            # Lado maior cujo quadro cabe nos pixels atribuídos (múltiplo de 8, como o scrcpy)
+            size = int(math.sqrt(pixels[serial] / aspect)) // 8 * 8
+            max_size = max(min(MIN_MAX_SIZE, request.max_size), size)
+
+        allocations[serial] = SessionAllocation(bit_rate, max_fps, max_size)
+    return allocations
+
+
+def allocation_changed(current: SessionAllocation, new: SessionAllocation, tolerance: float = REBALANCE_TOLERANCE) -> bool:
+    """Verifica se a nova parte difere o suficiente para reiniciar a sessão"""
+    for old_value, new_value in (
+        (current.bit_rate, new.bit_rate),
+        (current.max_fps, new.max_fps),
+        (current.max_size, new.max_size)
+    ):
+        if abs(new_value - old_value) > tolerance * max(old_value, 1):
+            return True
+    return False
@@ -2,10 +2,27 @@
 Módulo para gerenciamento do scrcpy
 """
 
+import math
 import subprocess
 import shlex
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple, Callable
+from dataclasses import dataclass, replace
+
+from .mirroring_budget import (
+    DEFAULT_FPS, DEVICE_ASPECT, MirroringBudget, SessionAllocation,
+    allocate, allocation_changed, request_from_options
+)
+from .adaptive_bitrate import AdaptationDecision, AdaptiveBitrateController, scale_options
+from .scrcpy_telemetry import ScrcpyEvent, ScrcpyOutputReader, SessionTelemetry
+from .encoder_benchmark import EncoderCache, EncoderResult, benchmark_device
+from .jobs import CancelToken
+
+
+# Janelas lado a lado: espaço entre janelas e altura da barra de título
+TILE_GAP = 8
+TILE_TITLE_BAR = 32
 
 
 @dataclass
@@ -44,6 +61,7 @@ class ScrcpyOptions:
     
     # Codec
     video_codec: str = "h264"  # h264, h265, av1
+    video_encoder: Optional[str] = None  # ex: c2.exynos.h264.encoder (None = padrão do aparelho)
     
     # Outras
     window_title: Optional[str] = None
@@ -52,6 +70,13 @@ class ScrcpyOptions:
     window_width: Optional[int] = None
     window_height: Optional[int] = None
     
+    # Telemetria: o scrcpy imprime o FPS a cada segundo (lido pelo AndView)
+    print_fps: bool = True
+    
+    # Bitrate adaptativo: o AndView reabre a sessão com menos/mais qualidade
+    # conforme o FPS (não é um argumento do scrcpy)
+    adaptive_bitrate: bool = False
+    
     def to_args(self) -> list:
         """Converte as opções para argumentos de linha de comando"""
         args = []
@@ -103,6 +128,9 @@ class ScrcpyOptions:
         if self.video_codec:
             args.extend(["--video-codec", self.video_codec])
         
+        if self.video_encoder:
+            args.append(f"--video-encoder={self.video_encoder}")
+        
         if self.window_title:
             args.extend(["--window-title", self.window_title])
         
@@ -114,15 +142,116 @@ class ScrcpyOptions:
             args.extend(["--window-width", str(self.window_width)])
             args.extend(["--window-height", str(self.window_height)])
         
+        if self.print_fps:
+            args.append("--print-fps")
+        
         return args
 
 
+class ScrcpySession:
+    """Uma sessão de espelhamento (um processo scrcpy por dispositivo)"""
+    
+    def __init__(
+        self,
+        serial: str,
+        process: subprocess.Popen,
+        options: Optional[ScrcpyOptions] = None,
+        requested: Optional[ScrcpyOptions] = None,
+        allocation: Optional[SessionAllocation] = None
+    ):
+        self.serial = serial
+        self.process = process
+        self.options = options          # Opções em uso (com o orçamento aplicado)
+        self.requested = requested      # Opções pedidas pelo usuário
+        self.allocation = allocation    # Parte do orçamento (None sem orçamento)
+        self.started_at = time.monotonic()
+        self.telemetry = SessionTelemetry(serial)
+        self.reader: Optional[ScrcpyOutputReader] = None
+        self.adaptive: Optional[AdaptiveBitrateController] = None
+        self.native_size: Optional[int] = None   # Lado maior da tela (sem max_size)
+    
+    @property
+    def running(self) -> bool:
+        """Verifica se o processo ainda está ativo"""
+        return self.process.poll() is None
+    
+    @property
+    def uptime(self) -> float:
+        """Tempo (s) desde o início da sessão"""
+        return time.monotonic() - self.started_at
+
+
+def tile_windows(count: int, area: Tuple[int, int, int, int], aspect: float = DEVICE_ASPECT) -> List[Tuple[int, int, int, int]]:
+    """
+    Divide a área (x, y, largura, altura) em `count` janelas lado a lado
+    
+    Escolhe o número de colunas que deixa as janelas maiores, considerando
+    que o espelhamento mantém a proporção (largura / altura) do aparelho.
+    
+    Returns:
+        Lista (x, y, largura, altura) de cada janela, linha por linha
+    """
+    if count <= 0:
+        return []
+    
+    x, y, width, height = area
+    best = None
+    for columns in range(1, count + 1):
+        rows = math.ceil(count / columns)
+        cell_width = max(1, (width - TILE_GAP * (columns + 1)) // columns)
+        cell_height = max(1, (height - TILE_GAP * (rows + 1)) // rows - TILE_TITLE_BAR)
+        
+        # Maior janela com a proporção do aparelho que cabe na célula
+        window_width = max(1, min(cell_width, int(cell_height * aspect)))
+        if best is None or window_width > best[0]:
+            best = (window_width, columns, cell_width, cell_height)
+    
+    window_width, columns, cell_width, cell_height = best
+    window_height = max(1, min(cell_height, int(window_width / aspect)))
+    
+    windows = []
+    for index in range(count):
+        row, column = divmod(index, columns)
+        window_x = x + TILE_GAP + column * (cell_width + TILE_GAP)
+        window_y = y + TILE_GAP + row * (cell_height + TILE_TITLE_BAR + TILE_GAP) + TILE_TITLE_BAR
+        windows.append((window_x, window_y, window_width, window_height))
+    return windows
+
+
+def _apply_allocation(options: Optional[ScrcpyOptions], allocation: SessionAllocation) -> ScrcpyOptions:
+    """Opções da sessão limitadas à parte do orçamento (nunca acima do pedido)"""
+    request = request_from_options(options)
+    limits = {}
+    if allocation.bit_rate < request.bit_rate:
+        limits["bit_rate"] = allocation.bit_rate_text
+    if allocation.max_fps < request.max_fps:
+        limits["max_fps"] = allocation.max_fps
+    if allocation.max_size < request.max_size:
+        limits["max_size"] = allocation.max_size
+    
+    if not limits:
+        return options
+    return replace(options or ScrcpyOptions(), **limits)
+
+
 class ScrcpyManager:
-    """Gerenciador do scrcpy"""
+    """Gerenciador do scrcpy (uma sessão por dispositivo)"""
     
     def __init__(self):
         self.scrcpy_path = "scrcpy"
-        self.process: Optional[subprocess.Popen] = None
+        self.sessions: Dict[str, ScrcpySession] = {}
+        self._lock = threading.Lock()
+        
+        # Orçamento dividido entre as sessões (None = cada uma usa o que pediu)
+        self.budget: Optional[MirroringBudget] = MirroringBudget()
+        self.focused_serial: Optional[str] = None
+        self._balance_lock = threading.RLock()
+        
+        # Chamado (na thread de leitura da sessão) a cada evento da saída do scrcpy
+        self.on_event: Optional[Callable[[ScrcpyEvent], None]] = None
+        
+        # Encoder vencedor do teste, por modelo de aparelho
+        self.encoder_cache = EncoderCache()
         
     def check_scrcpy_available(self) -> bool:
         """Verifica se o scrcpy está instalado e disponível"""
@@ -157,7 +286,10 @@ class ScrcpyManager:
     
     def start_mirroring(self, serial: Optional[str] = None, options: Optional[ScrcpyOptions] = None) -> tuple[bool, str]:
         """
-        Inicia o espelhamento de tela
+        Inicia o espelhamento de tela de um dispositivo
+        
+        Com orçamento ativo, a nova sessão recebe a sua parte e as outras
+        são rebalanceadas.
         
         Args:
             serial: Serial do dispositivo (None para o primeiro dispositivo)
@@ -166,37 +298,63 @@ class ScrcpyManager:
         Returns:
             Tuple (sucesso, mensagem)
         """
-        if self.is_running():
-            return False, "scrcpy já está em execução"
+        with self._balance_lock:
+            success, message = self._start_session(serial or "", options)
+            if success:
+                self._rebalance()
+            return success, message
+    
+    def start_mirroring_many(
+        self,
+        serials: List[str],
+        options: Optional[ScrcpyOptions] = None,
+        area: Optional[Tuple[int, int, int, int]] = None,
+        models: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Tuple[bool, str]]:
+        """
+        Espelha vários dispositivos ao mesmo tempo, uma janela por dispositivo
         
-        try:
-            args = [self.scrcpy_path]
-            
-            # Adiciona o serial se fornecido
-            if serial:
-                args.extend(["-s", serial])
-            
-            # Adiciona as opções se fornecidas
-            if options:
-                args.extend(options.to_args())
-            
-            # Debug: mostra o comando completo
-            print(f"DEBUG SCRCPY: Comando completo: {' '.join(args)}")
-            
-            # Inicia o processo em background
-            self.process = subprocess.Popen(
-                args,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+        Args:
+            serials: Seriais dos dispositivos
+            options: Opções comuns a todas as sessões (copiadas por sessão)
+            area: Área da tela (x, y, largura, altura) onde as janelas são
+                distribuídas lado a lado; None mantém a posição do scrcpy
+            models: Modelo de cada serial (usa o encoder vencedor do modelo)
+        
+        Returns:
+            Dict serial -> (sucesso, mensagem)
+        """
+        results: Dict[str, Tuple[bool, str]] = {}
+        pending = []
+        for serial in serials:
+            if self.is_running(serial):
+                results[serial] = (False, "scrcpy já está em execução para este dispositivo")
+            else:
+                pending.append(serial)
+        
+        layout = tile_windows(len(pending), area) if area else []
+        session_options: Dict[str, ScrcpyOptions] = {}
+        for index, serial in enumerate(pending):
+            copy = replace(options) if options else ScrcpyOptions()
             
-            return True, "scrcpy iniciado com sucesso"
+            # Título com o serial para distinguir as janelas
+            title = copy.window_title
+            copy.window_title = f"{title} - {serial}" if title else serial
             
-        except FileNotFoundError:
-            return False, "scrcpy não encontrado. Certifique-se de que está instalado."
-        except Exception as e:
-            return False, f"Erro ao iniciar scrcpy: {str(e)}"
+            if layout:
+                copy.fullscreen = False
+                copy.window_x, copy.window_y, copy.window_width, copy.window_height = layout[index]
+            session_options[serial] = self.apply_preferred_encoder(copy, (models or {}).get(serial))
+        
+        with self._balance_lock:
+            # O orçamento é dividido já contando todas as novas sessões
+            allocations = self._allocate(session_options) if self.budget else {}
+            for serial, copy in session_options.items():
+                results[serial] = self._start_session(serial, copy, allocations.get(serial))
+                print(f"DEBUG SCRCPY: Sessão {serial}: {results[serial][1]}")
+            self._rebalance()
+        
+        return results
     
     def start_mirroring_wireless(self, ip_address: str, port: int = 5555, options: Optional[ScrcpyOptions] = None) -> tuple[bool, str]:
         """
@@ -210,68 +368,363 @@ class ScrcpyManager:
         Returns:
             Tuple (sucesso, mensagem)
         """
-        if self.is_running():
-            return False, "scrcpy já está em execução"
+        address = f"{ip_address}:{port}"
+        if self.is_running(address):
+            return False, "scrcpy já está em execução para este dispositivo"
         
         try:
             # Primeiro, conecta ao dispositivo via ADB
             connect_result = subprocess.run(
-                ["adb", "connect", f"{ip_address}:{port}"],
+                ["adb", "connect", address],
                 capture_output=True,
                 text=True,
                 timeout=10
             )
+        except FileNotFoundError:
+            return False, "scrcpy ou adb não encontrado"
+        except subprocess.TimeoutExpired:
+            return False, "Timeout ao conectar ao dispositivo"
+        
+        if "connected" not in connect_result.stdout.lower():
+            return False, f"Falha ao conectar ao dispositivo: {connect_result.stdout}"
+        
+        # Então inicia o scrcpy
+        success, message = self.start_mirroring(address, options)
+        if success:
+            message = f"scrcpy conectado a {address}"
+        return success, message
+    
+    def benchmark_encoders(
+        self,
+        serial: str,
+        model: str,
+        on_progress: Optional[Callable[[str], None]] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> List[EncoderResult]:
+        """
+        Testa os encoders de vídeo do aparelho e guarda o vencedor do modelo
+        
+        Returns:
+            Resultados do melhor para o pior
+        
+        Raises:
+            RuntimeError: se o dispositivo estiver espelhando ou os encoders
+                não puderem ser listados
+            JobCancelled: se cancelado via `cancel`
+        """
+        if self.is_running(serial):
+            raise RuntimeError("Pare o espelhamento do dispositivo antes de testar os encoders")
+        
+        results = benchmark_device(self.scrcpy_path, serial, on_progress=on_progress, cancel=cancel)
+        if results and results[0].ok:
+            self.encoder_cache.set(model, results[0])
+            print(f"DEBUG SCRCPY: Encoder vencedor para {model}: {results[0].summary()}")
+        return results
+    
+    def apply_preferred_encoder(self, options: Optional[ScrcpyOptions], model: Optional[str]) -> Optional[ScrcpyOptions]:
+        """Usa o encoder vencedor do modelo, se testado (mantém um encoder escolhido explicitamente)"""
+        if not model or (options and options.video_encoder):
+            return options
+        
+        encoder = self.encoder_cache.get(model)
+        if encoder is None:
+            return options
+        return replace(options or ScrcpyOptions(), video_codec=encoder.codec, video_encoder=encoder.name)
+    
+    def set_budget(self, budget: Optional[MirroringBudget]):
+        """Define o orçamento total (None desliga) e rebalanceia as sessões"""
+        with self._balance_lock:
+            self.budget = budget
+            self._rebalance()
+    
+    def set_focus(self, serial: Optional[str]):
+        """Define a sessão em foco (maior parte do orçamento) e rebalanceia"""
+        with self._balance_lock:
+            if serial == self.focused_serial:
+                return
+            self.focused_serial = serial
+            self._rebalance()
+    
+    def _command(self, serial: str, options: Optional[ScrcpyOptions]) -> list:
+        """Linha de comando do scrcpy para o dispositivo"""
+        args = [self.scrcpy_path]
+        
+        # Adiciona o serial se fornecido
+        if serial:
+            args.extend(["-s", serial])
+        
+        # Adiciona as opções se fornecidas
+        if options:
+            args.extend(options.to_args())
+        
+        return args
+    
+    def _spawn(self, serial: str, options: Optional[ScrcpyOptions]) -> subprocess.Popen:
+        """Abre o processo scrcpy em background"""
+        args = self._command(serial, options)
+        
+        # Debug: mostra o comando completo
+        print(f"DEBUG SCRCPY: Comando completo: {' '.join(args)}")
+        
+        # stderr junto do stdout: uma única thread consome os dois
+        return subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1
+        )
+    
+    def _attach_reader(self, session: ScrcpySession):
+        """Inicia a thread que lê a saída do processo atual da sessão"""
+        process = session.process
+        session.reader = ScrcpyOutputReader(
+            session.serial, process,
+            lambda event: self._on_output(session, process, event)
+        )
+        session.reader.start()
+    
+    def _on_output(self, session: ScrcpySession, process: subprocess.Popen, event: ScrcpyEvent):
+        """Atualiza a telemetria da sessão e repassa o evento"""
+        with self._lock:
+            # Processo substituído (rebalanceamento) ou sessão já finalizada
+            if session.process is not process or self.sessions.get(session.serial) is not session:
+                return
+        
+        session.telemetry.update(event)
+        if event.kind in (ScrcpyEvent.ERROR, ScrcpyEvent.DISCONNECTED, ScrcpyEvent.ENCODER, ScrcpyEvent.EXITED):
+            print(f"DEBUG SCRCPY: {session.serial}: {event.kind} - {event.message}")
+        
+        # Resolução nativa (para reduzir a resolução no modo adaptativo)
+        if event.kind == ScrcpyEvent.TEXTURE and session.native_size is None \
+                and not (session.options and session.options.max_size):
+            session.native_size = max(int(value) for value in event.value.split("x"))
+        
+        if self.on_event:
+            self.on_event(event)
+        
+        if event.kind == ScrcpyEvent.FPS and session.adaptive:
+            decision = session.adaptive.observe(event.fps, event.skipped, event.time)
+            if decision:
+                # Reabrir a sessão encerra este processo: não roda na thread de leitura
+                threading.Thread(
+                    target=self._adapt, args=(session, decision),
+                    name=f"scrcpy-adapt-{session.serial}", daemon=True
+                ).start()
+    
+    def _adapt(self, session: ScrcpySession, decision: AdaptationDecision):
+        """Aplica uma decisão do bitrate adaptativo (reabre a sessão)"""
+        with self._balance_lock:
+            with self._lock:
+                if self.sessions.get(session.serial) is not session or not session.running:
+                    return
             
-            if "connected" not in connect_result.stdout.lower():
-                return False, f"Falha ao conectar ao dispositivo: {connect_result.stdout}"
-            
-            # Então inicia o scrcpy
-            args = [self.scrcpy_path, "-s", f"{ip_address}:{port}"]
-            
-            if options:
-                args.extend(options.to_args())
-            
-            self.process = subprocess.Popen(
-                args,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+            options = self._effective_options(session.requested, session.allocation, session.adaptive, session.native_size)
+            arrow = "↓" if decision.direction == AdaptationDecision.DOWN else "↑"
+            size = options.max_size if options and options.max_size else "original"
+            bit_rate = options.bit_rate if options else "padrão"
+            message = (
+                f"Qualidade {arrow} nível {decision.level_from} -> {decision.level_to} "
+                f"({bit_rate}, {size}): {decision.reason}"
             )
+            print(f"DEBUG SCRCPY: Adaptativo {session.serial}: {message}")
+            self._restart(session, options, session.allocation)
+        
+        event = ScrcpyEvent(ScrcpyEvent.ADAPTED, session.serial, message, value=str(decision.level_to))
+        session.telemetry.update(event)
+        if self.on_event:
+            self.on_event(event)
+    
+    def _effective_options(
+        self,
+        requested: Optional[ScrcpyOptions],
+        allocation: Optional[SessionAllocation],
+        adaptive: Optional[AdaptiveBitrateController] = None,
+        native_size: Optional[int] = None
+    ) -> Optional[ScrcpyOptions]:
+        """Opções pedidas com a parte do orçamento e o degrau adaptativo aplicados"""
+        options = _apply_allocation(requested, allocation) if allocation else requested
+        if adaptive and adaptive.level:
+            options = scale_options(options or ScrcpyOptions(), adaptive.level, native_size)
+        return options
+    
+    def _start_session(
+        self,
+        serial: str,
+        options: Optional[ScrcpyOptions],
+        allocation: Optional[SessionAllocation] = None
+    ) -> Tuple[bool, str]:
+        """
+        Abre o scrcpy e registra a sessão do dispositivo
+        
+        Args:
+            allocation: Parte do orçamento já calculada (senão é calculada aqui)
+        """
+        if self.budget and allocation is None:
+            allocation = self._allocate({serial: options})[serial]
+        effective = self._effective_options(options, allocation)
+        
+        try:
+            with self._lock:
+                session = self.sessions.get(serial)
+                if session is not None and session.running:
+                    return False, "scrcpy já está em execução para este dispositivo"
+                
+                process = self._spawn(serial, effective)
+                session = ScrcpySession(serial, process, effective, options, allocation)
+                if options and options.adaptive_bitrate:
+                    session.adaptive = AdaptiveBitrateController((effective.max_fps if effective else None) or DEFAULT_FPS)
+                self.sessions[serial] = session
             
-            return True, f"scrcpy conectado a {ip_address}:{port}"
+            self._attach_reader(session)
+            return True, "scrcpy iniciado com sucesso"
             
         except FileNotFoundError:
-            return False, "scrcpy ou adb não encontrado"
-        except subprocess.TimeoutExpired:
-            return False, "Timeout ao conectar ao dispositivo"
+            return False, "scrcpy não encontrado. Certifique-se de que está instalado."
         except Exception as e:
             return False, f"Erro ao iniciar scrcpy: {str(e)}"
     
-    def stop_mirroring(self) -> tuple[bool, str]:
-        """Para o espelhamento de tela"""
-        if not self.is_running():
-            return False, "scrcpy não está em execução"
+    def _allocate(self, starting: Dict[str, Optional[ScrcpyOptions]]) -> Dict[str, SessionAllocation]:
+        """Divide o orçamento entre as sessões ativas e as que estão iniciando"""
+        with self._lock:
+            requests = {
+                serial: request_from_options(session.requested)
+                for serial, session in self.sessions.items()
+                if session.running
+            }
+        for serial, options in starting.items():
+            requests[serial] = request_from_options(options)
+        return allocate(requests, self.budget, self.focused_serial)
+    
+    def _rebalance(self):
+        """
+        Reaplica o orçamento às sessões ativas
         
+        O scrcpy não muda bitrate/FPS/resolução durante a sessão, então só
+        as sessões cuja parte mudou além de REBALANCE_TOLERANCE são
+        reiniciadas.
+        """
+        allocations = self._allocate({}) if self.budget else {}
+        
+        with self._lock:
+            sessions = [session for session in self.sessions.values() if session.running]
+        
+        for session in sessions:
+            allocation = allocations.get(session.serial)
+            effective = self._effective_options(session.requested, allocation, session.adaptive, session.native_size)
+            
+            if effective == session.options:
+                session.allocation = allocation
+                continue
+            if allocation and session.allocation and not allocation_changed(session.allocation, allocation):
+                continue
+            
+            print(f"DEBUG SCRCPY: Rebalanceando {session.serial}: {allocation or 'sem orçamento'}")
+            self._restart(session, effective, allocation)
+    
+    def _restart(self, session: ScrcpySession, options: Optional[ScrcpyOptions], allocation: Optional[SessionAllocation]):
+        """Reabre o scrcpy com novas opções (o novo abre antes de fechar o antigo)"""
         try:
-            self.process.terminate()
-            self.process.wait(timeout=5)
-            self.process = None
-            return True, "scrcpy finalizado"
-        except subprocess.TimeoutExpired:
-            # Force kill se não terminar normalmente
-            self.process.kill()
-            self.process = None
-            return True, "scrcpy finalizado (forçado)"
+            process = self._spawn(session.serial, options)
         except Exception as e:
-            return False, f"Erro ao finalizar scrcpy: {str(e)}"
+            print(f"DEBUG SCRCPY: Erro ao reiniciar {session.serial}: {e}")
+            return
+        
+        with self._lock:
+            old_process = session.process
+            session.process = process
+            session.options = options
+            session.allocation = allocation
+        
+        session.telemetry.restarted()
+        if session.adaptive:
+            session.adaptive.restarted((options.max_fps if options else None) or DEFAULT_FPS)
+        self._attach_reader(session)
+        self._terminate([old_process])
     
-    def is_running(self) -> bool:
-        """Verifica se o scrcpy está em execução"""
-        if self.process is None:
-            return False
+    @staticmethod
+    def _terminate(processes: List[subprocess.Popen]) -> bool:
+        """
+        Finaliza os processos (todos sinalizados antes de esperar)
         
-        # Verifica se o processo ainda está ativo
-        return self.process.poll() is None
+        Returns:
+            True se algum precisou ser morto à força
+        """
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        
+        forced = False
+        deadline = time.monotonic() + 5
+        for process in processes:
+            try:
+                process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                # Force kill se não terminar normalmente
+                process.kill()
+                process.wait()
+                forced = True
+        return forced
+    
+    def stop_mirroring(self, serial: Optional[str] = None) -> tuple[bool, str]:
+        """
+        Para o espelhamento de tela
+        
+        Args:
+            serial: Dispositivo cuja sessão será finalizada (None para todas)
+        """
+        with self._balance_lock:
+            with self._lock:
+                if serial is None:
+                    sessions = [session for session in self.sessions.values() if session.running]
+                    self.sessions.clear()
+                else:
+                    session = self.sessions.pop(serial, None)
+                    sessions = [session] if session is not None and session.running else []
+            
+            if not sessions:
+                return False, "scrcpy não está em execução"
+            
+            try:
+                forced = self._terminate([session.process for session in sessions])
+            except Exception as e:
+                return False, f"Erro ao finalizar scrcpy: {str(e)}"
+            
+            # As sessões restantes podem usar a parte liberada
+            self._rebalance()
+        
+        message = "scrcpy finalizado" if len(sessions) == 1 else f"{len(sessions)} sessões do scrcpy finalizadas"
+        if forced:
+            message += " (forçado)"
+        return True, message
+    
+    def is_running(self, serial: Optional[str] = None) -> bool:
+        """Verifica se o scrcpy está em execução (para o dispositivo ou em qualquer um)"""
+        with self._lock:
+            if serial is None:
+                return any(session.running for session in self.sessions.values())
+            session = self.sessions.get(serial)
+            return session is not None and session.running
+    
+    def running_serials(self) -> List[str]:
+        """Dispositivos com sessão de espelhamento ativa"""
+        with self._lock:
+            return [serial for serial, session in self.sessions.items() if session.running]
+    
+    def telemetry(self, serial: str) -> Optional[SessionTelemetry]:
+        """Telemetria (estado, encoder, FPS, erros) da sessão do dispositivo"""
+        with self._lock:
+            session = self.sessions.get(serial)
+            return session.telemetry if session else None
+    
+    def reap_finished_sessions(self) -> List[str]:
+        """Remove as sessões cujo scrcpy terminou (janela fechada) e retorna os seriais"""
+        with self._lock:
+            finished = [serial for serial, session in self.sessions.items() if not session.running]
+            for serial in finished:
+                del self.sessions[serial]
+        return finished
     
     def get_preset_options(self, preset: str) -> ScrcpyOptions:
         """
@@ -327,13 +780,16 @@ class ScrcpyManager:
                 stay_awake=True
             )
     
-    def get_process_info(self) -> Optional[Dict[str, Any]]:
-        """Retorna informações sobre o processo em execução"""
-        if not self.is_running():
-            return None
-        
-        return {
-            "pid": self.process.pid,
-            "running": True
-        }
-
+    def get_process_info(self, serial: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Retorna informações sobre a sessão em execução do dispositivo"""
+        with self._lock:
+            session = self.sessions.get(serial or "")
+            if session is None or not session.running:
+                return None
+            
+            return {
+                "pid": session.process.pid,
+                "running": True,
+                "uptime": session.uptime,
+                "fps": session.telemetry.current_fps
+            }
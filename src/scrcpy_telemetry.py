@@ -0,0 +1,253 @@
+"""
+Leitura e interpretação da saída do scrcpy
+
+Cada sessão tem uma thread que consome a saída do processo (evitando que o
+buffer do pipe encha e trave o scrcpy) e transforma as linhas de log em
+eventos: conexão, encoder escolhido, amostras de FPS (`--print-fps`) e erros.
+"""
+
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, List, Optional, Tuple
+
+
+# Amostras de FPS (uma por segundo) e erros mantidos por sessão
+MAX_FPS_SAMPLES = 120
+MAX_ERRORS = 20
+
+# Janela (s) da média de FPS exibida
+DEFAULT_FPS_WINDOW = 10.0
+
+# "INFO: 58 fps (+2 frames skipped)" (--print-fps)
+FPS_PATTERN = re.compile(r"^(\d+) fps(?: \(\+(\d+) frames? skipped\))?$")
+# "Using video encoder: 'c2.exynos.h264.encoder'" (2.x) / "Using encoder: 'OMX.qcom...'" (1.x)
+ENCODER_PATTERN = re.compile(r"Using (?:video )?encoder:? '([^']+)'")
+# "Device: [Google] google Pixel 7 (Android 14)"
+DEVICE_PATTERN = re.compile(r"^Device: (.+)$")
+# "Texture: 1080x2400"
+TEXTURE_PATTERN = re.compile(r"^Texture: (\d+)x(\d+)$")
+# "[server] INFO: ..." / "WARN: ..." / "ERROR: ..."
+LEVEL_PATTERN = re.compile(r"^(?:\[server\]\s*)?(VERBOSE|DEBUG|INFO|WARN|ERROR):\s*(.*)$")
+
+
+@dataclass
+class ScrcpyEvent:
+    """Evento extraído de uma linha de log do scrcpy"""
+
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+    ENCODER = "encoder"
+    TEXTURE = "texture"
+    FPS = "fps"
+    WARNING = "warning"
+    ERROR = "error"
+    EXITED = "exited"
+    ADAPTED = "adapted"     # Bitrate adaptativo mudou de degrau
+
+    kind: str
+    serial: str = ""
+    message: str = ""
+    fps: int = 0                            # FPS: quadros exibidos no último segundo
+    skipped: int = 0                        # FPS: quadros descartados no último segundo
+    value: str = ""                         # Encoder, aparelho, resolução ou degrau
+    returncode: Optional[int] = None        # EXITED
+    time: float = field(default_factory=time.monotonic)
+
+
+def parse_scrcpy_line(line: str, serial: str = "") -> Optional[ScrcpyEvent]:
+    """
+    Interpreta uma linha da saída do scrcpy
+
+    Returns:
+        O evento correspondente, ou None para linhas sem interesse
+    """
+    text = line.strip()
+    if not text:
+        return None
+
+    level, message = "", text
+    match = LEVEL_PATTERN.match(text)
+    if match:
+        level, message = match.group(1), match.group(2).strip()
+
+    match = FPS_PATTERN.match(message)
+    if match:
+        return ScrcpyEvent(ScrcpyEvent.FPS, serial, message, fps=int(match.group(1)), skipped=int(match.group(2) or 0))
+
+    match = ENCODER_PATTERN.search(message)
+    if match:
+        return ScrcpyEvent(ScrcpyEvent.ENCODER, serial, message, value=match.group(1))
+
+    match = DEVICE_PATTERN.match(message)
+    if match:
+        return ScrcpyEvent(ScrcpyEvent.CONNECTED, serial, message, value=match.group(1))
+
+    match = TEXTURE_PATTERN.match(message)
+    if match:
+        return ScrcpyEvent(ScrcpyEvent.TEXTURE, serial, message, value=f"{match.group(1)}x{match.group(2)}")
+
+    if "Device disconnected" in message:
+        return ScrcpyEvent(ScrcpyEvent.DISCONNECTED, serial, message)
+
+    if level == "ERROR" or (not level and ("Exception" in message or message.startswith("ERROR"))):
+        return ScrcpyEvent(ScrcpyEvent.ERROR, serial, message)
+
+    if level == "WARN":
+        return ScrcpyEvent(ScrcpyEvent.WARNING, serial, message)
+
+    return None
+
+
+class SessionTelemetry:
+    """Estado de uma sessão montado a partir dos eventos (acesso thread-safe)"""
+
+    STARTING = "starting"
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+    EXITED = "exited"
+
+    def __init__(self, serial: str):
+        self.serial = serial
+        self.state = self.STARTING
+        self.encoder = ""
+        self.device = ""
+        self.texture = ""
+        self.quality_level = 0
+        self.frames = 0
+        self.skipped = 0
+        self.samples: Deque[Tuple[float, int, int]] = deque(maxlen=MAX_FPS_SAMPLES)
+        self.errors: Deque[str] = deque(maxlen=MAX_ERRORS)
+        self._lock = threading.Lock()
+
+    def update(self, event: ScrcpyEvent):
+        """Aplica um evento ao estado da sessão"""
+        with self._lock:
+            if event.kind == ScrcpyEvent.FPS:
+                self.state = self.CONNECTED
+                self.frames += event.fps
+                self.skipped += event.skipped
+                self.samples.append((event.time, event.fps, event.skipped))
+            elif event.kind == ScrcpyEvent.CONNECTED:
+                self.state = self.CONNECTED
+                self.device = event.value
+            elif event.kind == ScrcpyEvent.ENCODER:
+                self.encoder = event.value
+            elif event.kind == ScrcpyEvent.TEXTURE:
+                self.state = self.CONNECTED
+                self.texture = event.value
+            elif event.kind == ScrcpyEvent.DISCONNECTED:
+                self.state = self.DISCONNECTED
+            elif event.kind == ScrcpyEvent.ERROR:
+                self.errors.append(event.message)
+            elif event.kind == ScrcpyEvent.EXITED:
+                self.state = self.EXITED
+            elif event.kind == ScrcpyEvent.ADAPTED:
+                self.quality_level = int(event.value or 0)
+
+    def restarted(self):
+        """A sessão foi reaberta com outras opções (novo processo)"""
+        with self._lock:
+            self.state = self.STARTING
+            self.samples.clear()
+
+    @property
+    def current_fps(self) -> Optional[int]:
+        """Última amostra de FPS (None se ainda não houver)"""
+        with self._lock:
+            return self.samples[-1][1] if self.samples else None
+
+    def average_fps(self, window: float = DEFAULT_FPS_WINDOW) -> Optional[float]:
+        """Média de FPS nos últimos `window` segundos"""
+        with self._lock:
+            since = time.monotonic() - window
+            recent = [fps for timestamp, fps, _ in self.samples if timestamp >= since]
+        if not recent:
+            return None
+        return sum(recent) / len(recent)
+
+    def drop_ratio(self, window: float = DEFAULT_FPS_WINDOW) -> float:
+        """Fração de quadros descartados nos últimos `window` segundos"""
+        with self._lock:
+            since = time.monotonic() - window
+            recent = [(fps, skipped) for timestamp, fps, skipped in self.samples if timestamp >= since]
+        shown = sum(fps for fps, _ in recent)
+        skipped = sum(skipped for _, skipped in recent)
+        total = shown + skipped
+        return skipped / total if total else 0.0
+
+    @property
+    def last_error(self) -> str:
+        with self._lock:
+            return self.errors[-1] if self.errors else ""
+
+    def summary(self) -> str:
+        """Descrição curta para o painel de controle"""
+        state_text = {
+            self.STARTING: "⏳ Conectando...",
+            self.CONNECTED: "🟢 Conectado",
+            self.DISCONNECTED: "🔴 Desconectado",
+            self.EXITED: "⏹ Finalizado",
+        }.get(self.state, self.state)
+
+        parts = [state_text]
+        fps = self.current_fps
+        if fps is not None:
+            average = self.average_fps()
+            parts.append(f"{fps} fps (média {average:.0f})" if average is not None else f"{fps} fps")
+            parts.append(f"{self.skipped} descartado(s) - {self.drop_ratio() * 100:.1f}%")
+        if self.encoder:
+            parts.append(f"encoder {self.encoder}")
+        if self.texture:
+            parts.append(self.texture)
+        if self.quality_level:
+            parts.append(f"qualidade reduzida (nível {self.quality_level})")
+        return " - ".join(parts)
+
+
+class ScrcpyOutputReader:
+    """
+    Thread que consome a saída (stdout + stderr) de um processo scrcpy
+
+    Cada linha é interpretada por parse_scrcpy_line; ao fim da saída é
+    emitido um evento EXITED com o código de retorno do processo.
+    """
+
+    def __init__(self, serial: str, process: subprocess.Popen, on_event: Callable[[ScrcpyEvent], None]):
+        self.serial = serial
+        self.process = process
+        self.on_event = on_event
+        self.lines: Deque[str] = deque(maxlen=200)   # Últimas linhas (diagnóstico)
+        self._thread = threading.Thread(target=self._run, name=f"scrcpy-output-{serial}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def recent_lines(self) -> List[str]:
+        return list(self.lines)
+
+    def _run(self):
+        try:
+            for line in iter(self.process.stdout.readline, ""):
+                line = line.rstrip("\r\n")
+                self.lines.append(line)
+                event = parse_scrcpy_line(line, self.serial)
+                if event is not None:
+                    self._emit(event)
+        except (OSError, ValueError) as e:
+            print(f"DEBUG SCRCPY: Erro ao ler a saída de {self.serial}: {e}")
+        finally:
+            returncode = self.process.wait()
+            self._emit(ScrcpyEvent(ScrcpyEvent.EXITED, self.serial, f"scrcpy saiu com código {returncode}", returncode=returncode))
+
+    def _emit(self, event: ScrcpyEvent):
+        try:
+            self.on_event(event)
+        except Exception as e:
+            print(f"DEBUG SCRCPY: Erro ao tratar evento {event.kind}: {e}")
@@ -0,0 +1,145 @@
+"""
+Decodificação do framebuffer bruto do `screencap` e codificação PNG no host
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass
+
+
+# Formatos de pixel do Android (android.graphics.PixelFormat)
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+PIXEL_FORMAT_RGB_888 = 3
+PIXEL_FORMAT_RGB_565 = 4
+PIXEL_FORMAT_BGRA_8888 = 5
+
+BYTES_PER_PIXEL = {
+    PIXEL_FORMAT_RGBA_8888: 4,
+    PIXEL_FORMAT_RGBX_8888: 4,
+    PIXEL_FORMAT_RGB_888: 3,
+    PIXEL_FORMAT_RGB_565: 2,
+    PIXEL_FORMAT_BGRA_8888: 4,
+}
+
+
+@dataclass
+class RawFrame:
+    """
+    Captura de tela sem compressão (saída do `screencap` sem -p)
+
+    `pixels` é uma fatia (memoryview) do buffer recebido: nenhuma cópia é
+    feita até a codificação.
+    """
+
+    width: int
+    height: int
+    pixel_format: int
+    pixels: memoryview
+
+    @property
+    def bytes_per_pixel(self) -> int:
+        return BYTES_PER_PIXEL[self.pixel_format]
+
+    @property
+    def stride(self) -> int:
+        """Bytes por linha"""
+        return self.width * self.bytes_per_pixel
+
+    def to_numpy(self):
+        """
+        Retorna os pixels como array NumPy (altura, largura, canais) sem cópia
+
+        Requer o NumPy instalado (dependência opcional).
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise RuntimeError("NumPy não está instalado")
+
+        array = np.frombuffer(self.pixels, dtype=np.uint8)
+        if self.pixel_format == PIXEL_FORMAT_RGB_565:
+            return array.view(np.uint16).reshape(self.height, self.width)
+        return array.reshape(self.height, self.width, self.bytes_per_pixel)
+
+
+def parse_raw_screencap(data: bytes) -> RawFrame:
+    """
+    Interpreta a saída do `screencap` (modo bruto)
+
+    Cabeçalho: largura, altura e formato (uint32 little-endian), seguidos
+    de um campo de espaço de cor a partir do Android 9.
+
+    Raises:
+        ValueError: se os dados não corresponderem a um framebuffer válido
+    """
+    if len(data) < 12:
+        raise ValueError("Captura vazia ou incompleta")
+
+    width, height, pixel_format = struct.unpack_from("<III", data, 0)
+    if pixel_format not in BYTES_PER_PIXEL:
+        raise ValueError(f"Formato de pixel não suportado: {pixel_format}")
+
+    size = width * height * BYTES_PER_PIXEL[pixel_format]
+    if len(data) >= 16 + size:
+        header_size = 16
+    elif len(data) >= 12 + size:
+        header_size = 12
+    else:
+        raise ValueError("Captura incompleta")
+
+    pixels = memoryview(data)[header_size:header_size + size]
+    return RawFrame(width, height, pixel_format, pixels)
+
+
+def _png_chunk(chunk_type: bytes, payload: bytes) -> bytes:
+    """Monta um chunk PNG (tamanho, tipo, dados, CRC)"""
+    crc = zlib.crc32(chunk_type + payload) & 0xFFFFFFFF
+    return struct.pack(">I", len(payload)) + chunk_type + payload + struct.pack(">I", crc)
+
+
+def encode_png(frame: RawFrame, compress_level: int = 1) -> bytes:
+    """
+    Codifica o frame em PNG no host
+
+    Um nível de compressão baixo é bem mais rápido que o `screencap -p` no
+    dispositivo e gera arquivos de tamanho semelhante.
+
+    Raises:
+        ValueError: para formatos sem conversão direta (RGB_565)
+    """
+    pixels = frame.pixels
+    if frame.pixel_format == PIXEL_FORMAT_RGBA_8888:
+        color_type = 6
+    elif frame.pixel_format == PIXEL_FORMAT_RGB_888:
+        color_type = 2
+    elif frame.pixel_format == PIXEL_FORMAT_RGBX_8888:
+        # O canal X não é garantido: força alfa opaco
+        color_type = 6
+        pixels = bytearray(pixels)
+        pixels[3::4] = b"\xff" * (frame.width * frame.height)
+    elif frame.pixel_format == PIXEL_FORMAT_BGRA_8888:
+        color_type = 6
+        pixels = bytearray(pixels)
+        pixels[0::4], pixels[2::4] = pixels[2::4], pixels[0::4]
+    else:
+        raise ValueError(f"Formato de pixel sem codificação PNG: {frame.pixel_format}")
+
+    pixels = memoryview(pixels)
+    stride = frame.stride
+    compressor = zlib.compressobj(compress_level)
+    compressed = []
+
+    for row in range(frame.height):
+        # Filtro 0 (None) em cada linha
+        compressed.append(compressor.compress(b"\x00"))
+        compressed.append(compressor.compress(pixels[row * stride:(row + 1) * stride]))
+    compressed.append(compressor.flush())
+
+    header = struct.pack(">IIBBBBB", frame.width, frame.height, 8, color_type, 0, 0, 0)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        _png_chunk(b"IHDR", header),
+        _png_chunk(b"IDAT", b"".join(compressed)),
+        _png_chunk(b"IEND", b""),
+    ])
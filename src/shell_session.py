@@ -0,0 +1,308 @@
+"""
+Sessão shell persistente por dispositivo
+"""
+
+import codecs
+import os
+import re
+import select
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from typing import Optional, Tuple
+
+from .adb_client import ADBClient, ADBProtocolError
+from .jobs import CancelToken
+
+
+class ShellSessionError(Exception):
+    """A sessão não pôde ser aberta ou foi encerrada durante o comando"""
+
+
+class ShellSessionBusy(ShellSessionError):
+    """A sessão está executando outro comando"""
+
+
+class SocketChannel:
+    """Canal de bytes sobre um serviço do servidor ADB (exec:sh da sessão, exec:, shell:)"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.sock.settimeout(None)
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def write(self, data: bytes):
+        self.sock.sendall(data)
+
+    def read(self) -> bytes:
+        return self.sock.recv(65536)
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class ProcessChannel:
+    """Canal de bytes sobre a entrada/saída de um processo `adb` (fallback)"""
+
+    def __init__(self, process: subprocess.Popen):
+        self.process = process
+
+    def fileno(self) -> int:
+        return self.process.stdout.fileno()
+
+    def write(self, data: bytes):
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+
+    def read(self) -> bytes:
+        return os.read(self.process.stdout.fileno(), 65536)
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        if self.process.stdin:
+            self.process.stdin.close()
+        self.process.stdout.close()
+
+
+class ShellSession:
+    """
+    Sessão `sh` mantida aberta com o dispositivo
+
+    Cada comando é enviado para o mesmo `sh` e delimitado por um marcador
+    único, do qual se recupera o código de saída. Evita o custo de abrir um
+    transporte novo a cada comando. Se a sessão morrer, é reaberta
+    automaticamente no próximo comando.
+
+    Um comando por vez: se a sessão estiver ocupada, `run` lança
+    ShellSessionBusy para que o chamador use um comando avulso em vez de
+    esperar.
+    """
+
+    def __init__(self, serial: str, client: Optional[ADBClient], adb_path: str = "adb"):
+        self.serial = serial
+        self.client = client
+        self.adb_path = adb_path
+
+        self._channel = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Indica se a sessão está aberta"""
+        return self._channel is not None
+
+    def _open(self):
+        """Abre o canal (protocolo nativo, ou processo adb como fallback)"""
+        if self.client:
+            try:
+                sock = self.client.open_service(self.serial, "exec:sh")
+                self._channel = SocketChannel(sock)
+                return
+            except ADBProtocolError as e:
+                raise ShellSessionError(str(e))
+            except OSError:
+                pass  # Servidor inacessível: usa o executável adb
+
+        try:
+            process = subprocess.Popen(
+                [self.adb_path, "-s", self.serial, "shell", "sh"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
+            )
+        except FileNotFoundError as e:
+            raise ShellSessionError(str(e))
+        self._channel = ProcessChannel(process)
+
+    def close(self):
+        """Encerra a sessão (o próximo comando abre uma nova)"""
+        channel, self._channel = self._channel, None
+        if channel:
+            try:
+                channel.close()
+            except OSError:
+                pass
+
+    def run(
+        self,
+        command: str,
+        timeout: Optional[float] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> Tuple[int, str]:
+        """
+        Executa um comando na sessão
+
+        Returns:
+            Tuple (código de saída, saída com stdout e stderr)
+
+        Raises:
+            ShellSessionBusy: se outro comando estiver em execução
+            ShellSessionError: se a sessão não puder ser aberta/caiu
+            TimeoutError: se o comando exceder o timeout (a sessão é fechada)
+            JobCancelled: se cancelado (a sessão é fechada)
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ShellSessionBusy(f"Sessão de {self.serial} ocupada")
+
+        try:
+            # Uma nova tentativa se uma sessão reaproveitada estiver morta
+            for attempt in range(2):
+                reused = self._channel is not None
+                if not reused:
+                    self._open()
+
+                sentinel = f"__ANDVIEW_{uuid.uuid4().hex}__"
+                script = ShellStream.wrap_command(command, sentinel) + "\n"
+
+                try:
+                    try:
+                        self._channel.write(script.encode("utf-8"))
+                    except OSError as e:
+                        raise ShellSessionError(f"Sessão de {self.serial} encerrada: {e}")
+                    return self._read_result(sentinel, timeout, cancel)
+                except ShellSessionError:
+                    self.close()
+                    if not reused or attempt > 0:
+                        raise
+        finally:
+            self._lock.release()
+
+    def _read_result(
+        self,
+        sentinel: str,
+        timeout: Optional[float],
+        cancel: Optional[CancelToken]
+    ) -> Tuple[int, str]:
+        """Lê a saída até o marcador do comando"""
+        pattern = re.compile(rb"\n" + re.escape(sentinel.encode()) + rb" (\d+)\n")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        channel = self._channel
+        buffer = bytearray()
+
+        if cancel:
+            cancel.add_callback(self.close)
+
+        try:
+            while True:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.close()
+                        raise TimeoutError(f"Timeout ao executar comando em {self.serial}")
+
+                try:
+                    readable, _, _ = select.select([channel], [], [], remaining)
+                    if not readable:
+                        continue
+                    chunk = channel.read()
+                except (OSError, ValueError):
+                    chunk = b""
+
+                if cancel:
+                    cancel.raise_if_cancelled()
+
+                if not chunk:
+                    raise ShellSessionError(f"Sessão de {self.serial} encerrada")
+
+                buffer.extend(chunk)
+                match = pattern.search(buffer)
+                if match:
+                    output = bytes(buffer[:match.start()])
+                    return int(match.group(1)), output.decode("utf-8", errors="replace")
+        finally:
+            if cancel:
+                cancel.remove_callback(self.close)
+
+
+class ShellStream:
+    """
+    Saída de um comando shell entregue em partes, conforme chega
+
+    Itere para receber os trechos de texto; ao final, `exit_code` contém o
+    código de saída (None se o comando foi interrompido). Não há timeout:
+    o comando roda até terminar ou até `cancel()`.
+    """
+
+    def __init__(self, channel, sentinel: str, cancel: Optional[CancelToken] = None):
+        self._channel = channel
+        self._marker = b"\n" + sentinel.encode() + b" "
+        self._cancel = cancel
+        self.exit_code: Optional[int] = None
+
+    @staticmethod
+    def wrap_command(command: str, sentinel: str) -> str:
+        """Monta o script que executa o comando e imprime o marcador de saída"""
+        return f"({command}\n) </dev/null 2>&1; printf '\\n%s %d\\n' {sentinel} $?"
+
+    def cancel(self):
+        """Interrompe o comando"""
+        try:
+            self._channel.close()
+        except OSError:
+            pass
+
+    def __iter__(self):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = b""
+
+        if self._cancel:
+            self._cancel.add_callback(self.cancel)
+
+        try:
+            while True:
+                try:
+                    chunk = self._channel.read()
+                except (OSError, ValueError):
+                    chunk = b""
+
+                if self._cancel:
+                    self._cancel.raise_if_cancelled()
+
+                if not chunk:
+                    # Fim inesperado: entrega o que sobrou
+                    text = decoder.decode(pending, final=True)
+                    if text:
+                        yield text
+                    return
+
+                pending += chunk
+                marker_pos = pending.find(self._marker)
+                if marker_pos >= 0:
+                    tail = pending[marker_pos + len(self._marker):]
+                    if b"\n" not in tail:
+                        continue  # Código de saída ainda incompleto
+
+                    text = decoder.decode(pending[:marker_pos], final=True)
+                    if text:
+                        yield text
+
+                    code = tail.split(b"\n", 1)[0].strip()
+                    self.exit_code = int(code) if code.isdigit() else None
+                    return
+
+                # Segura apenas o trecho final que pode ser o início do marcador
+                keep = 0
+                for size in range(min(len(pending), len(self._marker)), 0, -1):
+                    if pending.endswith(self._marker[:size]):
+                        keep = size
+                        break
+
+                ready, pending = pending[:len(pending) - keep], pending[len(pending) - keep:]
+                text = decoder.decode(ready)
+                if text:
+                    yield text
+        finally:
+            if self._cancel:
+                self._cancel.remove_callback(self.cancel)
+            self.cancel()
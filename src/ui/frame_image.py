@@ -0,0 +1,43 @@
+"""
+Conversão de capturas de tela brutas em QImage
+"""
+
+from typing import Optional
+
+from PySide6.QtGui import QImage
+
+from ..screencap import (
+    RawFrame, PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888,
+    PIXEL_FORMAT_RGB_888, PIXEL_FORMAT_RGB_565, PIXEL_FORMAT_BGRA_8888
+)
+
+# Formato do Android -> formato equivalente do QImage (mesma ordem de bytes)
+QIMAGE_FORMATS = {
+    PIXEL_FORMAT_RGBA_8888: QImage.Format_RGBA8888,
+    PIXEL_FORMAT_RGBX_8888: QImage.Format_RGBX8888,
+    PIXEL_FORMAT_RGB_888: QImage.Format_RGB888,
+    PIXEL_FORMAT_RGB_565: QImage.Format_RGB16,
+    PIXEL_FORMAT_BGRA_8888: QImage.Format_ARGB32,  # BGRA em memória (little-endian)
+}
+
+
+def frame_to_qimage(frame: RawFrame) -> Optional[QImage]:
+    """
+    Cria um QImage sobre o buffer do frame, sem copiar os pixels
+
+    O QImage aponta para a memória do frame: mantenha o frame vivo enquanto
+    usar a imagem (ou use image.copy()). Retorna None para formatos sem
+    equivalente.
+    """
+    image_format = QIMAGE_FORMATS.get(frame.pixel_format)
+    if image_format is None:
+        return None
+    return QImage(frame.pixels, frame.width, frame.height, frame.stride, image_format)
+
+
+def save_frame_png(frame: RawFrame, output_path: str) -> bool:
+    """Codifica o frame em PNG com o Qt (seguro fora da thread da interface)"""
+    image = frame_to_qimage(frame)
+    if image is None:
+        return False
+    return image.save(output_path, "PNG")
@@ -0,0 +1,155 @@
+"""
+Executor central de tarefas em background (ADB/scrcpy fora da thread da interface)
+"""
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from typing import Callable, Optional, Set
+
+from ..jobs import CancelToken, JobCancelled
+
+
+class Job(QObject):
+    """
+    Tarefa submetida ao JobExecutor
+
+    A função da tarefa recebe o próprio Job, para consultar `job.token`
+    (cancelamento) e chamar `job.report_progress()`. Os sinais são
+    entregues na thread da interface.
+    """
+
+    finished = Signal(object)  # Resultado da função
+    failed = Signal(str)       # Mensagem de erro
+    cancelled = Signal()
+    progress = Signal(object)  # Valor livre reportado pela tarefa
+    done = Signal()            # Sempre emitido ao final (sucesso, erro ou cancelamento)
+
+    def __init__(self, fn: Callable[["Job"], object], priority: str, parent=None):
+        super().__init__(parent)
+        self.fn = fn
+        self.priority = priority
+        self.token = CancelToken()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Indica se o cancelamento foi solicitado"""
+        return self.token.cancelled
+
+    def cancel(self):
+        """Cancela a tarefa (interrompe o processo/socket em andamento)"""
+        self.token.cancel()
+
+    def report_progress(self, value):
+        """Reporta progresso (pode ser chamado da thread da tarefa)"""
+        if not self.token.cancelled:
+            self.progress.emit(value)
+
+
+class _JobRunnable(QRunnable):
+    """Executa um Job em uma thread do pool"""
+
+    def __init__(self, job: Job):
+        super().__init__()
+        self.job = job
+        self.setAutoDelete(True)
+
+    def run(self):
+        job = self.job
+
+        try:
+            if job.token.cancelled:
+                raise JobCancelled()
+
+            result = job.fn(job)
+
+            if job.token.cancelled:
+                raise JobCancelled()
+
+            job.finished.emit(result)
+        except JobCancelled:
+            job.cancelled.emit()
+        except Exception as e:
+            print(f"DEBUG: Erro na tarefa em background: {e}")
+            job.failed.emit(str(e))
+        finally:
+            job.done.emit()
+
+
+class JobExecutor(QObject):
+    """
+    Executor de tarefas com duas classes de prioridade
+
+    Cada classe tem seu próprio pool de threads, de modo que ações do usuário
+    (INTERACTIVE) nunca ficam na fila atrás de atualizações automáticas
+    (BACKGROUND).
+    """
+
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+    def __init__(self, parent=None, interactive_workers: int = 4, background_workers: int = 2):
+        super().__init__(parent)
+
+        self.pools = {
+            self.INTERACTIVE: QThreadPool(self),
+            self.BACKGROUND: QThreadPool(self),
+        }
+        self.pools[self.INTERACTIVE].setMaxThreadCount(interactive_workers)
+        self.pools[self.BACKGROUND].setMaxThreadCount(background_workers)
+
+        self._jobs: Set[Job] = set()
+
+    def submit(
+        self,
+        fn: Callable[[Job], object],
+        priority: str = INTERACTIVE,
+        on_finished: Optional[Callable[[object], None]] = None,
+        on_failed: Optional[Callable[[str], None]] = None,
+        on_cancelled: Optional[Callable[[], None]] = None,
+        on_progress: Optional[Callable[[object], None]] = None
+    ) -> Job:
+        """
+        Agenda uma tarefa
+
+        Args:
+            fn: Função executada no pool; recebe o Job como único argumento
+            priority: INTERACTIVE ou BACKGROUND
+            on_finished/on_failed/on_cancelled/on_progress: Callbacks
+                chamados na thread da interface
+
+        Returns:
+            O Job criado (use job.cancel() para cancelar)
+        """
+        job = Job(fn, priority, self)
+
+        if on_finished:
+            job.finished.connect(on_finished)
+        if on_failed:
+            job.failed.connect(on_failed)
+        if on_cancelled:
+            job.cancelled.connect(on_cancelled)
+        if on_progress:
+            job.progress.connect(on_progress)
+
+        # Mantém a referência até o fim da execução
+        self._jobs.add(job)
+        job.done.connect(lambda: self._release(job))
+
+        self.pools[priority].start(_JobRunnable(job))
+        return job
+
+    def _release(self, job: Job):
+        """Libera um Job finalizado"""
+        self._jobs.discard(job)
+        job.deleteLater()
+
+    def cancel_all(self):
+        """Cancela todas as tarefas pendentes e em andamento"""
+        for job in list(self._jobs):
+            job.cancel()
+
+    def shutdown(self, timeout_ms: int = 3000):
+        """Cancela as tarefas e aguarda os pools terminarem"""
+        self.cancel_all()
+        for pool in self.pools.values():
+            pool.clear()
+            pool.waitForDone(timeout_ms)
@@ -7,21 +7,40 @@ from PySide6.QtWidgets import (
     QSplitter, QStatusBar, QMenuBar, QMessageBox,
     QFileDialog, QLabel, QApplication, QProgressDialog, QTabWidget
 )
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, Signal
 from PySide6.QtGui import QIcon, QPalette, QColor, QAction
 import os
+import subprocess
 from datetime import datetime
 
 from .widgets.device_list import DeviceListWidget
-from .widgets.control_panel import ControlPanelWidget
+from .widgets.control_panel import ControlPanelWidget, APK_FILE_FILTER
 from .widgets.wifi_connection import WiFiConnectionWidget
+from .widgets.bulk_install import BulkInstallDialog
+from .widgets.wifi_migration import WifiMigrationDialog
+from .job_executor import JobExecutor
+from .frame_image import save_frame_png
 from ..adb_manager import ADBManager, ADBDevice
+from ..device_tracker import DeviceTracker
+from ..connection_supervisor import ConnectionHealth
 from ..scrcpy_manager import ScrcpyManager, ScrcpyOptions
+from ..scrcpy_telemetry import ScrcpyEvent
+from ..screencap import encode_png
 
 
 class MainWindow(QMainWindow):
     """Janela principal do AndView"""
     
+    # Emitidos pela thread do DeviceTracker (entregues na thread da interface)
+    device_events = Signal(list)
+    tracking_state_changed = Signal(bool)
+    
+    # Emitido pela thread do supervisor de conexões WiFi
+    connection_health_changed = Signal(object)
+    
+    # Emitido pelas threads que leem a saída do scrcpy
+    scrcpy_event = Signal(object)
+    
     def __init__(self):
         super().__init__()
         
@@ -32,6 +51,14 @@ class MainWindow(QMainWindow):
         # Estado
         self.current_device: ADBDevice = None
         
+        # Executor de tarefas (ADB/scrcpy nunca rodam na thread da interface)
+        self.jobs = JobExecutor(self)
+        self._refresh_job = None
+        self._refresh_pending = False  # Mudança chegou durante uma listagem: listar de novo
+        self._populate_job = None
+        self._details_job = None
+        self._command_job = None
+        
         # Configuração da janela
         self.setWindowTitle("AndView - Gerenciador de Dispositivos Android")
         self.setGeometry(100, 100, 1200, 700)
@@ -55,10 +82,37 @@ class MainWindow(QMainWindow):
         self._setup_menu_bar()
         self._setup_status_bar()
         
-        # Timer para atualização automática
+        # Timer de atualização automática (fallback quando o stream de
+        # dispositivos do servidor ADB não está disponível)
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self._auto_refresh_devices)
-        self.update_timer.start(5000)  # Atualiza a cada 5 segundos
+        
+        # Acompanhamento de dispositivos via host:track-devices-l
+        self.device_tracker = None
+        self.device_events.connect(self._on_device_events)
+        self.tracking_state_changed.connect(self._on_tracking_state_changed)
+        
+        if self.adb_manager.client:
+            self.device_tracker = DeviceTracker(
+                self.adb_manager.client,
+                on_events=self.device_events.emit,
+                on_stream_state=self.tracking_state_changed.emit
+            )
+            self.device_tracker.start()
+        
+        if not self.device_tracker or not self.device_tracker.streaming:
+            self.update_timer.start(5000)  # Atualiza a cada 5 segundos
+        
+        # Acompanha as sessões do scrcpy (janelas fechadas pelo usuário)
+        self.scrcpy_timer = QTimer()
+        self.scrcpy_timer.timeout.connect(self._check_scrcpy_status)
+        self.scrcpy_event.connect(self._on_scrcpy_event)
+        self.scrcpy_manager.on_event = self.scrcpy_event.emit
+        
+        # Reconexão automática dos dispositivos WiFi (endereço -> último estado)
+        self._wifi_states = {}
+        self.connection_health_changed.connect(self._on_connection_health_changed)
+        self.adb_manager.connection_supervisor.on_health = self.connection_health_changed.emit
         
         # Carrega dispositivos inicial
         self._refresh_devices()
@@ -412,8 +466,19 @@ class MainWindow(QMainWindow):
     def _check_dependencies(self):
         """Verifica se ADB e scrcpy estão instalados"""
         # Verificação silenciosa - não mostra popup no início
-        self.adb_available = self.adb_manager.check_adb_available()
-        self.scrcpy_available = self.scrcpy_manager.check_scrcpy_available()
+        self.adb_available = False
+        self.scrcpy_available = False
+        
+        def check(job):
+            return (
+                self.adb_manager.check_adb_available(),
+                self.scrcpy_manager.check_scrcpy_available()
+            )
+        
+        def on_checked(result):
+            self.adb_available, self.scrcpy_available = result
+        
+        self.jobs.submit(check, priority=JobExecutor.BACKGROUND, on_finished=on_checked)
     
     def _setup_ui(self):
         """Configura a interface do usuário"""
@@ -443,11 +508,13 @@ class MainWindow(QMainWindow):
         # Tab 1: Dispositivos
         self.device_list = DeviceListWidget()
         self.device_list.device_selected.connect(self._on_device_selected)
+        self.device_list.device_updated.connect(self._on_device_updated)
         self.device_list.refresh_requested.connect(self._refresh_devices)
         self.left_tabs.addTab(self.device_list, "📱 Dispositivos")
         
         # Tab 2: Conexão WiFi
-        self.wifi_widget = WiFiConnectionWidget(self.adb_manager)
+        self.wifi_widget = WiFiConnectionWidget(self.adb_manager, self.jobs)
+        self.wifi_widget.migrate_requested.connect(self._start_wifi_migration)
         self.left_tabs.addTab(self.wifi_widget, "🔗 WiFi")
         
         left_layout.addWidget(self.left_tabs)
@@ -459,10 +526,15 @@ class MainWindow(QMainWindow):
         # Painel de controle (lado direito)
         self.control_panel = ControlPanelWidget()
         self.control_panel.start_mirroring.connect(self._on_start_mirroring)
+        self.control_panel.start_mirroring_selected.connect(self._on_start_mirroring_selected)
         self.control_panel.stop_mirroring.connect(self._on_stop_mirroring)
+        self.control_panel.stop_all_mirroring.connect(self._on_stop_all_mirroring)
+        self.control_panel.budget_changed.connect(self._on_budget_changed)
         self.control_panel.install_apk.connect(self._on_install_apk)
         self.control_panel.take_screenshot.connect(self._on_take_screenshot)
+        self.control_panel.benchmark_encoders.connect(self._on_benchmark_encoders)
         self.control_panel.execute_command.connect(self._on_execute_command)
+        self.control_panel.cancel_command.connect(self._on_cancel_command)
         splitter.addWidget(self.control_panel)
         
         # Define proporções do splitter
@@ -521,89 +593,381 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage("Pronto")
     
     def _refresh_devices(self):
-        """Atualiza a lista de dispositivos"""
+        """Atualiza a lista de dispositivos (ação do usuário)"""
         self.device_list.set_refreshing(True)
         self.status_bar.showMessage("Atualizando lista de dispositivos...")
         
-        devices = self.adb_manager.list_devices()
-        self.device_list.update_devices(devices)
-        
-        self.device_list.set_refreshing(False)
-        self.status_bar.showMessage(f"Encontrado(s) {len(devices)} dispositivo(s)")
+        self._submit_refresh(JobExecutor.INTERACTIVE)
     
     def _auto_refresh_devices(self):
         """Atualização automática de dispositivos (silenciosa)"""
-        devices = self.adb_manager.list_devices()
+        self._submit_refresh(JobExecutor.BACKGROUND)
+    
+    def _submit_refresh(self, priority: str):
+        """
+        Agenda uma listagem de dispositivos (evita listagens sobrepostas)
+        
+        Etapa 1: `adb devices -l` (um único comando) para exibir a lista.
+        Etapa 2: consulta em background dos dispositivos sem informações.
+        
+        Uma atualização automática pedida durante outra listagem (que pode
+        já ter lido a lista antiga) é repetida quando ela terminar.
+        """
+        if self._refresh_job is not None:
+            if priority == JobExecutor.BACKGROUND:
+                self._refresh_pending = True
+                return
+            self._refresh_job.cancel()
+        
+        self._refresh_pending = False
+        job = self.jobs.submit(
+            lambda job: self.adb_manager.list_devices(),
+            priority=priority,
+            on_finished=lambda devices: self._on_devices_listed(devices, priority),
+            on_failed=lambda message: self._on_devices_refresh_failed(message, priority)
+        )
+        job.done.connect(lambda: self._on_refresh_done(job))
+        self._refresh_job = job
+    
+    def _on_refresh_done(self, job):
+        """Libera a referência da listagem concluída e repete se houve mudança durante ela"""
+        if self._refresh_job is job:
+            self._refresh_job = None
+            self.device_list.set_refreshing(False)
+            if self._refresh_pending:
+                self._submit_refresh(JobExecutor.BACKGROUND)
+    
+    def _on_devices_listed(self, devices: list, priority: str):
+        """Exibe a lista e agenda a coleta das informações que faltam"""
         self.device_list.update_devices(devices)
+        self.wifi_widget.set_devices(devices, self.current_device.serial if self.current_device else "")
+        
+        if priority == JobExecutor.INTERACTIVE:
+            self.status_bar.showMessage(f"Encontrado(s) {len(devices)} dispositivo(s)")
+        
+        pending = [device for device in devices if self.adb_manager.needs_populate(device)]
+        if not pending:
+            return
+        
+        if self._populate_job is not None:
+            self._populate_job.cancel()
+        
+        self._populate_job = self.jobs.submit(
+            lambda job: self.adb_manager.populate_devices(pending, on_device=job.report_progress),
+            priority=JobExecutor.BACKGROUND,
+            on_progress=self.device_list.update_device
+        )
+    
+    def _on_devices_refresh_failed(self, message: str, priority: str):
+        """Manipula falha na listagem de dispositivos"""
+        if priority == JobExecutor.INTERACTIVE:
+            self.status_bar.showMessage(f"Erro ao listar dispositivos: {message}")
+    
+    def _on_device_events(self, events: list):
+        """Manipula mudanças na lista de dispositivos (conectou/desconectou/estado)"""
+        for event in events:
+            print(f"DEBUG: Dispositivo {event.serial}: {event.kind} ({event.previous_state} -> {event.state})")
+            
+            # A sessão shell do dispositivo não sobrevive à desconexão
+            if event.state != "device":
+                self.adb_manager.close_shell_session(event.serial)
+            
+            # Pacotes podem ter mudado enquanto o dispositivo esteve fora
+            self.adb_manager.invalidate_packages(event.serial)
+            
+            # O dispositivo pode ter voltado em outra rede
+            self.adb_manager.invalidate_device_ip(event.serial)
+        
+        # Conexões WiFi que caíram são reconectadas pelo supervisor
+        self.adb_manager.connection_supervisor.handle_events(events)
+        
+        self._auto_refresh_devices()
+    
+    def _on_connection_health_changed(self, health):
+        """Exibe a saúde da conexão WiFi na lista e avisa quedas/reconexões"""
+        self.device_list.set_connection_health(health.address, health.summary())
+        
+        previous = self._wifi_states.get(health.address)
+        self._wifi_states[health.address] = health.state
+        if previous == health.state:
+            return
+        if health.state == ConnectionHealth.RECONNECTING:
+            self.status_bar.showMessage(f"Conexão WiFi com {health.address} caiu, reconectando...")
+        elif previous == ConnectionHealth.RECONNECTING:
+            self.status_bar.showMessage(f"{health.address} reconectado", 5000)
+    
+    def _on_tracking_state_changed(self, streaming: bool):
+        """Alterna entre acompanhamento por eventos e polling"""
+        if streaming:
+            self.update_timer.stop()
+        elif not self.update_timer.isActive():
+            self.update_timer.start(5000)
     
     def _on_device_selected(self, device: ADBDevice):
         """Manipula seleção de dispositivo"""
         self.current_device = device
         self.control_panel.set_device(device)
+        self.wifi_widget.set_devices(self.device_list.devices, device.serial)
+        self._refresh_mirroring_state()
         
-        # Atualiza informações detalhadas
-        details = self.adb_manager.get_device_info(device.serial)
-        self.control_panel.set_device_details(details)
+        serial = device.serial
+        
+        # A sessão do dispositivo selecionado tem prioridade no orçamento
+        if self.scrcpy_manager.focused_serial != serial:
+            self.jobs.submit(
+                lambda job: self.scrcpy_manager.set_focus(serial),
+                priority=JobExecutor.BACKGROUND
+            )
+        
+        # Atualiza informações detalhadas em background (descarta consulta anterior)
+        if self._details_job is not None:
+            self._details_job.cancel()
+        
+        self._details_job = self.jobs.submit(
+            lambda job: self.adb_manager.get_device_info(serial),
+            on_finished=lambda details: self._on_device_details(serial, details)
+        )
         
         self.status_bar.showMessage(f"Dispositivo selecionado: {device.manufacturer} {device.model}")
     
+    def _on_device_details(self, serial: str, details: dict):
+        """Exibe os detalhes se o dispositivo ainda estiver selecionado"""
+        self._details_job = None
+        if self.current_device and self.current_device.serial == serial:
+            self.control_panel.set_device_details(details)
+    
+    def _on_device_updated(self, device: ADBDevice):
+        """Atualiza os dados do dispositivo selecionado sem consultá-lo novamente"""
+        self.current_device = device
+        self.control_panel.set_device(device)
+        self.wifi_widget.set_devices(self.device_list.devices, device.serial)
+        self._refresh_mirroring_state()
+    
     def _on_start_mirroring(self, options: ScrcpyOptions):
-        """Inicia o espelhamento"""
+        """Inicia o espelhamento do dispositivo atual"""
         if not self.current_device:
             QMessageBox.warning(self, "Aviso", "Nenhum dispositivo selecionado!")
             return
         
         self.status_bar.showMessage("Iniciando scrcpy...")
         
-        success, message = self.scrcpy_manager.start_mirroring(
-            self.current_device.serial,
-            options
+        serial = self.current_device.serial
+        self.jobs.submit(
+            lambda job: self.scrcpy_manager.start_mirroring(
+                serial,
+                self.scrcpy_manager.apply_preferred_encoder(
+                    options, self.adb_manager.get_device_model_key(serial, cancel=job.token)
+                )
+            ),
+            on_finished=lambda result: self._on_mirroring_started(serial, result)
         )
+    
+    def _on_start_mirroring_selected(self, options: ScrcpyOptions):
+        """Espelha todos os dispositivos selecionados, com as janelas lado a lado"""
+        devices = self.device_list.get_selected_devices()
+        if not devices:
+            QMessageBox.warning(self, "Aviso", "Nenhum dispositivo pronto selecionado!")
+            return
+        
+        screen = self.screen() or QApplication.primaryScreen()
+        geometry = screen.availableGeometry()
+        area = (geometry.x(), geometry.y(), geometry.width(), geometry.height())
+        
+        self.status_bar.showMessage(f"Iniciando scrcpy em {len(devices)} dispositivo(s)...")
+        
+        serials = [device.serial for device in devices]
+        self.jobs.submit(
+            lambda job: self.scrcpy_manager.start_mirroring_many(
+                serials, options, area,
+                {serial: self.adb_manager.get_device_model_key(serial, cancel=job.token) for serial in serials}
+            ),
+            on_finished=self._on_mirroring_many_started
+        )
+    
+    def _benchmark_encoders(self, serial: str, job) -> tuple:
+        """Testa os encoders (no job) e retorna (modelo, resultados)"""
+        model = self.adb_manager.get_device_model_key(serial, cancel=job.token)
+        if not model:
+            raise RuntimeError("Não foi possível identificar o modelo do dispositivo")
+        results = self.scrcpy_manager.benchmark_encoders(
+            serial, model, on_progress=job.report_progress, cancel=job.token
+        )
+        return model, results
+    
+    def _on_benchmark_encoders(self):
+        """Testa os encoders de vídeo do dispositivo atual"""
+        if not self.current_device:
+            QMessageBox.warning(self, "Aviso", "Nenhum dispositivo selecionado!")
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            "Testar Encoders",
+            "Cada encoder de vídeo será testado por alguns segundos em uma janela "
+            "pequena do scrcpy.\n\nDeixe algo animado na tela do dispositivo "
+            "(ex: um vídeo) para medir o FPS. Continuar?"
+        )
+        if reply != QMessageBox.Yes:
+            return
+        
+        serial = self.current_device.serial
+        
+        progress = QProgressDialog("Listando encoders...", "Cancelar", 0, 0, self)
+        progress.setWindowTitle("Testando Encoders")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        
+        job = self.jobs.submit(
+            lambda job: self._benchmark_encoders(serial, job),
+            on_finished=self._on_encoders_benchmarked,
+            on_failed=lambda message: QMessageBox.critical(self, "Erro", f"Falha ao testar encoders:\n{message}"),
+            on_cancelled=lambda: self.status_bar.showMessage("Teste de encoders cancelado"),
+            on_progress=progress.setLabelText
+        )
+        
+        progress.canceled.connect(job.cancel)
+        job.done.connect(progress.close)
+        job.done.connect(progress.deleteLater)
+        progress.show()
+    
+    def _on_encoders_benchmarked(self, result: tuple):
+        """Exibe a classificação dos encoders testados"""
+        model, results = result
+        ranking = "\n".join(f"{index}. {result.summary()}" for index, result in enumerate(results, 1))
+        
+        if results and results[0].ok:
+            winner = results[0].encoder
+            self.status_bar.showMessage(f"Encoder preferido para {model}: {winner.name}")
+            QMessageBox.information(
+                self, "Encoders Testados",
+                f"{ranking}\n\nO espelhamento de {model} passa a usar {winner.label}."
+            )
+        else:
+            QMessageBox.warning(self, "Encoders Testados", f"Nenhum encoder funcionou:\n{ranking}")
+    
+    def _on_mirroring_started(self, serial: str, result: tuple):
+        """Recebe o resultado da inicialização do scrcpy"""
+        success, message = result
         
         if success:
-            self.control_panel.set_mirroring_state(True)
-            self.status_bar.showMessage("scrcpy iniciado com sucesso")
+            self._refresh_mirroring_state()
+            self.status_bar.showMessage(f"scrcpy iniciado com sucesso ({serial})")
             
-            # Timer para verificar se o processo ainda está rodando
-            QTimer.singleShot(1000, self._check_scrcpy_status)
+            # Verifica periodicamente se a janela foi fechada
+            if not self.scrcpy_timer.isActive():
+                self.scrcpy_timer.start(2000)
         else:
             QMessageBox.critical(self, "Erro", f"Falha ao iniciar scrcpy:\n{message}")
             self.status_bar.showMessage("Falha ao iniciar scrcpy")
     
+    def _on_mirroring_many_started(self, results: dict):
+        """Resume o resultado do espelhamento de vários dispositivos"""
+        failures = {serial: message for serial, (success, message) in results.items() if not success}
+        started = len(results) - len(failures)
+        
+        self._refresh_mirroring_state()
+        if started and not self.scrcpy_timer.isActive():
+            self.scrcpy_timer.start(2000)
+        
+        self.status_bar.showMessage(f"scrcpy iniciado em {started} de {len(results)} dispositivo(s)")
+        if failures:
+            details = "\n".join(f"{serial}: {message}" for serial, message in failures.items())
+            QMessageBox.warning(self, "Aviso", f"Falha ao espelhar alguns dispositivos:\n{details}")
+    
     def _on_stop_mirroring(self):
-        """Para o espelhamento"""
-        success, message = self.scrcpy_manager.stop_mirroring()
+        """Para o espelhamento do dispositivo atual"""
+        if not self.current_device:
+            return
         
+        serial = self.current_device.serial
+        self.jobs.submit(
+            lambda job: self.scrcpy_manager.stop_mirroring(serial),
+            on_finished=self._on_mirroring_stopped
+        )
+    
+    def _on_stop_all_mirroring(self):
+        """Para todas as sessões de espelhamento"""
+        self.jobs.submit(
+            lambda job: self.scrcpy_manager.stop_mirroring(),
+            on_finished=self._on_mirroring_stopped
+        )
+    
+    def _on_mirroring_stopped(self, result: tuple):
+        """Recebe o resultado da finalização do scrcpy"""
+        success, message = result
+        
+        self._refresh_mirroring_state()
         if success:
-            self.control_panel.set_mirroring_state(False)
-            self.status_bar.showMessage("scrcpy finalizado")
+            self.status_bar.showMessage(message)
         else:
             QMessageBox.warning(self, "Aviso", message)
     
+    def _on_budget_changed(self, budget):
+        """Aplica o novo orçamento às sessões ativas"""
+        self.jobs.submit(
+            lambda job: self.scrcpy_manager.set_budget(budget),
+            on_finished=lambda result: self.status_bar.showMessage(
+                "Orçamento de espelhamento aplicado" if budget else "Orçamento de espelhamento desligado", 5000
+            )
+        )
+    
     def _check_scrcpy_status(self):
-        """Verifica o status do scrcpy periodicamente"""
-        if self.scrcpy_manager.is_running():
-            # Verifica novamente em 2 segundos
-            QTimer.singleShot(2000, self._check_scrcpy_status)
-        else:
-            # scrcpy foi fechado
-            self.control_panel.set_mirroring_state(False)
-            self.status_bar.showMessage("scrcpy finalizado")
+        """Verifica periodicamente quais sessões do scrcpy foram fechadas"""
+        finished = self.scrcpy_manager.reap_finished_sessions()
+        if finished:
+            self.status_bar.showMessage(f"scrcpy finalizado ({', '.join(finished)})")
+        
+        self._refresh_mirroring_state()
+        if not self.scrcpy_manager.is_running():
+            self.scrcpy_timer.stop()
+    
+    def _on_scrcpy_event(self, event: ScrcpyEvent):
+        """Atualiza a telemetria exibida e avisa erros/quedas do scrcpy"""
+        if self.current_device and self.current_device.serial == event.serial:
+            telemetry = self.scrcpy_manager.telemetry(event.serial)
+            if telemetry:
+                self.control_panel.set_mirroring_stats(telemetry.summary())
+        
+        if event.kind == ScrcpyEvent.ERROR:
+            self.status_bar.showMessage(f"scrcpy ({event.serial}): {event.message}")
+        elif event.kind == ScrcpyEvent.DISCONNECTED:
+            self.status_bar.showMessage(f"scrcpy ({event.serial}): dispositivo desconectado")
+        elif event.kind == ScrcpyEvent.ADAPTED:
+            self.status_bar.showMessage(f"scrcpy ({event.serial}): {event.message}", 10000)
+        elif event.kind == ScrcpyEvent.EXITED:
+            telemetry = self.scrcpy_manager.telemetry(event.serial)
+            if event.returncode and telemetry and telemetry.last_error:
+                self.status_bar.showMessage(f"scrcpy ({event.serial}) finalizado com erro: {telemetry.last_error}")
+            self._check_scrcpy_status()
     
-    def _on_install_apk(self, apk_path: str):
-        """Instala um APK"""
+    def _refresh_mirroring_state(self):
+        """Atualiza os botões de espelhamento para o dispositivo atual"""
+        serial = self.current_device.serial if self.current_device else None
+        self.control_panel.set_mirroring_state(bool(serial) and self.scrcpy_manager.is_running(serial))
+        self.control_panel.set_session_count(len(self.scrcpy_manager.running_serials()))
+        
+        telemetry = self.scrcpy_manager.telemetry(serial) if serial else None
+        self.control_panel.set_mirroring_stats(telemetry.summary() if telemetry else "")
+    
+    def _on_install_apk(self, apk_paths: list):
+        """Instala um APK (em lote se vários dispositivos estiverem selecionados)"""
         if not self.current_device:
             QMessageBox.warning(self, "Aviso", "Nenhum dispositivo selecionado!")
             return
         
-        self.status_bar.showMessage(f"Instalando {os.path.basename(apk_path)}...")
+        selected = self.device_list.get_selected_devices()
+        if len(selected) > 1:
+            self._start_bulk_install(selected, apk_paths)
+            return
         
-        # Importa QProgressDialog
-        from PySide6.QtWidgets import QProgressDialog
+        apk_name = self._install_display_name(apk_paths)
+        self.status_bar.showMessage(f"Instalando {apk_name}...")
         
-        # Mostra diálogo de progresso com cancelamento
+        # Mostra diálogo de progresso (bytes enviados) com cancelamento
         progress = QProgressDialog(
-            f"Instalando {os.path.basename(apk_path)}...\n\nAguarde ou aceite no dispositivo.",
+            f"Instalando {apk_name}...\n\nAguarde ou aceite no dispositivo.",
             "Cancelar",
             0, 0,
             self
@@ -611,25 +975,45 @@ class MainWindow(QMainWindow):
         progress.setWindowTitle("Instalando APK")
         progress.setWindowModality(Qt.WindowModal)
         progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
         progress.setValue(0)
-        progress.show()
         
-        # Processa eventos para atualizar a interface
-        from PySide6.QtWidgets import QApplication
-        QApplication.processEvents()
+        def on_progress(value: tuple):
+            sent, total = value
+            progress.setMaximum(1000)
+            progress.setValue(sent * 1000 // total if total else 1000)
+            if sent >= total:
+                progress.setLabelText(f"Finalizando instalação de {apk_name}...")
+        
+        serial = self.current_device.serial
+        job = self.jobs.submit(
+            lambda job: self.adb_manager.install_apk(
+                serial, apk_paths, cancel=job.token,
+                on_progress=lambda sent, total: job.report_progress((sent, total))
+            ),
+            on_finished=self._on_apk_installed,
+            on_failed=lambda message: self._on_apk_installed((False, message)),
+            on_cancelled=lambda: self.status_bar.showMessage("Instalação cancelada"),
+            on_progress=on_progress
+        )
         
-        try:
-            success, message = self.adb_manager.install_apk(
-                self.current_device.serial,
-                apk_path
-            )
-        except Exception as e:
-            success = False
-            message = str(e)
-        finally:
-            # Garante que o progresso seja fechado
-            progress.close()
-            progress.deleteLater()
+        # O botão "Cancelar" interrompe a transferência em andamento
+        progress.canceled.connect(job.cancel)
+        job.done.connect(progress.close)
+        job.done.connect(progress.deleteLater)
+        progress.show()
+    
+    @staticmethod
+    def _install_display_name(apk_paths: list) -> str:
+        """Nome exibido para a instalação (arquivo ou quantidade de arquivos)"""
+        if len(apk_paths) == 1:
+            return os.path.basename(apk_paths[0])
+        return f"{os.path.basename(apk_paths[0])} (+{len(apk_paths) - 1} splits)"
+    
+    def _on_apk_installed(self, result: tuple):
+        """Recebe o resultado da instalação do APK"""
+        success, message = result
         
         if success:
             QMessageBox.information(self, "Sucesso", message)
@@ -638,21 +1022,79 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Erro", f"Falha ao instalar APK:\n{message}")
             self.status_bar.showMessage("Falha ao instalar APK")
     
+    def _start_bulk_install(self, devices: list, apk_paths: list):
+        """Instala o APK em todos os dispositivos selecionados, com resumo por dispositivo"""
+        apk_name = self._install_display_name(apk_paths)
+        self.status_bar.showMessage(f"Instalando {apk_name} em {len(devices)} dispositivos...")
+        
+        dialog = BulkInstallDialog(devices, apk_name, self)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        
+        job = self.jobs.submit(
+            lambda job: self.adb_manager.install_apk_bulk(
+                devices, apk_paths, on_progress=job.report_progress, cancel=job.token
+            ),
+            on_finished=self._on_bulk_install_finished,
+            on_failed=lambda message: self.status_bar.showMessage(f"Falha na instalação em lote: {message}"),
+            on_cancelled=lambda: self.status_bar.showMessage("Instalação em lote cancelada"),
+            on_progress=dialog.update_progress
+        )
+        
+        dialog.cancel_requested.connect(job.cancel)
+        job.done.connect(dialog.set_finished)
+        dialog.show()
+    
+    def _on_bulk_install_finished(self, results: dict):
+        """Recebe o resultado da instalação em lote"""
+        succeeded = sum(1 for success, _ in results.values() if success)
+        self.status_bar.showMessage(
+            f"APK instalado em {succeeded} de {len(results)} dispositivos"
+        )
+    
+    def _start_wifi_migration(self, devices: list, port: int):
+        """Passa os dispositivos USB para WiFi, com resumo por dispositivo"""
+        self.status_bar.showMessage(f"Migrando {len(devices)} dispositivo(s) para WiFi...")
+        
+        dialog = WifiMigrationDialog(devices, port, self)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        
+        job = self.jobs.submit(
+            lambda job: self.adb_manager.migrate_to_wifi(
+                devices, port, on_progress=job.report_progress, cancel=job.token
+            ),
+            on_finished=self._on_wifi_migration_finished,
+            on_failed=lambda message: self.status_bar.showMessage(f"Falha na migração para WiFi: {message}"),
+            on_cancelled=lambda: self.status_bar.showMessage("Migração para WiFi cancelada"),
+            on_progress=dialog.update_progress
+        )
+        
+        dialog.cancel_requested.connect(job.cancel)
+        job.done.connect(dialog.set_finished)
+        dialog.show()
+    
+    def _on_wifi_migration_finished(self, results: dict):
+        """Recebe o resultado da migração para WiFi"""
+        succeeded = sum(1 for success, _ in results.values() if success)
+        self.status_bar.showMessage(
+            f"{succeeded} de {len(results)} dispositivos migrados para WiFi"
+        )
+        self._refresh_devices()
+    
     def _quick_install_apk(self):
         """Instalação rápida de APK via menu"""
         if not self.current_device:
             QMessageBox.warning(self, "Aviso", "Selecione um dispositivo primeiro!")
             return
         
-        file_path, _ = QFileDialog.getOpenFileName(
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
             "Selecionar APK",
             os.path.expanduser("~"),
-            "APK Files (*.apk)"
+            APK_FILE_FILTER
         )
         
-        if file_path:
-            self._on_install_apk(file_path)
+        if file_paths:
+            self._on_install_apk(file_paths)
     
     def _on_take_screenshot(self):
         """Captura uma screenshot"""
@@ -677,10 +1119,58 @@ class MainWindow(QMainWindow):
         
         self.status_bar.showMessage("Capturando screenshot...")
         
-        success, message = self.adb_manager.take_screenshot(
-            self.current_device.serial,
-            file_path
+        serial = self.current_device.serial
+        self.jobs.submit(
+            lambda job: self._save_screenshot(serial, file_path, job),
+            on_finished=self._on_screenshot_taken,
+            on_failed=lambda message: self._on_screenshot_taken((False, message))
         )
+    
+    def _save_screenshot(self, serial: str, file_path: str, job) -> tuple:
+        """
+        Captura o framebuffer bruto e salva o PNG (executado fora da thread da interface)
+        
+        A imagem é montada sobre o buffer recebido e codificada pelo Qt; se o
+        formato não tiver equivalente, o mesmo quadro é codificado pelo
+        encoder do host. Só se o quadro bruto não puder ser usado é pedido o
+        PNG do dispositivo (sem capturar o framebuffer uma segunda vez).
+        """
+        try:
+            try:
+                frame = self.adb_manager.capture_screenshot(serial, raw=True, cancel=job.token)
+            except RuntimeError:
+                frame = None
+            
+            if frame is not None and save_frame_png(frame, file_path):
+                return True, f"Screenshot salva em: {file_path}"
+            
+            png_data = None
+            if frame is not None:
+                try:
+                    png_data = encode_png(frame)
+                except ValueError:
+                    pass
+            if png_data is None:
+                png_data = self.adb_manager.capture_screenshot(serial, raw=False, cancel=job.token)
+            
+            with open(file_path, "wb") as f:
+                f.write(png_data)
+            return True, f"Screenshot salva em: {file_path}"
+        
+        except RuntimeError as e:
+            return False, str(e)
+        except subprocess.TimeoutExpired:
+            return False, "Timeout ao capturar screenshot"
+        except FileNotFoundError as e:
+            if e.filename == file_path:
+                return False, f"Falha ao salvar screenshot: {e}"
+            return False, "ADB não encontrado"
+        except OSError as e:
+            return False, f"Falha ao salvar screenshot: {e}"
+    
+    def _on_screenshot_taken(self, result: tuple):
+        """Recebe o resultado da captura de screenshot"""
+        success, message = result
         
         if success:
             QMessageBox.information(self, "Sucesso", message)
@@ -690,24 +1180,59 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Falha ao capturar screenshot")
     
     def _on_execute_command(self, command: str):
-        """Executa um comando shell"""
+        """Executa um comando shell exibindo a saída conforme ela chega"""
         if not self.current_device:
             return
         
-        self.status_bar.showMessage(f"Executando: {command}")
+        # Um comando por vez no painel
+        if self._command_job is not None:
+            self._command_job.cancel()
         
-        success, output = self.adb_manager.execute_command(
-            self.current_device.serial,
-            command
+        self.status_bar.showMessage(f"Executando: {command}")
+        self.control_panel.append_command_output(f"$ {command}")
+        self.control_panel.insert_command_output("\n")
+        
+        serial = self.current_device.serial
+        
+        def run(job):
+            stream = self.adb_manager.stream_command(serial, command, cancel=job.token)
+            for chunk in stream:
+                job.report_progress(chunk)
+            return stream.exit_code
+        
+        job = self.jobs.submit(
+            run,
+            on_progress=self.control_panel.insert_command_output,
+            on_finished=self._on_command_executed,
+            on_failed=lambda message: self._on_command_failed(message),
+            on_cancelled=lambda: self._on_command_failed("Comando cancelado")
         )
-        
-        # Adiciona saída ao painel
-        self.control_panel.append_command_output(f"$ {command}\n{output}\n")
-        
-        if success:
+        job.done.connect(lambda: self._on_command_done(job))
+        self._command_job = job
+        self.control_panel.set_command_running(True)
+    
+    def _on_cancel_command(self):
+        """Cancela o comando em execução"""
+        if self._command_job is not None:
+            self._command_job.cancel()
+    
+    def _on_command_executed(self, exit_code):
+        """Recebe o fim de um comando shell"""
+        if exit_code == 0:
             self.status_bar.showMessage("Comando executado com sucesso")
         else:
-            self.status_bar.showMessage("Erro ao executar comando")
+            self.status_bar.showMessage(f"Erro ao executar comando (código {exit_code})")
+    
+    def _on_command_failed(self, message: str):
+        """Manipula falha ou cancelamento de um comando shell"""
+        self.control_panel.append_command_output(message)
+        self.status_bar.showMessage(message)
+    
+    def _on_command_done(self, job):
+        """Libera o painel quando o comando termina"""
+        if self._command_job is job:
+            self._command_job = None
+            self.control_panel.set_command_running(False)
     
     def _show_about(self):
         """Mostra diálogo sobre"""
@@ -758,7 +1283,15 @@ class MainWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Manipula o fechamento da janela"""
-        # Para o scrcpy se estiver rodando
+        if self.device_tracker:
+            self.device_tracker.stop()
+        self.adb_manager.connection_supervisor.stop()
+        
+        self.jobs.shutdown()
+        self.adb_manager.close_all_shell_sessions()
+        
+        # Para todas as sessões do scrcpy
+        self.scrcpy_timer.stop()
         if self.scrcpy_manager.is_running():
             self.scrcpy_manager.stop_mirroring()
         
@@ -0,0 +1,54 @@
+"""
+Diálogo de acompanhamento da instalação de APK em vários dispositivos
+"""
+
+from typing import List, Optional
+
+from ...adb_manager import ADBDevice, ADBManager, InstallProgress
+from .device_progress import DeviceProgressDialog
+
+
+class BulkInstallDialog(DeviceProgressDialog):
+    """Tabela com o andamento e o resultado da instalação por dispositivo"""
+
+    HEADERS = ["Dispositivo", "Hub USB", "Status", "Tentativa", "Mensagem"]
+    COLUMN_DEVICE = 0
+    COLUMN_HUB = 1
+    COLUMN_STATUS = 2
+    COLUMN_ATTEMPT = 3
+    COLUMN_MESSAGE = 4
+
+    STATUS_TEXT = {
+        **DeviceProgressDialog.STATUS_TEXT,
+        InstallProgress.INSTALLING: "📦 Instalando",
+        InstallProgress.RETRYING: "🔁 Repetindo",
+        InstallProgress.SUCCESS: "✅ Instalado",
+    }
+
+    def __init__(self, devices: List[ADBDevice], apk_name: str, parent=None):
+        super().__init__(
+            devices, f"Instalando {apk_name}",
+            f"<b>{apk_name}</b> em {len(devices)} dispositivo(s)", parent
+        )
+
+    def _fill_row(self, row: int, device: ADBDevice):
+        """Mostra o hub USB de cada dispositivo"""
+        self.table.item(row, self.COLUMN_HUB).setText(ADBManager.usb_hub_key(device))
+
+    def _status_text(self, progress: InstallProgress) -> str:
+        """Inclui a porcentagem enviada durante a instalação"""
+        status_text = super()._status_text(progress)
+        if progress.status == InstallProgress.INSTALLING and progress.total_bytes:
+            status_text += f" {progress.sent_bytes * 100 // progress.total_bytes}%"
+        return status_text
+
+    def _update_row(self, row: int, progress: InstallProgress):
+        """Atualiza a tentativa atual"""
+        if progress.attempt:
+            self.table.item(row, self.COLUMN_ATTEMPT).setText(str(progress.attempt))
+
+    def _cancelled_progress(self, device: ADBDevice, progress: Optional[InstallProgress]) -> InstallProgress:
+        return InstallProgress(
+            device.serial, InstallProgress.CANCELLED,
+            progress.attempt if progress else 0, "Instalação cancelada"
+        )
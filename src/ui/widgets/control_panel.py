@@ -8,23 +8,34 @@ from PySide6.QtWidgets import (
     QFileDialog, QMessageBox, QTextEdit, QTabWidget
 )
 from PySide6.QtCore import Signal, Qt
+from PySide6.QtGui import QTextCursor
 from ...adb_manager import ADBDevice
 from ...scrcpy_manager import ScrcpyOptions
+from ...mirroring_budget import MirroringBudget
+
+# Filtro dos diálogos de seleção de APK
+APK_FILE_FILTER = "APK Files (*.apk *.apks *.xapk *.apkm)"
 
 
 class ControlPanelWidget(QWidget):
     """Widget do painel de controle do scrcpy e ADB"""
     
     start_mirroring = Signal(ScrcpyOptions)
+    start_mirroring_selected = Signal(ScrcpyOptions)  # Todos os dispositivos selecionados
     stop_mirroring = Signal()
-    install_apk = Signal(str)
+    stop_all_mirroring = Signal()
+    budget_changed = Signal(object)  # MirroringBudget ou None (desligado)
+    install_apk = Signal(list)  # Um APK, base + splits ou pacote .apks/.xapk
     take_screenshot = Signal()
+    benchmark_encoders = Signal()
     execute_command = Signal(str)
+    cancel_command = Signal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_device: ADBDevice = None
         self.is_mirroring = False
+        self.apk_paths = []
         self.setup_ui()
         
     def setup_ui(self):
@@ -102,6 +113,14 @@ class ControlPanelWidget(QWidget):
         fps_layout.addWidget(self.fps_spin)
         quality_layout.addLayout(fps_layout)
         
+        # Bitrate adaptativo (reduz/restaura a qualidade conforme o FPS)
+        self.adaptive_check = QCheckBox("Bitrate Adaptativo")
+        self.adaptive_check.setToolTip(
+            "Reduz bitrate e resolução quando o FPS cai com quadros descartados\n"
+            "(ex: WiFi congestionado) e volta a subir quando a conexão se recupera"
+        )
+        quality_layout.addWidget(self.adaptive_check)
+        
         quality_group.setLayout(quality_layout)
         layout.addWidget(quality_group)
         
@@ -152,6 +171,51 @@ class ControlPanelWidget(QWidget):
         device_group.setLayout(device_layout)
         layout.addWidget(device_group)
         
+        # Orçamento dividido entre várias sessões (a selecionada tem prioridade)
+        defaults = MirroringBudget()
+        self.budget_group = QGroupBox("Orçamento para Várias Sessões")
+        self.budget_group.setCheckable(True)
+        self.budget_group.setChecked(True)
+        self.budget_group.setToolTip(
+            "Divide bitrate, FPS e resolução entre as sessões ativas;\n"
+            "o dispositivo selecionado recebe a maior parte"
+        )
+        budget_layout = QVBoxLayout()
+        
+        total_bitrate_layout = QHBoxLayout()
+        total_bitrate_layout.addWidget(QLabel("Bitrate Total:"))
+        self.total_bitrate_spin = QSpinBox()
+        self.total_bitrate_spin.setRange(4, 1000)
+        self.total_bitrate_spin.setSuffix(" Mbps")
+        self.total_bitrate_spin.setValue(defaults.total_bit_rate // 1_000_000)
+        total_bitrate_layout.addWidget(self.total_bitrate_spin)
+        budget_layout.addLayout(total_bitrate_layout)
+        
+        total_fps_layout = QHBoxLayout()
+        total_fps_layout.addWidget(QLabel("FPS Total:"))
+        self.total_fps_spin = QSpinBox()
+        self.total_fps_spin.setRange(30, 2000)
+        self.total_fps_spin.setValue(defaults.total_fps)
+        total_fps_layout.addWidget(self.total_fps_spin)
+        budget_layout.addLayout(total_fps_layout)
+        
+        total_pixels_layout = QHBoxLayout()
+        total_pixels_layout.addWidget(QLabel("Pixels Totais:"))
+        self.total_pixels_spin = QSpinBox()
+        self.total_pixels_spin.setRange(1, 200)
+        self.total_pixels_spin.setSuffix(" MP por quadro")
+        self.total_pixels_spin.setValue(defaults.total_pixels // 1_000_000)
+        total_pixels_layout.addWidget(self.total_pixels_spin)
+        budget_layout.addLayout(total_pixels_layout)
+        
+        apply_budget_btn = QPushButton("Aplicar Orçamento")
+        apply_budget_btn.clicked.connect(self._on_budget_changed)
+        budget_layout.addWidget(apply_budget_btn)
+        
+        self.budget_group.setLayout(budget_layout)
+        self.budget_group.toggled.connect(self._on_budget_changed)
+        layout.addWidget(self.budget_group)
+        
         # Botões de controle
         buttons_layout = QHBoxLayout()
         
@@ -208,6 +272,32 @@ class ControlPanelWidget(QWidget):
         
         layout.addLayout(buttons_layout)
         
+        # Várias sessões ao mesmo tempo (janelas lado a lado)
+        multi_layout = QHBoxLayout()
+        
+        self.start_selected_btn = QPushButton("🗗 Espelhar Selecionados")
+        self.start_selected_btn.setEnabled(False)
+        self.start_selected_btn.setToolTip("Abre uma janela por dispositivo selecionado, lado a lado")
+        self.start_selected_btn.clicked.connect(self._on_start_mirroring_selected)
+        multi_layout.addWidget(self.start_selected_btn)
+        
+        self.stop_all_btn = QPushButton("⏹ Parar Todos")
+        self.stop_all_btn.setEnabled(False)
+        self.stop_all_btn.clicked.connect(self.stop_all_mirroring.emit)
+        multi_layout.addWidget(self.stop_all_btn)
+        
+        layout.addLayout(multi_layout)
+        
+        self.sessions_label = QLabel("Nenhuma sessão ativa")
+        self.sessions_label.setStyleSheet("color: #9a9a9a;")
+        layout.addWidget(self.sessions_label)
+        
+        # Telemetria da sessão do dispositivo atual (FPS, descartes, encoder)
+        self.stats_label = QLabel()
+        self.stats_label.setWordWrap(True)
+        self.stats_label.setVisible(False)
+        layout.addWidget(self.stats_label)
+        
         layout.addStretch()
         
         return widget
@@ -223,7 +313,7 @@ class ControlPanelWidget(QWidget):
         
         apk_btn_layout = QHBoxLayout()
         self.apk_path_edit = QLineEdit()
-        self.apk_path_edit.setPlaceholderText("Selecione um arquivo APK...")
+        self.apk_path_edit.setPlaceholderText("Selecione um APK, splits ou pacote .apks/.xapk...")
         self.apk_path_edit.setReadOnly(True)
         apk_btn_layout.addWidget(self.apk_path_edit)
         
@@ -251,6 +341,18 @@ class ControlPanelWidget(QWidget):
         screenshot_group.setLayout(screenshot_layout)
         layout.addWidget(screenshot_group)
         
+        # Teste dos encoders de vídeo (o vencedor é usado no espelhamento)
+        encoder_group = QGroupBox("Encoders de Vídeo")
+        encoder_layout = QVBoxLayout()
+        
+        benchmark_btn = QPushButton("🧪 Testar Encoders")
+        benchmark_btn.setToolTip("Testa cada encoder do dispositivo e passa a usar o mais rápido neste modelo")
+        benchmark_btn.clicked.connect(self._on_benchmark_encoders)
+        encoder_layout.addWidget(benchmark_btn)
+        
+        encoder_group.setLayout(encoder_layout)
+        layout.addWidget(encoder_group)
+        
         # Informações do dispositivo
         info_group = QGroupBox("Informações do Dispositivo")
         info_layout = QVBoxLayout()
@@ -286,6 +388,11 @@ class ControlPanelWidget(QWidget):
         execute_btn.clicked.connect(self._on_execute_command)
         cmd_layout.addWidget(execute_btn)
         
+        self.cancel_command_btn = QPushButton("⏹ Cancelar")
+        self.cancel_command_btn.setEnabled(False)
+        self.cancel_command_btn.clicked.connect(self.cancel_command.emit)
+        cmd_layout.addWidget(self.cancel_command_btn)
+        
         shell_layout.addLayout(cmd_layout)
         
         self.command_output = QTextEdit()
@@ -324,13 +431,38 @@ class ControlPanelWidget(QWidget):
             QMessageBox.warning(self, "Aviso", "Nenhum dispositivo selecionado!")
             return
         
-        # Cria opções baseadas nas configurações
+        # Emite sinal
+        self.start_mirroring.emit(self._build_options())
+    
+    def _on_start_mirroring_selected(self):
+        """Manipula início do espelhamento de todos os selecionados"""
+        if not self.current_device:
+            QMessageBox.warning(self, "Aviso", "Nenhum dispositivo selecionado!")
+            return
+        
+        self.start_mirroring_selected.emit(self._build_options())
+    
+    def _on_budget_changed(self):
+        """Emite o orçamento configurado (None se desligado)"""
+        if not self.budget_group.isChecked():
+            self.budget_changed.emit(None)
+            return
+        
+        self.budget_changed.emit(MirroringBudget(
+            total_bit_rate=self.total_bitrate_spin.value() * 1_000_000,
+            total_fps=self.total_fps_spin.value(),
+            total_pixels=self.total_pixels_spin.value() * 1_000_000
+        ))
+    
+    def _build_options(self) -> ScrcpyOptions:
+        """Cria as opções do scrcpy a partir das configurações"""
         options = ScrcpyOptions()
         
         if self.resolution_spin.value() > 0:
             options.max_size = self.resolution_spin.value()
         
         options.bit_rate = self.bitrate_combo.currentText()
+        options.adaptive_bitrate = self.adaptive_check.isChecked()
         
         if self.fps_spin.value() > 0:
             options.max_fps = self.fps_spin.value()
@@ -358,30 +490,28 @@ class ControlPanelWidget(QWidget):
             options.lock_orientation = orientation_map.get(orientation_index)
             print(f"DEBUG: Valor enviado ao scrcpy (em graus): {options.lock_orientation}")
         
-        # Emite sinal
-        self.start_mirroring.emit(options)
+        return options
     
     def _on_stop_mirroring(self):
         """Manipula parada do espelhamento"""
         self.stop_mirroring.emit()
     
     def _browse_apk(self):
-        """Abre diálogo para selecionar APK"""
-        file_path, _ = QFileDialog.getOpenFileName(
+        """Abre diálogo para selecionar APK (vários arquivos = base + splits)"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
             "Selecionar APK",
             "",
-            "APK Files (*.apk)"
+            APK_FILE_FILTER
         )
         
-        if file_path:
-            self.apk_path_edit.setText(file_path)
+        if file_paths:
+            self.apk_paths = file_paths
+            self.apk_path_edit.setText("; ".join(file_paths))
     
     def _on_install_apk(self):
         """Manipula instalação de APK"""
-        apk_path = self.apk_path_edit.text()
-        
-        if not apk_path:
+        if not self.apk_paths:
             QMessageBox.warning(self, "Aviso", "Selecione um arquivo APK!")
             return
         
@@ -389,7 +519,15 @@ class ControlPanelWidget(QWidget):
             QMessageBox.warning(self, "Aviso", "Nenhum dispositivo selecionado!")
             return
         
-        self.install_apk.emit(apk_path)
+        self.install_apk.emit(self.apk_paths)
+    
+    def _on_benchmark_encoders(self):
+        """Manipula o teste dos encoders"""
+        if not self.current_device:
+            QMessageBox.warning(self, "Aviso", "Nenhum dispositivo selecionado!")
+            return
+        
+        self.benchmark_encoders.emit()
     
     def _on_take_screenshot(self):
         """Manipula captura de screenshot"""
@@ -421,6 +559,7 @@ class ControlPanelWidget(QWidget):
             self.start_btn.setEnabled(True)
         else:
             self.start_btn.setEnabled(False)
+        self.start_selected_btn.setEnabled(device is not None)
     
     def set_device_details(self, details: dict):
         """Define detalhes do dispositivo"""
@@ -436,7 +575,32 @@ class ControlPanelWidget(QWidget):
         self.start_btn.setEnabled(not is_mirroring and self.current_device is not None)
         self.stop_btn.setEnabled(is_mirroring)
     
+    def set_mirroring_stats(self, text: str):
+        """Mostra a telemetria da sessão do dispositivo atual ("" esconde)"""
+        self.stats_label.setText(text)
+        self.stats_label.setVisible(bool(text))
+    
+    def set_session_count(self, count: int):
+        """Mostra quantas sessões de espelhamento estão ativas"""
+        self.stop_all_btn.setEnabled(count > 0)
+        if count == 0:
+            self.sessions_label.setText("Nenhuma sessão ativa")
+        else:
+            self.sessions_label.setText(f"{count} sessão(ões) de espelhamento ativa(s)")
+    
     def append_command_output(self, output: str):
         """Adiciona saída de comando"""
         self.command_output.append(output)
+    
+    def insert_command_output(self, chunk: str):
+        """Adiciona um trecho de saída no fim, sem quebra de linha (streaming)"""
+        cursor = self.command_output.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(chunk)
+        self.command_output.setTextCursor(cursor)
+        self.command_output.ensureCursorVisible()
+    
+    def set_command_running(self, running: bool):
+        """Habilita o cancelamento enquanto um comando está em execução"""
+        self.cancel_command_btn.setEnabled(running)
 
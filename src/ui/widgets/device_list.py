@@ -4,10 +4,10 @@ Widget de lista de dispositivos
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QListWidget, QListWidgetItem,
-    QPushButton, QHBoxLayout, QLabel
+    QPushButton, QHBoxLayout, QLabel, QAbstractItemView
 )
 from PySide6.QtCore import Signal, Qt
-from typing import List
+from typing import Dict, List
 from ...adb_manager import ADBDevice
 
 
@@ -15,11 +15,15 @@ class DeviceListWidget(QWidget):
     """Widget para exibir a lista de dispositivos Android conectados"""
     
     device_selected = Signal(ADBDevice)
+    device_updated = Signal(ADBDevice)  # Dados do dispositivo selecionado mudaram
     refresh_requested = Signal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.devices: List[ADBDevice] = []
+        self._items: Dict[str, QListWidgetItem] = {}
+        self._health: Dict[str, str] = {}  # serial -> saúde da conexão WiFi
+        self._selected_serial = ""
         self.setup_ui()
         
     def setup_ui(self):
@@ -41,7 +45,9 @@ class DeviceListWidget(QWidget):
         
         # Lista de dispositivos
         self.list_widget = QListWidget()
-        self.list_widget.itemClicked.connect(self._on_item_clicked)
+        # Ctrl/Shift+clique selecionam vários dispositivos (ações em lote)
+        self.list_widget.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list_widget.currentItemChanged.connect(self._on_current_item_changed)
         layout.addWidget(self.list_widget)
         
         # Label de status
@@ -55,56 +61,142 @@ class DeviceListWidget(QWidget):
         layout.addWidget(self.status_label)
         
     def update_devices(self, devices: List[ADBDevice]):
-        """Atualiza a lista de dispositivos"""
+        """
+        Atualiza a lista de dispositivos de forma incremental
+        
+        As linhas são reconciliadas pelo serial: só insere, remove ou altera o
+        que mudou, preserva a seleção atual e só emite `device_selected`
+        quando o dispositivo selecionado de fato muda.
+        """
         self.devices = devices
-        self.list_widget.clear()
+        incoming = {device.serial: device for device in devices}
+        selected_serial = self._current_serial()
+        selected_serials = {device.serial for device in self.get_selected_devices(only_ready=False)}
+        
+        # Mudanças programáticas não devem disparar seleção
+        self.list_widget.blockSignals(True)
+        try:
+            # Remove dispositivos que sumiram
+            for serial in [s for s in self._items if s not in incoming]:
+                item = self._items.pop(serial)
+                self.list_widget.takeItem(self.list_widget.row(item))
+            
+            # Insere/atualiza na ordem reportada pelo adb
+            for index, device in enumerate(devices):
+                item = self._items.get(device.serial)
+                if item is None:
+                    item = QListWidgetItem()
+                    self._items[device.serial] = item
+                    self.list_widget.insertItem(index, item)
+                elif self.list_widget.row(item) != index:
+                    self.list_widget.takeItem(self.list_widget.row(item))
+                    self.list_widget.insertItem(index, item)
+                
+                self._update_item(item, device)
+            
+            # Restaura a seleção (ou escolhe o primeiro dispositivo disponível)
+            if selected_serial in self._items:
+                self.list_widget.setCurrentItem(self._items[selected_serial])
+            elif self.list_widget.count() > 0:
+                self.list_widget.setCurrentRow(0)
+            
+            # Mantém a seleção múltipla (setCurrentItem limpa as demais)
+            for serial in selected_serials:
+                item = self._items.get(serial)
+                if item is not None:
+                    item.setSelected(True)
+        finally:
+            self.list_widget.blockSignals(False)
         
         if not devices:
             self.status_label.setText("Nenhum dispositivo encontrado")
             self.status_label.show()
+        else:
+            self.status_label.hide()
+        
+        self._sync_selection()
+    
+    def update_device(self, device: ADBDevice):
+        """Atualiza uma única linha (ex: informações que chegaram depois)"""
+        item = self._items.get(device.serial)
+        if item is None:
             return
         
-        self.status_label.hide()
+        self._update_item(item, device)
         
-        for device in devices:
-            # Cria o texto do item
-            if device.state == "device":
-                if device.model:
-                    text = f"📱 {device.manufacturer} {device.model}"
-                    if device.android_version:
-                        text += f" (Android {device.android_version})"
-                    if device.battery_level:
-                        text += f" - 🔋 {device.battery_level}"
-                else:
-                    text = f"📱 {device.serial}"
+        if item is self.list_widget.currentItem():
+            self._sync_selection()
+    
+    def _format_device_text(self, device: ADBDevice) -> str:
+        """Monta o texto exibido para o dispositivo"""
+        if device.state == "device":
+            if device.model:
+                name = " ".join(part for part in (device.manufacturer, device.model) if part)
+                text = f"📱 {name}"
+                if device.android_version:
+                    text += f" (Android {device.android_version})"
+                if device.battery_level:
+                    text += f" - 🔋 {device.battery_level}"
             else:
-                text = f"⚠️ {device.serial} - {device.state}"
-            
-            # Adiciona à lista
-            item = QListWidgetItem(text)
-            item.setData(Qt.UserRole, device)
-            
+                text = f"📱 {device.serial}"
+        else:
+            text = f"⚠️ {device.serial} - {device.state}"
+        
+        return text
+    
+    def _update_item(self, item: QListWidgetItem, device: ADBDevice):
+        """Atualiza texto, cor e dados de uma linha (apenas o que mudou)"""
+        text = self._format_device_text(device)
+        if item.text() != text:
+            item.setText(text)
+        
+        previous = item.data(Qt.UserRole)
+        if previous is None or previous.state != device.state:
             # Define a cor baseado no estado
             if device.state == "device":
                 item.setForeground(Qt.black)
             else:
                 item.setForeground(Qt.darkGray)
-            
-            self.list_widget.addItem(item)
         
-        # Seleciona o primeiro item automaticamente
-        if self.list_widget.count() > 0:
-            self.list_widget.setCurrentRow(0)
-            first_item = self.list_widget.item(0)
-            device = first_item.data(Qt.UserRole)
-            if device.state == "device":
-                self.device_selected.emit(device)
+        tooltip = self._health.get(device.serial, "")
+        if item.toolTip() != tooltip:
+            item.setToolTip(tooltip)
+        
+        item.setData(Qt.UserRole, device)
     
-    def _on_item_clicked(self, item: QListWidgetItem):
-        """Manipula o clique em um item da lista"""
-        device = item.data(Qt.UserRole)
-        if device.state == "device":
+    def set_connection_health(self, serial: str, summary: str):
+        """Mostra a saúde da conexão WiFi (tooltip da linha)"""
+        self._health[serial] = summary
+        item = self._items.get(serial)
+        if item is not None:
+            item.setToolTip(summary)
+    
+    def _current_serial(self) -> str:
+        """Serial da linha atualmente selecionada"""
+        current_item = self.list_widget.currentItem()
+        if current_item:
+            return current_item.data(Qt.UserRole).serial
+        return ""
+    
+    def _on_current_item_changed(self, current: QListWidgetItem, previous: QListWidgetItem):
+        """Manipula a troca de seleção (clique ou teclado)"""
+        self._sync_selection()
+    
+    def _sync_selection(self):
+        """Emite device_selected/device_updated conforme a seleção atual"""
+        device = self.get_selected_device()
+        if device is None:
+            self._selected_serial = ""
+            return
+        
+        if device.state != "device":
+            return
+        
+        if device.serial != self._selected_serial:
+            self._selected_serial = device.serial
             self.device_selected.emit(device)
+        else:
+            self.device_updated.emit(device)
     
     def get_selected_device(self) -> ADBDevice:
         """Retorna o dispositivo selecionado"""
@@ -113,6 +205,24 @@ class DeviceListWidget(QWidget):
             return current_item.data(Qt.UserRole)
         return None
     
+    def get_selected_devices(self, only_ready: bool = True) -> List[ADBDevice]:
+        """
+        Retorna os dispositivos selecionados, na ordem da lista
+        
+        Args:
+            only_ready: Se True, ignora dispositivos fora do estado "device"
+        """
+        devices = []
+        for row in range(self.list_widget.count()):
+            item = self.list_widget.item(row)
+            if not item.isSelected():
+                continue
+            device = item.data(Qt.UserRole)
+            if only_ready and device.state != "device":
+                continue
+            devices.append(device)
+        return devices
+    
     def set_refreshing(self, refreshing: bool):
         """Define o estado de atualização"""
         self.refresh_btn.setEnabled(not refreshing)
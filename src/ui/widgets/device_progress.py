@@ -0,0 +1,174 @@
+"""
+Diálogo base de acompanhamento de operações em lote por dispositivo
+"""
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PySide6.QtCore import Signal
+from PySide6.QtGui import QColor
+from typing import Dict, List, Optional
+
+from ...adb_manager import ADBDevice, DeviceProgress
+
+
+class DeviceProgressDialog(QDialog):
+    """
+    Tabela com o andamento e o resultado de uma operação por dispositivo
+
+    As subclasses definem as colunas (HEADERS e COLUMN_*), os textos de
+    status e como preencher as colunas próprias da operação.
+    """
+
+    cancel_requested = Signal()
+
+    HEADERS: List[str] = ["Dispositivo", "Status", "Mensagem"]
+    COLUMN_DEVICE = 0
+    COLUMN_STATUS = 1
+    COLUMN_MESSAGE = 2
+
+    STATUS_TEXT = {
+        DeviceProgress.WAITING: "⏳ Aguardando",
+        DeviceProgress.SUCCESS: "✅ Concluído",
+        DeviceProgress.FAILED: "❌ Falhou",
+        DeviceProgress.CANCELLED: "⏹ Cancelado",
+    }
+
+    STATUS_COLOR = {
+        DeviceProgress.SUCCESS: QColor("#2e7d32"),
+        DeviceProgress.FAILED: QColor("#c62828"),
+        DeviceProgress.CANCELLED: QColor("#7a7a7a"),
+    }
+
+    def __init__(self, devices: List[ADBDevice], title: str, heading: str, parent=None):
+        super().__init__(parent)
+        self.devices = devices
+        self._rows: Dict[str, int] = {}
+        self._progress: Dict[str, DeviceProgress] = {}
+        self._running = True
+
+        self.setWindowTitle(title)
+        self.resize(760, 420)
+        self._setup_ui(heading)
+
+    def _setup_ui(self, heading: str):
+        """Configura a interface do diálogo"""
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(QLabel(heading))
+
+        # Uma linha por dispositivo
+        self.table = QTableWidget(len(self.devices), len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(self.COLUMN_MESSAGE, QHeaderView.Stretch)
+
+        for row, device in enumerate(self.devices):
+            self._rows[device.serial] = row
+            for column in range(len(self.HEADERS)):
+                self.table.setItem(row, column, QTableWidgetItem(""))
+
+            name = " ".join(part for part in (device.manufacturer, device.model) if part)
+            label = f"{name} ({device.serial})" if name else device.serial
+            self.table.item(row, self.COLUMN_DEVICE).setText(label)
+            self.table.item(row, self.COLUMN_STATUS).setText(self.STATUS_TEXT[DeviceProgress.WAITING])
+            self._fill_row(row, device)
+
+        self.table.resizeColumnsToContents()
+        layout.addWidget(self.table)
+
+        # Resumo e botões
+        footer = QHBoxLayout()
+        self.summary_label = QLabel()
+        footer.addWidget(self.summary_label)
+        footer.addStretch()
+
+        self.cancel_btn = QPushButton("⏹ Cancelar")
+        self.cancel_btn.clicked.connect(self._on_cancel)
+        footer.addWidget(self.cancel_btn)
+
+        self.close_btn = QPushButton("Fechar")
+        self.close_btn.setEnabled(False)
+        self.close_btn.clicked.connect(self.accept)
+        footer.addWidget(self.close_btn)
+
+        layout.addLayout(footer)
+        self._update_summary()
+
+    def _fill_row(self, row: int, device: ADBDevice):
+        """Preenche as colunas próprias da operação na criação da linha"""
+
+    def _update_row(self, row: int, progress: DeviceProgress):
+        """Atualiza as colunas próprias da operação"""
+
+    def _status_text(self, progress: DeviceProgress) -> str:
+        """Texto da coluna de status"""
+        return self.STATUS_TEXT.get(progress.status, progress.status)
+
+    def _cancelled_progress(self, device: ADBDevice, progress: Optional[DeviceProgress]) -> DeviceProgress:
+        """Resultado final de um dispositivo interrompido pelo cancelamento"""
+        raise NotImplementedError
+
+    def update_progress(self, progress: DeviceProgress):
+        """Atualiza a linha do dispositivo"""
+        row = self._rows.get(progress.serial)
+        if row is None:
+            return
+
+        self._progress[progress.serial] = progress
+
+        status_item = self.table.item(row, self.COLUMN_STATUS)
+        status_item.setText(self._status_text(progress))
+        color = self.STATUS_COLOR.get(progress.status)
+        if color is not None:
+            status_item.setForeground(color)
+
+        self._update_row(row, progress)
+
+        message = progress.message.strip().splitlines()
+        message_item = self.table.item(row, self.COLUMN_MESSAGE)
+        message_item.setText(message[-1] if message else "")
+        message_item.setToolTip(progress.message.strip())
+
+        self._update_summary()
+
+    def _update_summary(self):
+        """Atualiza o resumo (concluídos, sucessos e falhas)"""
+        statuses = [progress.status for progress in self._progress.values()]
+        done = sum(1 for progress in self._progress.values() if progress.finished)
+        succeeded = statuses.count(DeviceProgress.SUCCESS)
+        failed = statuses.count(DeviceProgress.FAILED)
+
+        self.summary_label.setText(
+            f"{done}/{len(self.devices)} concluídos - ✅ {succeeded} - ❌ {failed}"
+        )
+
+    def set_finished(self):
+        """Libera o fechamento do diálogo ao fim da operação"""
+        self._running = False
+
+        # Dispositivos sem resultado final foram interrompidos pelo cancelamento
+        for device in self.devices:
+            progress = self._progress.get(device.serial)
+            if progress is None or not progress.finished:
+                self.update_progress(self._cancelled_progress(device, progress))
+
+        self.cancel_btn.setEnabled(False)
+        self.close_btn.setEnabled(True)
+        self._update_summary()
+
+    def _on_cancel(self):
+        """Solicita o cancelamento da operação"""
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.setText("Cancelando...")
+        self.cancel_requested.emit()
+
+    def reject(self):
+        """Fechar (Esc/X) durante a operação equivale a cancelar"""
+        if self._running:
+            self._on_cancel()
+            return
+        super().reject()
@@ -5,12 +5,16 @@ Widget para conexão WiFi de dispositivos Android
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QLineEdit, QPushButton, QGroupBox, QMessageBox,
-    QSpinBox, QProgressDialog
+    QSpinBox, QProgressDialog, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView
 )
 from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtGui import QFont
 import re
 
+from ...adb_manager import ADBManager
+from ...lan_scanner import local_network, parse_port_range
+
 
 class WiFiConnectionWorker(QThread):
     """Worker thread para operações WiFi"""
@@ -46,17 +50,29 @@ class WiFiConnectionWorker(QThread):
 class WiFiConnectionWidget(QGroupBox):
     """Widget para gerenciar conexões WiFi"""
     
-    def __init__(self, adb_manager):
+    # Dispositivos USB a migrar para WiFi e porta (executado pela janela principal)
+    migrate_requested = Signal(list, int)
+    
+    def __init__(self, adb_manager, jobs):
         super().__init__()
         self.adb_manager = adb_manager
+        self.jobs = jobs
         self.worker = None
+        self.ip_worker = None
+        self._scan_job = None
+        
+        # Lista de dispositivos recebida da janela principal (sem `adb devices` próprio)
+        self.devices = []
+        self.selected_serial = ""
+        self._ip_detected = False
+        
         self._setup_ui()
     
     def _setup_ui(self):
         """Configura a interface do widget"""
         # self.setTitle("Conexão WiFi")  # Título removido
         self.setMinimumHeight(600)
-        self.setMaximumHeight(750)
+        self.setMaximumHeight(1100)
         
         layout = QVBoxLayout()
         layout.setSpacing(20)
@@ -112,6 +128,14 @@ class WiFiConnectionWidget(QGroupBox):
         self.enable_wifi_btn.setStyleSheet("font-size: 11px;")
         usb_layout.addWidget(self.enable_wifi_btn)
         
+        # Botão migrar todos os dispositivos USB (tcpip + IP + connect em cada um)
+        self.migrate_btn = QPushButton("📶 Migrar todos os USB para WiFi")
+        self.migrate_btn.clicked.connect(self._migrate_all_usb)
+        self.migrate_btn.setEnabled(False)
+        self.migrate_btn.setFixedHeight(35)
+        self.migrate_btn.setStyleSheet("font-size: 11px;")
+        usb_layout.addWidget(self.migrate_btn)
+        
         usb_group.setLayout(usb_layout)
         layout.addWidget(usb_group)
         
@@ -197,6 +221,81 @@ class WiFiConnectionWidget(QGroupBox):
         ip_group.setLayout(ip_layout)
         layout.addWidget(ip_group)
         
+        # BLOCO 3: Procurar dispositivos na rede
+        scan_group = QGroupBox("3. Procurar na rede")
+        scan_group.setStyleSheet("""
+            QGroupBox {
+                font-weight: bold;
+                border: 2px solid #555555;
+                border-radius: 8px;
+                margin-top: 10px;
+                padding-top: 15px;
+                padding-bottom: 15px;
+                padding-left: 15px;
+                padding-right: 15px;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 5px 0 5px;
+            }
+        """)
+        scan_layout = QVBoxLayout()
+        scan_layout.setSpacing(10)
+        scan_layout.setContentsMargins(10, 20, 10, 10)
+        
+        # Linha 1: sub-rede e portas
+        network_layout = QHBoxLayout()
+        network_label = QLabel("Rede:")
+        network_label.setStyleSheet("font-size: 11px; padding: 3px;")
+        network_layout.addWidget(network_label)
+        
+        self.network_input = QLineEdit(local_network())
+        self.network_input.setPlaceholderText("192.168.1.0/24")
+        self.network_input.setFixedHeight(32)
+        self.network_input.setStyleSheet("font-size: 11px;")
+        network_layout.addWidget(self.network_input)
+        
+        ports_label = QLabel("Portas:")
+        ports_label.setStyleSheet("font-size: 11px; padding: 3px;")
+        network_layout.addWidget(ports_label)
+        
+        self.scan_ports_input = QLineEdit("5555")
+        self.scan_ports_input.setPlaceholderText("5555, 5556-5560")
+        self.scan_ports_input.setToolTip(
+            "Portas testadas em cada host (ex: 5555, 5556-5560)\n"
+            "A depuração por WiFi usa uma porta aleatória e é encontrada via mDNS"
+        )
+        self.scan_ports_input.setFixedHeight(32)
+        self.scan_ports_input.setStyleSheet("font-size: 11px;")
+        network_layout.addWidget(self.scan_ports_input)
+        
+        scan_layout.addLayout(network_layout)
+        
+        # Linha 2: botão procurar
+        self.scan_btn = QPushButton("🔍 Procurar")
+        self.scan_btn.clicked.connect(self._on_scan_clicked)
+        self.scan_btn.setFixedHeight(35)
+        self.scan_btn.setStyleSheet("font-size: 11px;")
+        scan_layout.addWidget(self.scan_btn)
+        
+        # Linha 3: dispositivos encontrados (conexão com um clique)
+        self.scan_table = QTableWidget(0, 3)
+        self.scan_table.setHorizontalHeaderLabels(["Endereço", "Dispositivo", ""])
+        self.scan_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.scan_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.scan_table.verticalHeader().setVisible(False)
+        self.scan_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.scan_table.setMinimumHeight(150)
+        scan_layout.addWidget(self.scan_table)
+        
+        self.scan_status_label = QLabel("")
+        self.scan_status_label.setStyleSheet("color: #888888; font-size: 10px; padding: 3px;")
+        scan_layout.addWidget(self.scan_status_label)
+        
+        scan_group.setLayout(scan_layout)
+        layout.addWidget(scan_group)
+        
         # Seção: IP detectado
         self.ip_display = QLabel("IP não detectado")
         self.ip_display.setStyleSheet("color: #3584e4; font-weight: bold; font-size: 11px; padding: 8px;")
@@ -219,9 +318,7 @@ class WiFiConnectionWidget(QGroupBox):
         layout.addLayout(info_section)
         
         self.setLayout(layout)
-        
-        # Tenta obter IP automaticamente ao inicializar
-        self._auto_detect_ip()
+        self._update_usb_state()
     
     def _validate_ip(self, text):
         """Valida o formato do IP"""
@@ -229,54 +326,81 @@ class WiFiConnectionWidget(QGroupBox):
         is_valid = bool(re.match(ip_pattern, text)) and text != ""
         self.connect_btn.setEnabled(is_valid)
     
+    def set_devices(self, devices, selected_serial=""):
+        """Recebe a lista de dispositivos e o selecionado (da janela principal)"""
+        self.devices = devices
+        self.selected_serial = selected_serial
+        self._update_usb_state()
+        
+        # Detecta o IP automaticamente na primeira vez que houver um dispositivo USB
+        if not self._ip_detected and self._usb_devices():
+            self._ip_detected = True
+            self._auto_detect_ip()
+    
+    def _usb_devices(self):
+        """Dispositivos prontos ligados por USB"""
+        return [d for d in self.devices if d.state == "device" and ADBManager.is_usb_device(d)]
+    
+    def _target_usb_device(self):
+        """Dispositivo USB das operações individuais: o selecionado, senão o primeiro"""
+        usb_devices = self._usb_devices()
+        for device in usb_devices:
+            if device.serial == self.selected_serial:
+                return device
+        return usb_devices[0] if usb_devices else None
+    
+    def _update_usb_state(self):
+        """Atualiza o botão de migração e o aviso conforme os dispositivos USB"""
+        count = len(self._usb_devices())
+        self.migrate_btn.setEnabled(count > 0)
+        self.migrate_btn.setText(
+            f"📶 Migrar {count} dispositivo(s) USB para WiFi" if count else "📶 Migrar todos os USB para WiFi"
+        )
+        if not count and not self.ip_input.text():
+            self.ip_display.setText("📱 Nenhum dispositivo USB conectado")
+    
     def _auto_detect_ip(self):
-        """Tenta detectar automaticamente o IP do dispositivo"""
-        try:
-            devices = self.adb_manager.list_devices()
-            usb_devices = [d for d in devices if d.state == "device" and not ":" in d.serial]
-            
-            if usb_devices:
-                device = usb_devices[0]
-                ip = self.adb_manager.get_device_ip(device.serial)
-                if ip:
-                    self.ip_display.setText(f"📱 IP detectado: {ip}")
-                    self.ip_input.setText(ip)
-                    self.get_ip_btn.setText("🔄 Atualizar")
-                else:
-                    self.ip_display.setText("📱 Conectado via USB - clique 'Obter IP'")
-            else:
-                self.ip_display.setText("📱 Nenhum dispositivo USB conectado")
-        except Exception as e:
-            self.ip_display.setText(f"❌ Erro: {str(e)}")
+        """Tenta detectar automaticamente o IP do dispositivo (sem avisos)"""
+        device = self._target_usb_device()
+        if device is None:
+            return
+        
+        self.ip_display.setText("🔍 Detectando IP...")
+        self.ip_worker = WiFiConnectionWorker(self.adb_manager, "get_ip", device_id=device.serial)
+        self.ip_worker.finished.connect(self._on_ip_auto_detected)
+        self.ip_worker.start()
+    
+    def _on_ip_auto_detected(self, success, message):
+        """Callback da detecção automática"""
+        if success:
+            self.ip_display.setText(f"📱 IP detectado: {message}")
+            if not self.ip_input.text():
+                self.ip_input.setText(message)
+            self.get_ip_btn.setText("🔄 Atualizar")
+        else:
+            self.ip_display.setText("📱 Conectado via USB - clique 'Obter IP'")
     
     def _get_device_ip(self):
         """Obtém o IP do dispositivo conectado via USB"""
-        try:
-            devices = self.adb_manager.list_devices()
-            usb_devices = [d for d in devices if d.state == "device" and not ":" in d.serial]
-            
-            if not usb_devices:
-                QMessageBox.warning(
-                    self, 
-                    "Nenhum dispositivo USB", 
-                    "Conecte um dispositivo via USB primeiro!"
-                )
-                return
-            
-            device = usb_devices[0]
-            self.ip_display.setText("🔍 Detectando IP...")
-            
-            # Executa em thread separada
-            self.worker = WiFiConnectionWorker(
-                self.adb_manager, 
-                "get_ip", 
-                device_id=device.serial
+        device = self._target_usb_device()
+        if device is None:
+            QMessageBox.warning(
+                self, 
+                "Nenhum dispositivo USB", 
+                "Conecte um dispositivo via USB primeiro!"
             )
-            self.worker.finished.connect(self._on_ip_detected)
-            self.worker.start()
-            
-        except Exception as e:
-            QMessageBox.warning(self, "Erro", f"Erro ao obter IP: {str(e)}")
+            return
+        
+        self.ip_display.setText("🔍 Detectando IP...")
+        
+        # Executa em thread separada
+        self.worker = WiFiConnectionWorker(
+            self.adb_manager, 
+            "get_ip", 
+            device_id=device.serial
+        )
+        self.worker.finished.connect(self._on_ip_detected)
+        self.worker.start()
     
     def _on_ip_detected(self, success, message):
         """Callback quando IP é detectado"""
@@ -298,10 +422,8 @@ class WiFiConnectionWidget(QGroupBox):
     
     def _enable_wifi_mode(self):
         """Ativa o modo WiFi no dispositivo"""
-        devices = self.adb_manager.list_devices()
-        usb_devices = [d for d in devices if d.state == "device" and not ":" in d.serial]
-        
-        if not usb_devices:
+        device = self._target_usb_device()
+        if device is None:
             QMessageBox.warning(
                 self, 
                 "Nenhum dispositivo USB", 
@@ -309,7 +431,6 @@ class WiFiConnectionWidget(QGroupBox):
             )
             return
         
-        device = usb_devices[0]  # Usa o primeiro dispositivo USB
         port = self.wifi_port_spin.value()
         
         # Mostra progress dialog
@@ -336,6 +457,19 @@ class WiFiConnectionWidget(QGroupBox):
         else:
             QMessageBox.warning(self, "Erro", message)
     
+    def _migrate_all_usb(self):
+        """Passa todos os dispositivos USB para WiFi de uma vez"""
+        usb_devices = self._usb_devices()
+        if not usb_devices:
+            QMessageBox.warning(
+                self, 
+                "Nenhum dispositivo USB", 
+                "Conecte um dispositivo via USB primeiro!"
+            )
+            return
+        
+        self.migrate_requested.emit(usb_devices, self.wifi_port_spin.value())
+    
     def _connect_wifi(self):
         """Conecta a um dispositivo via WiFi"""
         ip = self.ip_input.text().strip()
@@ -345,6 +479,10 @@ class WiFiConnectionWidget(QGroupBox):
             QMessageBox.warning(self, "IP inválido", "Digite um endereço IP válido!")
             return
         
+        self._start_connect(ip, port)
+    
+    def _start_connect(self, ip, port):
+        """Conecta ao endereço em uma thread separada"""
         # Mostra progress dialog
         progress = QProgressDialog("Conectando via WiFi...", "Cancelar", 0, 0)
         progress.setWindowModality(Qt.WindowModal)
@@ -370,3 +508,82 @@ class WiFiConnectionWidget(QGroupBox):
             self.ip_input.clear()
         else:
             QMessageBox.warning(self, "Erro na conexão", message)
+    
+    def _on_scan_clicked(self):
+        """Inicia ou interrompe a busca de dispositivos na rede"""
+        if self._scan_job is not None:
+            self._scan_job.cancel()
+            self.scan_btn.setEnabled(False)
+            return
+        
+        network = self.network_input.text().strip()
+        try:
+            ports = parse_port_range(self.scan_ports_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Portas inválidas", str(e))
+            return
+        
+        if not network:
+            QMessageBox.warning(self, "Rede inválida", "Informe a rede a procurar (ex: 192.168.1.0/24)")
+            return
+        
+        self.scan_table.setRowCount(0)
+        self.scan_status_label.setText(f"🔍 Procurando em {network}...")
+        self.scan_btn.setText("⏹ Parar")
+        
+        job = self.jobs.submit(
+            lambda job: self.adb_manager.discover_wifi_devices(
+                network, ports or None, cancel=job.token, on_progress=job.report_progress
+            ),
+            on_finished=self._on_scan_finished,
+            on_failed=self._on_scan_failed,
+            on_cancelled=lambda: self._on_scan_failed("Busca cancelada"),
+            on_progress=lambda message: self.scan_status_label.setText(f"🔍 {message}")
+        )
+        job.done.connect(lambda: self._on_scan_done(job))
+        self._scan_job = job
+    
+    def _on_scan_done(self, job):
+        """Libera a referência da busca concluída"""
+        if self._scan_job is job:
+            self._scan_job = None
+    
+    def _on_scan_finished(self, devices):
+        """Exibe os dispositivos encontrados"""
+        self._reset_scan_button()
+        self.scan_table.setRowCount(len(devices))
+        
+        for row, device in enumerate(devices):
+            self.scan_table.setItem(row, 0, QTableWidgetItem(device.address))
+            
+            description = device.name or "Dispositivo Android"
+            if device.source == "mdns":
+                description += " (mDNS)"
+            if device.handshake == "AUTH":
+                description += " - requer autorização"
+            elif device.uses_tls:
+                description += " - requer pareamento"
+            self.scan_table.setItem(row, 1, QTableWidgetItem(description))
+            
+            connect_btn = QPushButton("Conectar")
+            connect_btn.setStyleSheet("font-size: 11px;")
+            connect_btn.clicked.connect(
+                lambda checked=False, host=device.host, port=device.port: self._start_connect(host, port)
+            )
+            self.scan_table.setCellWidget(row, 2, connect_btn)
+        
+        self.scan_table.resizeColumnToContents(0)
+        if devices:
+            self.scan_status_label.setText(f"✅ {len(devices)} dispositivo(s) encontrado(s)")
+        else:
+            self.scan_status_label.setText("Nenhum dispositivo encontrado")
+    
+    def _on_scan_failed(self, message):
+        """Callback quando a busca falha ou é cancelada"""
+        self._reset_scan_button()
+        self.scan_status_label.setText(f"❌ {message}")
+    
+    def _reset_scan_button(self):
+        """Volta o botão de busca ao estado inicial"""
+        self.scan_btn.setText("🔍 Procurar")
+        self.scan_btn.setEnabled(True)
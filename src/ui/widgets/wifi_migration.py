@@ -0,0 +1,42 @@
+"""
+Diálogo de acompanhamento da migração USB -> WiFi de vários dispositivos
+"""
+
+from typing import List, Optional
+
+from ...adb_manager import ADBDevice, WifiMigrationProgress
+from .device_progress import DeviceProgressDialog
+
+
+class WifiMigrationDialog(DeviceProgressDialog):
+    """Tabela com o andamento e o resultado da migração por dispositivo"""
+
+    HEADERS = ["Dispositivo", "Status", "Endereço", "Mensagem"]
+    COLUMN_DEVICE = 0
+    COLUMN_STATUS = 1
+    COLUMN_ADDRESS = 2
+    COLUMN_MESSAGE = 3
+
+    STATUS_TEXT = {
+        **DeviceProgressDialog.STATUS_TEXT,
+        WifiMigrationProgress.ENABLING: "📶 Ativando WiFi",
+        WifiMigrationProgress.CONNECTING: "🔗 Conectando",
+        WifiMigrationProgress.SUCCESS: "✅ Conectado",
+    }
+
+    def __init__(self, devices: List[ADBDevice], port: int, parent=None):
+        super().__init__(
+            devices, "Migrando dispositivos USB para WiFi",
+            f"<b>{len(devices)} dispositivo(s) USB</b> para WiFi na porta {port}", parent
+        )
+
+    def _update_row(self, row: int, progress: WifiMigrationProgress):
+        """Mostra o endereço assim que o IP é conhecido"""
+        if progress.address:
+            self.table.item(row, self.COLUMN_ADDRESS).setText(progress.address)
+
+    def _cancelled_progress(self, device: ADBDevice, progress: Optional[WifiMigrationProgress]) -> WifiMigrationProgress:
+        return WifiMigrationProgress(
+            device.serial, WifiMigrationProgress.CANCELLED,
+            progress.address if progress else "", "Cancelado"
+        )
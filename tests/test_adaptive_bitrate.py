@@ -0,0 +1,60 @@
+"""Testes do controlador de bitrate adaptativo"""
+
+import time
+
+from src.adaptive_bitrate import AdaptationDecision, AdaptiveBitrateController
+
+
+def feed(controller, samples, start=None):
+    """Envia uma amostra por segundo e retorna as decisões tomadas"""
+    if start is None:
+        start = time.monotonic() + controller.cooldown
+    decisions = []
+    for offset, (fps, skipped) in enumerate(samples):
+        decision = controller.observe(fps, skipped, now=start + offset)
+        if decision is not None:
+            decisions.append(decision)
+    return decisions
+
+
+def make_controller():
+    return AdaptiveBitrateController(target_fps=60)
+
+
+def test_low_fps_without_skipped_frames_does_not_step_down():
+    # Tela pouco animada: 10-40 fps, nenhum quadro descartado
+    controller = make_controller()
+    samples = [(10 + (second * 7) % 31, 0) for second in range(120)]
+
+    assert feed(controller, samples) == []
+    assert controller.level == 0
+
+
+def test_low_fps_with_skipped_frames_steps_down():
+    controller = make_controller()
+    samples = [(30, 6)] * 20
+
+    decisions = feed(controller, samples)
+
+    assert [decision.direction for decision in decisions] == [AdaptationDecision.DOWN]
+    assert controller.level == 1
+
+
+def test_static_screen_does_not_step_down():
+    controller = make_controller()
+    samples = [(1, 1)] * 60
+
+    assert feed(controller, samples) == []
+    assert controller.level == 0
+
+
+def test_recovers_after_stable_period():
+    controller = make_controller()
+    start = time.monotonic() + controller.cooldown
+    feed(controller, [(30, 6)] * 10, start)
+    assert controller.level == 1
+
+    decisions = feed(controller, [(60, 0)] * 60, start + 10)
+
+    assert [decision.direction for decision in decisions] == [AdaptationDecision.UP]
+    assert controller.level == 0
@@ -0,0 +1,140 @@
+"""Testes do cliente do protocolo host contra um servidor ADB simulado"""
+
+import socket
+import threading
+
+import pytest
+
+from src.adb_client import ADBClient, ADBProtocolError
+
+
+def reply(payload: bytes) -> bytes:
+    """Bloco precedido por 4 dígitos hex de tamanho"""
+    return b"%04x" % len(payload) + payload
+
+
+def fail(message: str) -> bytes:
+    return b"FAIL" + reply(message.encode())
+
+
+class FakeADBServer:
+    """
+    Servidor ADB local: cada conexão lê requisições e responde conforme
+    `responses` (serviço -> bytes); depois de um serviço de dispositivo
+    (shell:, exec:) a conexão é encerrada, como no servidor real.
+    """
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                header = self._read(conn, 4)
+                if not header:
+                    return
+                service = self._read(conn, int(header, 16)).decode()
+                self.requests.append(service)
+                response = self.responses.get(service, fail(f"unknown service {service}"))
+                conn.sendall(response)
+                if not service.startswith("host:transport:") or response.startswith(b"FAIL"):
+                    return
+
+    @staticmethod
+    def _read(conn, size):
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                return b""
+            data += chunk
+        return data
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(responses):
+        fake = FakeADBServer(responses)
+        servers.append(fake)
+        return fake, ADBClient("127.0.0.1", fake.port, timeout=2.0)
+
+    yield start
+    for fake in servers:
+        fake.close()
+
+
+def test_host_request_reads_length_prefixed_reply(server):
+    fake, client = server({"host:version": b"OKAY" + reply(b"0029")})
+
+    assert client.server_version() == 0x29
+    assert fake.requests == ["host:version"]
+
+
+def test_devices_long(server):
+    listing = b"emulator-5554          device product:sdk model:Pixel_7 device:emu64 transport_id:1\n"
+    _, client = server({"host:devices-l": b"OKAY" + reply(listing)})
+
+    assert client.devices_long() == listing.decode()
+
+
+def test_fail_raises_protocol_error_with_message(server):
+    _, client = server({"host:version": fail("device offline")})
+
+    with pytest.raises(ADBProtocolError, match="device offline"):
+        client.server_version()
+
+
+def test_unexpected_status_raises_protocol_error(server):
+    _, client = server({"host:version": b"WHAT"})
+
+    with pytest.raises(ADBProtocolError, match="inesperada"):
+        client.server_version()
+
+
+def test_shell_goes_through_host_transport(server):
+    fake, client = server({
+        "host:transport:ABC123": b"OKAY",
+        "shell:echo hi": b"OKAY" + b"hi\n",
+    })
+
+    assert client.shell("ABC123", "echo hi") == b"hi\n"
+    assert fake.requests == ["host:transport:ABC123", "shell:echo hi"]
+
+
+def test_transport_fail_for_unknown_device(server):
+    _, client = server({"host:transport:ABC123": fail("device 'ABC123' not found")})
+
+    with pytest.raises(ADBProtocolError, match="not found"):
+        client.exec_out("ABC123", "screencap")
+
+
+def test_timeout_none_blocks_without_limit(server):
+    _, client = server({"host:transport:ABC123": b"OKAY", "exec:true": b"OKAY"})
+
+    sock = client.open_service("ABC123", "exec:true", timeout=None)
+    with sock:
+        assert sock.gettimeout() is None
+
+    sock = client.open_service("ABC123", "exec:true")
+    with sock:
+        assert sock.gettimeout() == client.timeout
@@ -0,0 +1,81 @@
+"""Testes da coleta de APKs de pacotes de splits"""
+
+import json
+import zipfile
+
+import pytest
+
+from src.apk_splits import collect_splits, is_split_archive, select_splits_for_abis
+
+
+def make_archive(path, files):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+def names(splits):
+    return sorted(split.name for split in splits)
+
+
+def test_bundletool_apks_uses_only_splits(tmp_path):
+    path = make_archive(tmp_path / "app.apks", {
+        "toc.pb": b"",
+        "splits/base-master.apk": b"base",
+        "splits/base-arm64_v8a.apk": b"arm64",
+        "splits/base-x86_64.apk": b"x86_64",
+        "standalones/standalone-arm64_v8a_hdpi.apk": b"standalone",
+        "universal.apk": b"universal",
+    })
+
+    splits = collect_splits([path])
+
+    assert names(splits) == ["splits/base-arm64_v8a.apk", "splits/base-master.apk", "splits/base-x86_64.apk"]
+    assert names(select_splits_for_abis(splits, ["arm64-v8a", "armeabi-v7a"])) == [
+        "splits/base-arm64_v8a.apk", "splits/base-master.apk"
+    ]
+    with splits[0].open() as source:
+        assert source.read() in (b"base", b"arm64", b"x86_64")
+
+
+def test_bundletool_universal_mode(tmp_path):
+    path = make_archive(tmp_path / "app.apks", {"toc.pb": b"", "universal.apk": b"universal"})
+
+    assert names(collect_splits([path])) == ["universal.apk"]
+
+
+def test_bundletool_standalones_only_is_rejected(tmp_path):
+    path = make_archive(tmp_path / "app.apks", {"standalones/standalone-arm64_v8a.apk": b"x"})
+
+    with pytest.raises(ValueError):
+        collect_splits([path])
+
+
+def test_xapk_uses_manifest_split_list(tmp_path):
+    manifest = {"split_apks": [{"file": "com.example.apk", "id": "base"}, {"file": "config.arm64_v8a.apk", "id": "config.arm64_v8a"}]}
+    path = make_archive(tmp_path / "app.xapk", {
+        "manifest.json": json.dumps(manifest),
+        "com.example.apk": b"base",
+        "config.arm64_v8a.apk": b"arm64",
+        "extra/old.apk": b"old",
+        "Android/obb/com.example/main.1.com.example.obb": b"obb",
+    })
+
+    assert names(collect_splits([path])) == ["com.example.apk", "config.arm64_v8a.apk"]
+
+
+def test_apkm_uses_root_apks(tmp_path):
+    path = make_archive(tmp_path / "app.apkm", {
+        "info.json": "{}",
+        "base.apk": b"base",
+        "split_config.arm64_v8a.apk": b"arm64",
+        "icon.png": b"",
+    })
+
+    assert names(collect_splits([path])) == ["base.apk", "split_config.arm64_v8a.apk"]
+
+
+def test_zip_is_not_a_split_archive():
+    assert not is_split_archive("backup.zip")
+    assert is_split_archive("App.APKS")
@@ -0,0 +1,102 @@
+"""Testes da leitura dos endereços de rede do dispositivo"""
+
+from src.device_network import InterfaceAddress, parse_ip_addresses, select_wifi_address
+
+
+# `ip -o -4 addr show` de um Pixel com dados móveis e WiFi ligados
+IP_ONELINE_OUTPUT = """\
+1: lo    inet 127.0.0.1/8 scope host lo\\       valid_lft forever preferred_lft forever
+2: rmnet_data0    inet 10.145.32.7/30 scope global rmnet_data0\\       valid_lft forever preferred_lft forever
+3: dummy0    inet 0.0.0.0/32 scope global dummy0\\       valid_lft forever preferred_lft forever
+31: wlan0    inet 192.168.1.23/24 brd 192.168.1.255 scope global wlan0\\       valid_lft forever preferred_lft forever
+"""
+
+# `ip -o -4 addr show` com adaptador USB-Ethernet e WiFi
+IP_ONELINE_WIRED_OUTPUT = """\
+1: lo    inet 127.0.0.1/8 scope host lo\\       valid_lft forever preferred_lft forever
+4: eth0    inet 192.168.0.40/24 brd 192.168.0.255 scope global eth0\\       valid_lft forever preferred_lft forever
+31: wlan0    inet 192.168.1.23/24 brd 192.168.1.255 scope global wlan0\\       valid_lft forever preferred_lft forever
+"""
+
+# `ifconfig` do busybox/toybox
+BUSYBOX_IFCONFIG_OUTPUT = """\
+lo        Link encap:Local Loopback
+          inet addr:127.0.0.1  Mask:255.0.0.0
+          inet6 addr: ::1/128 Scope: Host
+          UP LOOPBACK RUNNING  MTU:65536  Metric:1
+          RX packets:64 errors:0 dropped:0 overruns:0 frame:0
+
+rmnet0    Link encap:UNSPEC
+          inet addr:10.20.30.40  Mask:255.255.255.252
+          UP RUNNING  MTU:1500  Metric:1
+
+wlan0     Link encap:Ethernet  HWaddr 02:00:00:00:00:00
+          inet addr:192.168.1.57  Bcast:192.168.1.255  Mask:255.255.255.0
+          inet6 addr: fe80::1c2a:3bff:fe4d:5e6f/64 Scope: Link
+          UP BROADCAST RUNNING MULTICAST  MTU:1500  Metric:1
+"""
+
+# `ifconfig` do toolbox (Android 5 e anteriores): uma linha por interface
+TOOLBOX_IFCONFIG_OUTPUT = """\
+lo: ip 127.0.0.1 mask 255.0.0.0 flags [up loopback running]
+rmnet0: ip 10.64.12.9 mask 255.255.255.252 flags [up running]
+wlan0: ip 192.168.43.120 mask 255.255.255.0 flags [up broadcast running multicast]
+p2p0: ip 0.0.0.0 mask 0.0.0.0 flags [up broadcast running multicast]
+"""
+
+
+def test_parse_ip_oneline():
+    addresses = parse_ip_addresses(IP_ONELINE_OUTPUT)
+
+    assert addresses == [
+        InterfaceAddress("lo", "127.0.0.1", 8),
+        InterfaceAddress("rmnet_data0", "10.145.32.7", 30),
+        InterfaceAddress("wlan0", "192.168.1.23", 24),
+    ]
+
+
+def test_select_skips_loopback_and_mobile_data():
+    assert select_wifi_address(parse_ip_addresses(IP_ONELINE_OUTPUT)) == "192.168.1.23"
+
+
+def test_select_prefers_wifi_over_wired():
+    assert select_wifi_address(parse_ip_addresses(IP_ONELINE_WIRED_OUTPUT)) == "192.168.1.23"
+
+
+def test_select_wired_without_wifi():
+    addresses = [entry for entry in parse_ip_addresses(IP_ONELINE_WIRED_OUTPUT) if entry.interface != "wlan0"]
+
+    assert select_wifi_address(addresses) == "192.168.0.40"
+
+
+def test_parse_busybox_ifconfig():
+    addresses = parse_ip_addresses(BUSYBOX_IFCONFIG_OUTPUT)
+
+    assert [(entry.interface, entry.address) for entry in addresses] == [
+        ("lo", "127.0.0.1"),
+        ("rmnet0", "10.20.30.40"),
+        ("wlan0", "192.168.1.57"),
+    ]
+    assert select_wifi_address(addresses) == "192.168.1.57"
+
+
+def test_parse_toolbox_ifconfig():
+    addresses = parse_ip_addresses(TOOLBOX_IFCONFIG_OUTPUT)
+
+    assert [(entry.interface, entry.address) for entry in addresses] == [
+        ("lo", "127.0.0.1"),
+        ("rmnet0", "10.64.12.9"),
+        ("wlan0", "192.168.43.120"),
+    ]
+    assert select_wifi_address(addresses) == "192.168.43.120"
+
+
+def test_only_mobile_data_has_no_wifi_address():
+    output = "\n".join(line for line in IP_ONELINE_OUTPUT.splitlines() if "wlan0" not in line)
+
+    assert select_wifi_address(parse_ip_addresses(output)) == ""
+
+
+def test_unrecognized_output():
+    assert parse_ip_addresses("/system/bin/sh: ip: not found") == []
+    assert select_wifi_address([]) == ""